@@ -146,9 +146,12 @@ from .compat import (
     nexus_init,
     nexus_recall,
     nexus_search,
+    nexus_recall_many,
+    nexus_recall_batch,
     nexus_add,
     nexus_add_document,
     nexus_add_documents,
+    nexus_add_documents_batch,
     nexus_stats,
     nexus_health,
     
@@ -253,9 +256,12 @@ __all__ = [
     "nexus_init",
     "nexus_recall",
     "nexus_search",
+    "nexus_recall_many",
+    "nexus_recall_batch",
     "nexus_add",
     "nexus_add_document",
     "nexus_add_documents",
+    "nexus_add_documents_batch",
     "nexus_stats",
     "nexus_health",
     "get_session_manager",
@@ -2,9 +2,10 @@
 
 from .models import BrainRecord, PRIORITIES
 from .store import BrainStore, JSONLBrainStore
-from .api import brain_write, brain_retrieve, checkpoint, rollback, list_versions, backfill_embeddings, configure_brain, is_brain_enabled
+from .api import brain_write, brain_write_many, brain_retrieve, brain_retrieve_many, checkpoint, rollback, list_versions, backfill_embeddings, configure_brain, is_brain_enabled, warm_up
 from .scoring import Scorer, KeywordScorer
 from .vector_scorer import VectorScorer
+from .embedding_cache import EmbeddingCache
 
 __all__ = [
     "BrainRecord",
@@ -12,14 +13,18 @@ __all__ = [
     "BrainStore",
     "JSONLBrainStore",
     "brain_write",
+    "brain_write_many",
     "brain_retrieve",
+    "brain_retrieve_many",
     "checkpoint",
     "rollback",
     "list_versions",
     "backfill_embeddings",
     "configure_brain",
     "is_brain_enabled",
+    "warm_up",
     "Scorer",
     "KeywordScorer",
     "VectorScorer",
+    "EmbeddingCache",
 ]
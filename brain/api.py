@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
+from dataclasses import replace
 from datetime import datetime, timezone, timedelta
 from .scoring import KeywordScorer, Scorer
 from .vector_scorer import VectorScorer
+import heapq
+import json
+import os
+import threading
+import time
 import uuid
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
+from .filters import normalize_filters, record_matches
 from .models import BrainRecord
+from .novelty import NoveltyIndex
 from .store import JSONLBrainStore
 
 _STORE: Optional[JSONLBrainStore] = None
@@ -20,6 +29,17 @@ _TIERED_RECALL: bool = False
 _TIERED_ORDER: List[str] = ["P0", "P1", "P2"]
 _TIERED_LIMITS: List[int] = [3, 2, 1]
 _DEDUPE_ON_RECALL: bool = True
+_NOVELTY_INDEX: Optional[NoveltyIndex] = None
+_NOVELTY_BUILD_LOCK = threading.Lock()
+# Set while no brain_retrieve call is running; background backfill waits on it.
+_FOREGROUND_IDLE = threading.Event()
+_FOREGROUND_IDLE.set()
+_FOREGROUND_LOCK = threading.Lock()
+_FOREGROUND_ACTIVE = 0
+_BACKFILL_CURSOR_NAME = "backfill_cursor.json"
+# Bumped whenever recall results may change (writes, checkpoints, rollbacks);
+# callers caching recall results compare against it.
+_GENERATION = 0
 
 
 def configure_brain(
@@ -41,10 +61,19 @@ def configure_brain(
     tiered_order: Optional[List[str]] = None,
     tiered_limits: Optional[List[int]] = None,
     dedupe_on_recall: bool = True,
+    embedding_cache_max_entries: int = 10000,
+    embedding_cache_max_bytes: int = 64 * 1024 * 1024,
+    embedding_cache_path: Optional[str] = None,
+    compaction: str = "memory",
+    compaction_run_size: int = 50000,
+    snapshot_format: str = "jsonl",
+    usage_flush_max_ids: int = 256,
+    usage_flush_interval_seconds: float = 5.0,
 ) -> None:
     global _STORE, _SCORER, _ENABLED, _TRACK_USAGE
     global _NOVELTY_ENABLED, _NOVELTY_MIN_SIMILARITY, _NOVELTY_WINDOW_SECONDS
     global _TIERED_RECALL, _TIERED_ORDER, _TIERED_LIMITS, _DEDUPE_ON_RECALL
+    global _NOVELTY_INDEX
     _ENABLED = bool(enabled)
     _TRACK_USAGE = bool(track_usage)
     _NOVELTY_ENABLED = bool(novelty_enabled)
@@ -56,6 +85,8 @@ def configure_brain(
     if tiered_limits:
         _TIERED_LIMITS = [max(0, int(x)) for x in tiered_limits]
     _DEDUPE_ON_RECALL = bool(dedupe_on_recall)
+    _NOVELTY_INDEX = None
+    _bump_generation()
     _STORE = JSONLBrainStore(
         base_path=base_path,
         max_snapshots=max_snapshots,
@@ -64,17 +95,27 @@ def configure_brain(
         decay_on_checkpoint_days=decay_on_checkpoint_days,
         decay_floor=decay_floor,
         decay_step=decay_step,
+        compaction=compaction,
+        compaction_run_size=compaction_run_size,
+        snapshot_format=snapshot_format,
+        usage_flush_max_ids=usage_flush_max_ids,
+        usage_flush_interval_seconds=usage_flush_interval_seconds,
     )
 
     if scorer is not None:
         _SCORER = scorer
         return
 
+    cache_kwargs = {
+        "cache_max_entries": embedding_cache_max_entries,
+        "cache_max_bytes": embedding_cache_max_bytes,
+        "cache_path": embedding_cache_path,
+    }
     st = (scorer_type or "keyword").strip().lower()
     if st in {"vector", "st", "sentence-transformers"}:
-        _SCORER = VectorScorer(use_sentence_transformers=True)
+        _SCORER = VectorScorer(use_sentence_transformers=True, **cache_kwargs)
     elif st in {"hashed-vector", "hash", "bow"}:
-        _SCORER = VectorScorer(use_sentence_transformers=False)
+        _SCORER = VectorScorer(use_sentence_transformers=False, **cache_kwargs)
     else:
         _SCORER = KeywordScorer()
 
@@ -83,6 +124,16 @@ def is_brain_enabled() -> bool:
     return _ENABLED
 
 
+def brain_generation() -> int:
+    """Counter that changes whenever stored brain records may have changed."""
+    return _GENERATION
+
+
+def _bump_generation() -> None:
+    global _GENERATION
+    _GENERATION += 1
+
+
 def _ensure_store() -> JSONLBrainStore:
     global _STORE
     if _STORE is None:
@@ -90,25 +141,19 @@ def _ensure_store() -> JSONLBrainStore:
     return _STORE
 
 
-def _maybe_attach_embedding(record: BrainRecord) -> BrainRecord:
-    scorer = _SCORER
-    if not isinstance(scorer, VectorScorer):
-        return record
-    if not scorer.use_sentence_transformers or scorer._st_model is None:
-        return record
-
-    meta = dict(record.metadata or {})
-    if (
+def _has_current_embedding(record: BrainRecord, scorer: VectorScorer) -> bool:
+    meta = record.metadata or {}
+    return (
         isinstance(meta.get("embedding"), list)
         and meta.get("embedding_model") == scorer.model_name
         and meta.get("embedding_dim") == scorer.dim
         and meta.get("embedding_kind") == "sentence-transformers"
         and meta.get("embedding_hash") == record.hash
-    ):
-        record.metadata = meta
-        return record
+    )
+
 
-    vec = scorer.embed(scorer.record_text(record))
+def _set_embedding(record: BrainRecord, scorer: VectorScorer, vec: List[float]) -> BrainRecord:
+    meta = dict(record.metadata or {})
     meta["embedding"] = vec
     meta["embedding_model"] = scorer.model_name
     meta["embedding_dim"] = scorer.dim
@@ -118,6 +163,20 @@ def _maybe_attach_embedding(record: BrainRecord) -> BrainRecord:
     return record
 
 
+def _maybe_attach_embedding(record: BrainRecord) -> BrainRecord:
+    scorer = _SCORER
+    if not isinstance(scorer, VectorScorer):
+        return record
+    if not scorer.use_sentence_transformers or scorer._st_model is None:
+        return record
+
+    if _has_current_embedding(record, scorer):
+        record.metadata = dict(record.metadata or {})
+        return record
+
+    return _set_embedding(record, scorer, scorer.embed(scorer.record_text(record)))
+
+
 def _record_text(record: BrainRecord, scorer: Optional[Scorer]) -> str:
     if isinstance(scorer, VectorScorer):
         return scorer.record_text(record)
@@ -148,37 +207,73 @@ def _parse_iso(ts: str) -> Optional[datetime]:
     return parsed
 
 
+def _novelty_signature(index: NoveltyIndex, record: BrainRecord) -> Optional[List[int]]:
+    # Bucket on content/tags only: kind and source are shared by most records
+    # and would make unrelated records look similar.
+    return index.signature(" ".join([record.content or "", " ".join(record.tags)]))
+
+
+def _ensure_novelty_index(store: JSONLBrainStore) -> NoveltyIndex:
+    """Build the recent-window novelty index once from the store, then keep it warm."""
+    global _NOVELTY_INDEX
+    index = _NOVELTY_INDEX
+    if index is not None and index.window_seconds == _NOVELTY_WINDOW_SECONDS:
+        return index
+
+    with _NOVELTY_BUILD_LOCK:
+        # Concurrent writers build it once; the others reuse that index.
+        index = _NOVELTY_INDEX
+        if index is not None and index.window_seconds == _NOVELTY_WINDOW_SECONDS:
+            return index
+        index = NoveltyIndex(window_seconds=_NOVELTY_WINDOW_SECONDS)
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(seconds=_NOVELTY_WINDOW_SECONDS)
+        for existing in store.read_all():
+            ts = _parse_iso(existing.updated_at) or _parse_iso(existing.created_at)
+            if ts is not None and ts < cutoff:
+                continue
+            index.add(existing, _novelty_signature(index, existing), ts=ts or now)
+        _NOVELTY_INDEX = index
+        return index
+
+
 def _is_duplicate(record: BrainRecord, store: JSONLBrainStore, scorer: Scorer) -> bool:
+    """Novelty gate: exact hash or a similar record within the recent window.
+
+    Only records that share a MinHash LSH bucket with `record` are scored
+    instead of every record in the window.
+    """
     if not _NOVELTY_ENABLED:
         return False
     if _NOVELTY_WINDOW_SECONDS <= 0:
         return False
 
+    index = _ensure_novelty_index(store)
     now = datetime.now(timezone.utc)
-    cutoff = now - timedelta(seconds=_NOVELTY_WINDOW_SECONDS)
+    index.expire(now)
+    if index.has_hash(record.hash, now):
+        return True
+
+    min_sim = _NOVELTY_MIN_SIMILARITY
+    if min_sim <= 0:
+        return False
     query_text = _record_text(record, scorer)
     mode = _mode_for_kind(record.kind)
-    min_sim = _NOVELTY_MIN_SIMILARITY
-
-    for existing in store.read_all():
-        ts = _parse_iso(existing.updated_at) or _parse_iso(existing.created_at)
-        if ts is not None and ts < cutoff:
-            continue
-        if existing.hash and existing.hash == record.hash:
-            return True
-        if min_sim <= 0:
-            continue
+    for existing in index.candidates(_novelty_signature(index, record), now):
         score = float(scorer.score(query=query_text, record=existing, mode=mode))
         if score >= min_sim:
             return True
     return False
 
 
-def brain_write(record: BrainRecord | Dict) -> Optional[BrainRecord]:
-    if not _ENABLED:
-        return None
-    store = _ensure_store()
+def _remember_novelty(record: BrainRecord) -> None:
+    index = _NOVELTY_INDEX
+    if not _NOVELTY_ENABLED or index is None:
+        return
+    index.add(record, _novelty_signature(index, record))
+
 
+def _prepare_record(record: BrainRecord | Dict) -> BrainRecord:
     if isinstance(record, dict):
         payload = dict(record)
         payload.setdefault("id", str(uuid.uuid4()))
@@ -192,13 +287,59 @@ def brain_write(record: BrainRecord | Dict) -> Optional[BrainRecord]:
 
     # Ensure hash reflects latest content before embedding.
     record_obj.hash = record_obj.compute_hash()
-    record_obj = _maybe_attach_embedding(record_obj)
+    return record_obj
+
+
+def brain_write(record: BrainRecord | Dict) -> Optional[BrainRecord]:
+    if not _ENABLED:
+        return None
+    store = _ensure_store()
+
+    record_obj = _maybe_attach_embedding(_prepare_record(record))
 
     scorer = _SCORER or KeywordScorer()
     if _is_duplicate(record_obj, store, scorer):
         return None
 
-    return store.write(record_obj)
+    written = store.write(record_obj)
+    _remember_novelty(written)
+    _bump_generation()
+    return written
+
+
+def brain_write_many(records: List[BrainRecord | Dict]) -> List[Optional[BrainRecord]]:
+    """Write several records with one embedding batch and one WAL append.
+
+    Returns one entry per input: the written record, or None when the novelty
+    gate dropped it (records earlier in the same batch count as recent).
+    """
+    if not _ENABLED:
+        return [None] * len(records)
+    store = _ensure_store()
+
+    prepared = [_prepare_record(record) for record in records]
+    scorer = _SCORER
+    if isinstance(scorer, VectorScorer) and scorer.use_sentence_transformers and scorer._st_model is not None:
+        missing = [rec for rec in prepared if not _has_current_embedding(rec, scorer)]
+        vecs = scorer.embed_many([scorer.record_text(rec) for rec in missing])
+        for rec, vec in zip(missing, vecs):
+            _set_embedding(rec, scorer, vec)
+
+    gate = scorer or KeywordScorer()
+    out: List[Optional[BrainRecord]] = []
+    pending: List[BrainRecord] = []
+    for rec in prepared:
+        if _is_duplicate(rec, store, gate):
+            out.append(None)
+            continue
+        _remember_novelty(rec)
+        pending.append(rec)
+        out.append(rec)
+
+    if pending:
+        store.write_many(pending)
+        _bump_generation()
+    return out
 
 
 def _score(query: str, rec: BrainRecord, mode: str) -> float:
@@ -206,80 +347,262 @@ def _score(query: str, rec: BrainRecord, mode: str) -> float:
     return float(scorer.score(query=query, record=rec, mode=mode))
 
 
+def _score_all(query: str, items: List[BrainRecord], mode: str, allowed: Optional[set] = None) -> List[float]:
+    """Score every record, using the scorer's batch path when it has one.
+
+    Batch scorers always see the full (unfiltered) record list so their cached
+    matrices stay aligned with the store index; filtered-out records are
+    dropped by the caller.
+    """
+    scorer = _SCORER or KeywordScorer()
+    score_batch = getattr(scorer, "score_batch", None)
+    if callable(score_batch):
+        return [float(x) for x in score_batch(query, items, mode)]
+    return [
+        _score(query=query, rec=rec, mode=mode) if allowed is None or rec.priority in allowed else 0.0
+        for rec in items
+    ]
+
+
+def _score_positions(query: str, items: List[BrainRecord], positions: List[int], mode: str) -> List[float]:
+    """Score only `items[positions]`, via the scorer's row-subset path when it has one."""
+    scorer = _SCORER or KeywordScorer()
+    score_rows = getattr(scorer, "score_rows", None)
+    if callable(score_rows):
+        return [float(x) for x in score_rows(query, items, positions, mode)]
+    return [_score(query=query, rec=items[i], mode=mode) for i in positions]
+
+
+def _iter_scored(
+    store: JSONLBrainStore,
+    query: str,
+    mode: str,
+    allowed: Optional[set],
+    min_score: float,
+    filters: Optional[Dict] = None,
+) -> Iterator[Tuple[int, BrainRecord, float]]:
+    """Yield (position, record, score) for records that may pass `min_score`.
+
+    With the keyword scorer, only records sharing a token with the query
+    (per the store's inverted index) are scored. Records without any match
+    can only reach the mode/priority bonus, so they are considered only
+    when `min_score` is that low.
+
+    Records rejected by `filters` (see `brain.filters`) are dropped before
+    scoring.
+    """
+    scorer = _SCORER or KeywordScorer()
+    keyword_candidates = getattr(store, "keyword_candidates", None)
+    if not isinstance(scorer, KeywordScorer) or not callable(keyword_candidates) or not scorer.query_tokens(query):
+        items = store.read_all()
+        if not filters:
+            for seq, (rec, score) in enumerate(zip(items, _score_all(query, items, mode, allowed))):
+                yield seq, rec, score
+            return
+        positions = [
+            seq
+            for seq, rec in enumerate(items)
+            if (allowed is None or rec.priority in allowed) and record_matches(rec, filters)
+        ]
+        for seq, score in zip(positions, _score_positions(query, items, positions, mode)):
+            yield seq, items[seq], score
+        return
+
+    items, positions = keyword_candidates(query)
+    if min_score <= scorer.unmatched_ceiling():
+        matched = set(positions)
+        for seq, rec in enumerate(items):
+            if allowed is not None and rec.priority not in allowed:
+                continue
+            if filters and not record_matches(rec, filters):
+                continue
+            if seq in matched:
+                yield seq, rec, float(scorer.score(query=query, record=rec, mode=mode))
+            else:
+                yield seq, rec, float(scorer.weighted(0.0, record=rec, mode=mode))
+        return
+    for seq in positions:
+        rec = items[seq]
+        if allowed is not None and rec.priority not in allowed:
+            continue
+        if filters and not record_matches(rec, filters):
+            continue
+        yield seq, rec, float(scorer.score(query=query, record=rec, mode=mode))
+
+
+def _push_topk(heap: List[Tuple[float, int, BrainRecord]], k: int, entry: Tuple[float, int, BrainRecord]) -> None:
+    """Keep the `k` largest entries (score, -seq, record) in a min-heap."""
+    if k <= 0:
+        return
+    if len(heap) < k:
+        heapq.heappush(heap, entry)
+    elif entry[:2] > heap[0][:2]:
+        heapq.heapreplace(heap, entry)
+
+
+def _prefer_duplicate(candidate: BrainRecord, existing: BrainRecord) -> bool:
+    """Prefer records with stored embeddings or newer updates."""
+    c_has_emb = isinstance((candidate.metadata or {}).get("embedding"), list)
+    e_has_emb = isinstance((existing.metadata or {}).get("embedding"), list)
+    if c_has_emb and not e_has_emb:
+        return True
+    if e_has_emb and not c_has_emb:
+        return False
+    c_ts = _parse_iso(str(candidate.updated_at or ""))
+    e_ts = _parse_iso(str(existing.updated_at or ""))
+    return bool(c_ts and e_ts and c_ts > e_ts)
+
+
+def _dedupe_ranked(ranked: List[Tuple[float, BrainRecord]]) -> List[Tuple[float, BrainRecord]]:
+    if not _DEDUPE_ON_RECALL:
+        return ranked
+    seen: Dict[str, int] = {}
+    out: List[Tuple[float, BrainRecord]] = []
+    for score, rec in ranked:
+        key = rec.hash or rec.id
+        if not key:
+            continue
+        idx = seen.get(key)
+        if idx is None:
+            seen[key] = len(out)
+            out.append((score, rec))
+        elif _prefer_duplicate(rec, out[idx][1]):
+            out[idx] = (score, rec)
+    return out
+
+
+@contextmanager
+def _foreground():
+    """Mark a foreground recall as running so background backfill yields to it."""
+    global _FOREGROUND_ACTIVE
+    with _FOREGROUND_LOCK:
+        _FOREGROUND_ACTIVE += 1
+        _FOREGROUND_IDLE.clear()
+    try:
+        yield
+    finally:
+        with _FOREGROUND_LOCK:
+            _FOREGROUND_ACTIVE -= 1
+            if _FOREGROUND_ACTIVE <= 0:
+                _FOREGROUND_ACTIVE = 0
+                _FOREGROUND_IDLE.set()
+
+
 def brain_retrieve(
     query: str,
     mode: str = "facts",
     limit: int = 5,
     min_score: float = 0.2,
     priority_filter: Optional[List[str]] = None,
+    filters: Optional[Dict] = None,
 ) -> List[Dict]:
+    """Top `limit` records for `query`.
+
+    `filters` takes the structured recall filters from `brain.filters`
+    (tags/type/conversation_id/date_from/date_to/priority); non-matching
+    records are never scored.
+    """
     if not _ENABLED:
         return []
+    with _foreground():
+        return _brain_retrieve(query, mode, limit, min_score, priority_filter, filters)
 
-    store = _ensure_store()
-    items = store.read_all()
-    if priority_filter:
-        allowed = set(priority_filter)
-        items = [i for i in items if i.priority in allowed]
-
-    scored = []
-    for rec in items:
-        score = _score(query=query, rec=rec, mode=mode)
-        if score >= min_score:
-            d = rec.to_dict()
-            d["score"] = round(score, 4)
-            scored.append(d)
-
-    def _dedupe(recs: List[Dict]) -> List[Dict]:
-        if not _DEDUPE_ON_RECALL:
-            return recs
-        seen: Dict[str, int] = {}
-        out: List[Dict] = []
-        for r in recs:
-            key = r.get("hash") or r.get("id")
-            if not key:
-                continue
-            idx = seen.get(key)
-            if idx is None:
-                seen[key] = len(out)
-                out.append(r)
-                continue
 
-            # Prefer records with stored embeddings or newer updates.
-            existing = out[idx]
-            r_meta = r.get("metadata") or {}
-            e_meta = existing.get("metadata") or {}
-            r_has_emb = isinstance(r_meta.get("embedding"), list)
-            e_has_emb = isinstance(e_meta.get("embedding"), list)
-            if r_has_emb and not e_has_emb:
-                out[idx] = r
-                continue
-            if e_has_emb and not r_has_emb:
-                continue
+def brain_retrieve_many(
+    queries: List[str],
+    mode: str = "facts",
+    limit: int = 5,
+    min_score: float = 0.2,
+    priority_filter: Optional[List[str]] = None,
+    filters: Optional[Dict] = None,
+) -> List[List[Dict]]:
+    """Retrieve for several queries; returns one result list per query.
 
-            r_ts = _parse_iso(str(r.get("updated_at", "")))
-            e_ts = _parse_iso(str(existing.get("updated_at", "")))
-            if r_ts and e_ts and r_ts > e_ts:
-                out[idx] = r
-        return out
-
-    if _TIERED_RECALL and scored:
-        order = _TIERED_ORDER or ["P0", "P1", "P2"]
-        limits = _TIERED_LIMITS or []
-        out = []
-        for idx, pr in enumerate(order):
-            tier = [r for r in scored if r.get("priority") == pr]
-            tier.sort(key=lambda x: x["score"], reverse=True)
-            cap = limits[idx] if idx < len(limits) else max(0, limit - len(out))
+    With a vector scorer, all query embeddings are computed in one batch up
+    front, and every query is then scored against the same cached record
+    matrix.
+    """
+    if not _ENABLED or not queries:
+        return [[] for _ in queries]
+    with _foreground():
+        scorer = _SCORER
+        if isinstance(scorer, VectorScorer):
+            texts = [q for q in dict.fromkeys(queries) if q.strip()]
+            if texts:
+                scorer.embed_many(texts)
+        return [_brain_retrieve(query, mode, limit, min_score, priority_filter, filters) for query in queries]
+
+
+def _brain_retrieve(
+    query: str,
+    mode: str,
+    limit: int,
+    min_score: float,
+    priority_filter: Optional[List[str]],
+    filters: Optional[Dict] = None,
+) -> List[Dict]:
+    store = _ensure_store()
+    allowed = set(priority_filter) if priority_filter else None
+    filters = normalize_filters(filters)
+    priorities = filters.pop("priority", None)
+    if priorities:
+        # Same check as priority_filter; fold it in so the tiered path sees it too.
+        allowed = set(priorities) if allowed is None else allowed & set(priorities)
+
+    limit = max(0, limit)
+    order = (_TIERED_ORDER or ["P0", "P1", "P2"]) if _TIERED_RECALL else []
+    tier_limits = _TIERED_LIMITS or []
+    # Tiers past the configured limits are capped by whatever room is left, so
+    # `limit` is a safe upper bound while streaming.
+    tier_caps = [tier_limits[i] if i < len(tier_limits) else limit for i in range(len(order))]
+    tier_slots: Dict[str, List[int]] = {}
+    for idx, pr in enumerate(order):
+        tier_slots.setdefault(pr, []).append(idx)
+    tier_heaps: List[List[Tuple[float, int, BrainRecord]]] = [[] for _ in order]
+
+    top: List[Tuple[float, int, BrainRecord]] = []
+    groups: Dict[str, List[Tuple[float, int, BrainRecord]]] = {}
+
+    for seq, rec, score in _iter_scored(store, query, mode, allowed, min_score, filters):
+        if allowed is not None and rec.priority not in allowed:
+            continue
+        if score < min_score:
+            continue
+        entry = (round(score, 4), -seq, rec)
+        if _TIERED_RECALL:
+            for idx in tier_slots.get(rec.priority, ()):
+                _push_topk(tier_heaps[idx], tier_caps[idx], entry)
+        elif _DEDUPE_ON_RECALL:
+            key = rec.hash or rec.id
+            if key:
+                groups.setdefault(key, []).append(entry)
+        else:
+            _push_topk(top, limit, entry)
+
+    ranked: List[Tuple[float, BrainRecord]]
+    if _TIERED_RECALL:
+        ranked = []
+        for idx in range(len(order)):
+            cap = tier_limits[idx] if idx < len(tier_limits) else max(0, limit - len(ranked))
             if cap <= 0:
                 continue
-            out.extend(tier[:cap])
-            if len(out) >= limit:
+            tier = sorted(tier_heaps[idx], reverse=True)[:cap]
+            ranked.extend((score, rec) for score, _, rec in tier)
+            if len(ranked) >= limit:
                 break
-        out = _dedupe(out)[: max(0, limit)]
+        ranked = _dedupe_ranked(ranked)[:limit]
+    elif _DEDUPE_ON_RECALL:
+        # Rank duplicate groups by their best member, then resolve only the winners.
+        winners = heapq.nlargest(limit, groups.values(), key=max)
+        ranked = [_dedupe_ranked([(score, rec) for score, _, rec in sorted(members, reverse=True)])[0] for members in winners]
     else:
-        scored.sort(key=lambda x: x["score"], reverse=True)
-        out = _dedupe(scored)[: max(0, limit)]
+        ranked = [(score, rec) for score, _, rec in sorted(top, reverse=True)]
+
+    out = []
+    for score, rec in ranked:
+        d = rec.to_dict()
+        d["score"] = score
+        out.append(d)
 
     if _TRACK_USAGE and out:
         try:
@@ -290,18 +613,49 @@ def brain_retrieve(
     return out
 
 
+def warm_up(mode: str = "facts") -> int:
+    """Load the resident index, keyword postings and scorer state up front.
+
+    The first recall otherwise pays for reading the snapshot, building the
+    indexes and (with a vector scorer) loading the model and record matrix.
+    Returns the number of records loaded.
+    """
+    if not _ENABLED:
+        return 0
+    store = _ensure_store()
+    scorer = _SCORER or KeywordScorer()
+    if isinstance(scorer, KeywordScorer):
+        items, _ = store.keyword_candidates("")
+    else:
+        items = store.read_all()
+        score_batch = getattr(scorer, "score_batch", None)
+        if callable(score_batch) and items:
+            score_batch("warm up", items, mode)
+    return len(items)
+
+
 def checkpoint() -> Dict[str, int]:
     if not _ENABLED:
         return {"version": "", "snapshot_count": 0, "compacted_from": 0}
     store = _ensure_store()
-    return store.checkpoint()
+    try:
+        return store.checkpoint()
+    finally:
+        # Usage promotion and decay rewrite priorities.
+        _bump_generation()
 
 
 def rollback(version: str) -> bool:
+    global _NOVELTY_INDEX
     if not _ENABLED:
         return False
     store = _ensure_store()
-    return bool(store.rollback(version))
+    ok = bool(store.rollback(version))
+    if ok:
+        # Rolled-back records must not keep gating new writes.
+        _NOVELTY_INDEX = None
+        _bump_generation()
+    return ok
 
 
 def list_versions() -> List[str]:
@@ -311,12 +665,63 @@ def list_versions() -> List[str]:
     return store.list_versions()
 
 
-def backfill_embeddings(limit: int = 0) -> Dict[str, int]:
+def _cursor_path(store: JSONLBrainStore):
+    return store.brain_dir / _BACKFILL_CURSOR_NAME
+
+
+def _load_backfill_cursor(store: JSONLBrainStore, scorer: VectorScorer, items: List[BrainRecord]) -> int:
+    """Return the saved resume position, or 0 if it no longer matches the store."""
+    path = _cursor_path(store)
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+        position = int(state.get("position", 0))
+    except (OSError, ValueError, TypeError, AttributeError):
+        return 0
+    if state.get("model") != scorer.model_name or state.get("dim") != scorer.dim:
+        return 0
+    # Checkpoint/rollback reorders records; only trust the cursor if the last
+    # processed record is still where we left it.
+    if position <= 0 or position > len(items) or items[position - 1].id != state.get("last_id"):
+        return 0
+    return position
+
+
+def _save_backfill_cursor(store: JSONLBrainStore, scorer: VectorScorer, position: int, last_id: str) -> None:
+    path = _cursor_path(store)
+    tmp = path.with_name(path.name + ".tmp")
+    state = {"position": position, "last_id": last_id, "model": scorer.model_name, "dim": scorer.dim}
+    tmp.write_text(json.dumps(state, ensure_ascii=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _clear_backfill_cursor(store: JSONLBrainStore) -> None:
+    try:
+        _cursor_path(store).unlink()
+    except OSError:
+        pass
+
+
+def backfill_embeddings(
+    limit: int = 0,
+    batch_size: int = 64,
+    workers: int = 1,
+    progress: Optional[Callable[[Dict[str, float]], None]] = None,
+    resume: bool = True,
+    yield_timeout: float = 5.0,
+) -> Dict[str, int]:
     """Backfill embeddings for existing records (best-effort).
 
     This only runs when a real sentence-transformers model is available.
-    It appends updated records with embeddings to the write-ahead log so that
-    checkpoint compaction can dedupe later.
+    Records are encoded `batch_size` at a time and each batch of updated
+    records is appended to the write-ahead log in one write, so that
+    checkpoint compaction can dedupe later. `workers` is passed to
+    `VectorScorer.embed_many` for the hashed fallback.
+
+    Progress is saved to `brain/backfill_cursor.json` after every batch; with
+    `resume`, an interrupted run continues from there. `progress` receives
+    counters plus `rate` (records/s) and `eta_seconds` after each batch.
+    Between batches the backfill waits up to `yield_timeout` seconds for
+    running `brain_retrieve` calls to finish.
     """
     if not _ENABLED:
         return {"scanned": 0, "updated": 0, "skipped": 0}
@@ -329,29 +734,61 @@ def backfill_embeddings(limit: int = 0) -> Dict[str, int]:
 
     store = _ensure_store()
     now = datetime.now(timezone.utc).isoformat()
+    batch_size = max(1, int(batch_size))
+
+    # Records appended by this run land past `total` and are not rescanned.
+    items = store.read_all()
+    total = len(items)
+    start = _load_backfill_cursor(store, scorer, items) if resume else 0
+    end = min(total, start + limit) if limit else total
+    # Superseded copies whose newer version already carries an embedding are
+    # left for checkpoint compaction to drop.
+    embedded = {rec.hash for rec in items if rec.hash and _has_current_embedding(rec, scorer)}
 
     scanned = 0
     updated = 0
     skipped = 0
-
-    for rec in store.read_all():
-        scanned += 1
-        meta = rec.metadata or {}
-        if (
-            isinstance(meta.get("embedding"), list)
-            and meta.get("embedding_model") == scorer.model_name
-            and meta.get("embedding_dim") == scorer.dim
-            and meta.get("embedding_kind") == "sentence-transformers"
-            and meta.get("embedding_hash") == rec.hash
-        ):
-            skipped += 1
+    started = time.monotonic()
+
+    for pos in range(start, end, batch_size):
+        batch = items[pos : min(end, pos + batch_size)]
+        pending = []
+        for rec in batch:
+            if rec.hash in embedded or _has_current_embedding(rec, scorer):
+                skipped += 1
+            else:
+                pending.append(rec)
+        scanned += len(batch)
+
+        if pending:
+            vecs = scorer.embed_many([scorer.record_text(rec) for rec in pending], batch_size=batch_size, workers=workers)
+            # Records are shared with the store's resident index; copy first.
+            store.write_many([_set_embedding(replace(rec, updated_at=now), scorer, vec) for rec, vec in zip(pending, vecs)])
+            updated += len(pending)
+            _bump_generation()
+
+        done = pos + len(batch)
+        if done >= total:
+            _clear_backfill_cursor(store)
         else:
-            rec.updated_at = now
-            rec = _maybe_attach_embedding(rec)
-            store.write(rec)
-            updated += 1
-
-        if limit and scanned >= limit:
-            break
+            _save_backfill_cursor(store, scorer, done, batch[-1].id)
+
+        if progress is not None:
+            elapsed = max(time.monotonic() - started, 1e-9)
+            rate = scanned / elapsed
+            progress(
+                {
+                    "scanned": scanned,
+                    "updated": updated,
+                    "skipped": skipped,
+                    "position": done,
+                    "total": total,
+                    "rate": rate,
+                    "eta_seconds": (end - done) / rate if rate > 0 else 0.0,
+                }
+            )
+
+        if done < end:
+            _FOREGROUND_IDLE.wait(timeout=max(0.0, float(yield_timeout)))
 
     return {"scanned": scanned, "updated": updated, "skipped": skipped}
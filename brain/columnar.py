@@ -0,0 +1,285 @@
+"""Binary columnar snapshot codec for the brain store.
+
+Layout (native byte order, recorded in the header)::
+
+    b"NXBSNAP1" | u64 header_len | header JSON | pad to 16 | sections...
+
+The header lists every section as ``[offset, length]`` from the start of the
+file. Sections:
+
+- ``embedding``: float32 block of ``count x dim`` (zero rows when missing),
+  plus ``has_embedding`` (u8 per record);
+- ``decay`` (f64) and ``ttl`` (i64, ``TTL_NONE`` for no TTL);
+- for each string column, ``<name>.offsets`` (u64, count + 1) and
+  ``<name>.data`` (UTF-8). ``tags`` and ``metadata`` are stored as JSON text;
+  ``metadata`` omits the embedding when it lives in the float32 block.
+
+The file is a derived cache of ``snapshot.jsonl``: the header keeps the JSONL
+file's size/mtime and readers fall back to JSONL when they no longer match.
+Embeddings in the float32 block round-trip at float32 precision.
+"""
+
+from __future__ import annotations
+
+from array import array
+import json
+import mmap
+import os
+from pathlib import Path
+import shutil
+import sys
+import tempfile
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .models import BrainRecord
+
+MAGIC = b"NXBSNAP1"
+FORMAT_VERSION = 1
+TTL_NONE = -(2**63)
+_ALIGN = 16
+STRING_COLUMNS = ("id", "kind", "priority", "source", "created_at", "updated_at", "content", "hash", "tags", "metadata")
+
+
+def source_signature(path: Path) -> Optional[Dict[str, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _iter_dicts(path: Path) -> Iterable[Dict[str, Any]]:
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def _embedding_dim(path: Path) -> int:
+    for item in _iter_dicts(path):
+        emb = (item.get("metadata") or {}).get("embedding")
+        if isinstance(emb, list) and emb:
+            return len(emb)
+    return 0
+
+
+def write_columnar(jsonl_path: Path, out_path: Path) -> int:
+    """Build `out_path` from a JSONL snapshot; returns the record count.
+
+    Column data is spooled to temp files so memory stays bounded by the
+    per-column offset arrays.
+    """
+    sig = source_signature(jsonl_path)
+    dim = _embedding_dim(jsonl_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(dir=str(out_path.parent), prefix="columnar-") as tmp_dir:
+        tmp = Path(tmp_dir)
+        names = ["embedding", "has_embedding", "decay", "ttl"] + [f"{c}.data" for c in STRING_COLUMNS]
+        spools = {name: (tmp / name.replace(".", "_")).open("wb") for name in names}
+        offsets = {c: array("Q", [0]) for c in STRING_COLUMNS}
+        zero_row = array("f", [0.0] * dim).tobytes()
+        count = 0
+        try:
+            for item in _iter_dicts(jsonl_path):
+                rec = BrainRecord.from_dict(item)
+                meta = dict(rec.metadata or {})
+                emb = meta.get("embedding")
+                if dim and isinstance(emb, list) and len(emb) == dim:
+                    spools["embedding"].write(array("f", [float(x) for x in emb]).tobytes())
+                    spools["has_embedding"].write(b"\x01")
+                    meta.pop("embedding")
+                else:
+                    spools["embedding"].write(zero_row)
+                    spools["has_embedding"].write(b"\x00")
+                spools["decay"].write(array("d", [float(rec.decay)]).tobytes())
+                ttl = TTL_NONE if rec.ttl_seconds is None else int(rec.ttl_seconds)
+                spools["ttl"].write(array("q", [ttl]).tobytes())
+
+                values = {
+                    "id": rec.id,
+                    "kind": rec.kind,
+                    "priority": rec.priority,
+                    "source": rec.source,
+                    "created_at": rec.created_at,
+                    "updated_at": rec.updated_at,
+                    "content": rec.content,
+                    "hash": rec.hash,
+                    "tags": json.dumps(rec.tags, ensure_ascii=False),
+                    "metadata": json.dumps(meta, ensure_ascii=False) if meta else "",
+                }
+                for col in STRING_COLUMNS:
+                    data = values[col].encode("utf-8")
+                    spools[f"{col}.data"].write(data)
+                    offsets[col].append(offsets[col][-1] + len(data))
+                count += 1
+        finally:
+            for f in spools.values():
+                f.close()
+
+        blobs: List[Tuple[str, Any]] = []
+        for name in ["embedding", "has_embedding", "decay", "ttl"]:
+            blobs.append((name, tmp / name.replace(".", "_")))
+        for col in STRING_COLUMNS:
+            blobs.append((f"{col}.offsets", offsets[col].tobytes()))
+            blobs.append((f"{col}.data", tmp / f"{col}_data"))
+
+        def _size(blob: Any) -> int:
+            return len(blob) if isinstance(blob, bytes) else blob.stat().st_size
+
+        # Header length depends on offsets, so lay out with a fixed-width guess
+        # and grow until it fits.
+        reserve = 4096
+        while True:
+            pos = _align(len(MAGIC) + 8 + reserve)
+            sections: Dict[str, List[int]] = {}
+            for name, blob in blobs:
+                size = _size(blob)
+                sections[name] = [pos, size]
+                pos = _align(pos + size)
+            header = json.dumps(
+                {
+                    "format": FORMAT_VERSION,
+                    "byteorder": sys.byteorder,
+                    "count": count,
+                    "dim": dim,
+                    "source": sig,
+                    "sections": sections,
+                }
+            ).encode("utf-8")
+            if len(header) <= reserve:
+                break
+            reserve *= 2
+
+        part_path = out_path.with_name(out_path.name + ".tmp")
+        with part_path.open("wb") as out:
+            out.write(MAGIC)
+            out.write(array("Q", [len(header)]).tobytes())
+            out.write(header)
+            for name, blob in blobs:
+                offset = sections[name][0]
+                out.write(b"\x00" * (offset - out.tell()))
+                if isinstance(blob, bytes):
+                    out.write(blob)
+                else:
+                    with blob.open("rb") as f:
+                        shutil.copyfileobj(f, out)
+        os.replace(part_path, out_path)
+    return count
+
+
+def _align(pos: int) -> int:
+    return (pos + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def read_columnar(path: Path, source_path: Optional[Path] = None) -> Optional[List[BrainRecord]]:
+    """Load records by memory-mapping `path`.
+
+    Returns None when the file is missing, malformed, written with another
+    byte order, or stale relative to `source_path` (the JSONL snapshot).
+    """
+    try:
+        f = path.open("rb")
+    except OSError:
+        return None
+    with f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            return _decode(mm, source_path)
+        finally:
+            mm.close()
+
+
+def _decode(mm: mmap.mmap, source_path: Optional[Path]) -> Optional[List[BrainRecord]]:
+    # Every view into the map is released before returning, so the caller can
+    # close it even when a truncated/corrupt file fails half-way through.
+    views: List[memoryview] = []
+    try:
+        return _decode_views(mm, source_path, views)
+    except (KeyError, IndexError, TypeError, ValueError, OverflowError):
+        # ValueError covers bad UTF-8/JSON and short or misaligned sections.
+        return None
+    finally:
+        for view in reversed(views):
+            view.release()
+
+
+def _decode_views(mm: mmap.mmap, source_path: Optional[Path], views: List[memoryview]) -> Optional[List[BrainRecord]]:
+    if mm[: len(MAGIC)] != MAGIC:
+        return None
+    header_len = array("Q", mm[len(MAGIC) : len(MAGIC) + 8])[0]
+    start = len(MAGIC) + 8
+    header = json.loads(mm[start : start + header_len].decode("utf-8"))
+    if header.get("format") != FORMAT_VERSION or header.get("byteorder") != sys.byteorder:
+        return None
+    if source_path is not None and header.get("source") != source_signature(source_path):
+        return None
+
+    count = int(header["count"])
+    dim = int(header["dim"])
+    sections = header["sections"]
+    mv = memoryview(mm)
+    views.append(mv)
+
+    def _section(name: str, fmt: str = "B") -> memoryview:
+        offset, length = sections[name]
+        if offset < 0 or length < 0 or offset + length > len(mv):
+            raise ValueError(f"section {name} out of bounds")
+        view = mv[offset : offset + length]
+        views.append(view)
+        if fmt != "B":
+            view = view.cast(fmt)
+            views.append(view)
+        return view
+
+    emb = _section("embedding", "f") if dim else None
+    has_emb = _section("has_embedding")
+    decay = _section("decay", "d")
+    ttl = _section("ttl", "q")
+    if len(has_emb) < count or len(decay) < count or len(ttl) < count or (emb is not None and len(emb) < count * dim):
+        return None
+    columns = {}
+    for col in STRING_COLUMNS:
+        columns[col] = (_section(f"{col}.offsets", "Q"), _section(f"{col}.data"))
+        if len(columns[col][0]) < count + 1:
+            return None
+
+    def _text(col: str, i: int) -> str:
+        offs, data = columns[col]
+        start, end = offs[i], offs[i + 1]
+        if start > end or end > len(data):
+            raise ValueError(f"{col} offsets out of bounds")
+        return str(data[start:end], "utf-8")
+
+    records: List[BrainRecord] = []
+    for i in range(count):
+        meta_text = _text("metadata", i)
+        meta = json.loads(meta_text) if meta_text else {}
+        if emb is not None and has_emb[i]:
+            meta["embedding"] = emb[i * dim : (i + 1) * dim].tolist()
+        ttl_val = ttl[i]
+        records.append(
+            BrainRecord(
+                id=_text("id", i),
+                kind=_text("kind", i),
+                priority=_text("priority", i),
+                source=_text("source", i),
+                created_at=_text("created_at", i),
+                updated_at=_text("updated_at", i),
+                tags=json.loads(_text("tags", i)),
+                ttl_seconds=None if ttl_val == TTL_NONE else ttl_val,
+                decay=decay[i],
+                content=_text("content", i),
+                metadata=meta,
+                hash=_text("hash", i),
+            )
+        )
+    return records
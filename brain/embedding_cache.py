@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from array import array
+from collections import OrderedDict
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+from typing import Dict, List, Optional
+
+
+def embedding_cache_key(model_name: str, dim: int, text: str, embedder: str) -> str:
+    """Content-hash key so the cache never holds the embedded text itself.
+
+    `embedder` names what produced the vector ("st" for the sentence-transformers
+    model, "hash" for the hashed fallback), so a persistent tier written while
+    the model was unavailable never serves fallback vectors to the model.
+    """
+    payload = f"{embedder}\x00{model_name}\x00{dim}\x00{text}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _vector_bytes(vec: List[float]) -> int:
+    # list object + one float object per element (approximate resident size)
+    return sys.getsizeof(vec) + 24 * len(vec)
+
+
+class EmbeddingCache:
+    """Size- and byte-bounded LRU cache for embeddings.
+
+    - Keys are content hashes (see `embedding_cache_key`).
+    - `max_entries` / `max_bytes` bound the in-memory tier; 0 disables a bound.
+    - `path` enables an optional SQLite tier that survives restarts. Evicted
+      entries stay on disk and are promoted back into memory on the next hit.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        path: Optional[str] = None,
+    ) -> None:
+        self.max_entries = max(0, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self.path = path
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            parent = os.path.dirname(path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB)")
+            self._db.commit()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vec = self._entries.get(key)
+            if vec is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vec
+
+            vec = self._disk_get(key)
+            if vec is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self._insert(key, vec)
+                return vec
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, vec: List[float]) -> None:
+        with self._lock:
+            self._insert(key, vec)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO embeddings(key, vec) VALUES (?, ?)",
+                        (key, array("f", vec).tobytes()),
+                    )
+                    self._db.commit()
+                except sqlite3.Error:
+                    pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "resident_bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_hits": self.disk_hits,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _insert(self, key: str, vec: List[float]) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= _vector_bytes(old)
+        self._entries[key] = vec
+        self._bytes += _vector_bytes(vec)
+        while self._entries and (
+            (self.max_entries and len(self._entries) > self.max_entries)
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= _vector_bytes(evicted)
+            self.evictions += 1
+
+    def _disk_get(self, key: str) -> Optional[List[float]]:
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute("SELECT vec FROM embeddings WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        vec = array("f")
+        vec.frombytes(row[0])
+        return vec.tolist()
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from concurrent.futures import Future
+import threading
+from typing import Any, Dict, List, Optional
+
+from .embedding_cache import EmbeddingCache, embedding_cache_key
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def normalize_model_name(model_name: str) -> str:
+    """`all-MiniLM-L6-v2` and `sentence-transformers/all-MiniLM-L6-v2` are the same model."""
+    name = (model_name or DEFAULT_MODEL).strip()
+    return name if "/" in name else f"sentence-transformers/{name}"
+
+
+class EmbeddingService:
+    """Process-wide sentence-transformers model plus a query embedding cache.
+
+    - The model is loaded once, on first use, and shared by every caller
+      (recall legs, brain scorer, archive search, warmup daemon).
+    - Concurrent requests for the same text are coalesced: one caller
+      encodes, the others wait for its result.
+    - `embed` returns None when sentence-transformers is unavailable so
+      callers keep their own fallback.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, cache_max_entries: int = 1024) -> None:
+        self.model_name = normalize_model_name(model_name)
+        self._cache = EmbeddingCache(max_entries=cache_max_entries, max_bytes=0)
+        self._model: Any = None
+        self._model_loaded = False
+        self._model_lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self.encodes = 0
+        self.coalesced = 0
+
+    def model(self) -> Any:
+        """Return the shared model, loading it on first call (None if unavailable)."""
+        if self._model_loaded:
+            return self._model
+        with self._model_lock:
+            if not self._model_loaded:
+                try:
+                    from sentence_transformers import SentenceTransformer
+
+                    self._model = SentenceTransformer(self.model_name)
+                except Exception:
+                    self._model = None
+                self._model_loaded = True
+        return self._model
+
+    def set_model(self, model: Any) -> None:
+        """Use an already-constructed model (e.g. one injected by a caller)."""
+        with self._model_lock:
+            self._model = model
+            self._model_loaded = True
+        self._cache.clear()
+
+    def available(self) -> bool:
+        return self.model() is not None
+
+    def warm_up(self) -> threading.Thread:
+        """Load the model on a daemon thread so the first recall does not pay for it."""
+        t = threading.Thread(target=self.model, name="embedding-warmup", daemon=True)
+        t.start()
+        return t
+
+    def embed(self, text: str) -> Optional[List[float]]:
+        key = embedding_cache_key(self.model_name, 0, text, "st")
+        vec = self._cache.get(key)
+        if vec is not None:
+            return vec
+
+        with self._inflight_lock:
+            # Re-check under the lock: a previous owner may have just finished.
+            vec = self._cache.get(key)
+            if vec is not None:
+                return vec
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = Future()
+                self._inflight[key] = pending
+            else:
+                self.coalesced += 1
+        if not owner:
+            return pending.result()
+
+        try:
+            vecs = self._encode([text])
+            vec = vecs[0] if vecs else None
+            if vec is not None:
+                self._cache.put(key, vec)
+            pending.set_result(vec)
+            return vec
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def embed_many(self, texts: List[str], cache: bool = True) -> Optional[List[List[float]]]:
+        """Embed `texts` in one encode call (cache hits are not re-encoded).
+
+        Pass `cache=False` for bulk document text: it is encoded without
+        touching the query cache, so ingest does not evict hot query vectors.
+        """
+        if not cache:
+            return self._encode(list(texts)) if texts else []
+        keys = [embedding_cache_key(self.model_name, 0, text, "st") for text in texts]
+        out: List[Optional[List[float]]] = [self._cache.get(key) for key in keys]
+        missing = [i for i, vec in enumerate(out) if vec is None]
+        if missing:
+            vecs = self._encode([texts[i] for i in missing])
+            if vecs is None:
+                return None
+            for i, vec in zip(missing, vecs):
+                self._cache.put(keys[i], vec)
+                out[i] = vec
+        return [vec for vec in out if vec is not None]
+
+    def _encode(self, texts: List[str]) -> Optional[List[List[float]]]:
+        model = self.model()
+        if model is None:
+            return None
+        self.encodes += 1
+        emb = model.encode(texts, normalize_embeddings=True)
+        return [[float(x) for x in row.tolist()] for row in emb]
+
+    def stats(self) -> Dict[str, int]:
+        out = dict(self._cache.stats())
+        out["encodes"] = self.encodes
+        out["coalesced"] = self.coalesced
+        return out
+
+
+_SERVICES: Dict[str, EmbeddingService] = {}
+_SERVICES_LOCK = threading.Lock()
+
+
+def get_embedding_service(model_name: str = DEFAULT_MODEL) -> EmbeddingService:
+    """Return the process-wide service for `model_name`."""
+    name = normalize_model_name(model_name)
+    with _SERVICES_LOCK:
+        service = _SERVICES.get(name)
+        if service is None:
+            service = EmbeddingService(name)
+            _SERVICES[name] = service
+        return service
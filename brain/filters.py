@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from .models import BrainRecord
+
+# Structured recall filters shared by the brain store and the vector leg:
+#   tags            str | [str]  any-of match
+#   type            str | [str]  record kind / document `type` metadata
+#   conversation_id str
+#   date_from       ISO date or datetime, inclusive (on created_at)
+#   date_to         ISO date or datetime, inclusive (on created_at)
+#   priority        str | [str]  P0/P1/P2
+FILTER_KEYS = ("tags", "type", "conversation_id", "date_from", "date_to", "priority")
+
+
+def _as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(v).strip() for v in value if str(v).strip()]
+
+
+def normalize_filters(filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Drop empty entries and normalize list-valued keys; unknown keys raise ValueError."""
+    if not filters:
+        return {}
+    unknown = set(filters) - set(FILTER_KEYS)
+    if unknown:
+        raise ValueError(f"unknown recall filter(s): {', '.join(sorted(unknown))}")
+    out: Dict[str, Any] = {}
+    for key in ("tags", "type", "priority"):
+        values = list(dict.fromkeys(_as_list(filters.get(key))))
+        if values:
+            out[key] = values
+    for key in ("conversation_id", "date_from", "date_to"):
+        value = filters.get(key)
+        if value not in (None, ""):
+            out[key] = str(value).strip()
+    return out
+
+
+def in_date_range(created_at: str, date_from: Optional[str], date_to: Optional[str]) -> bool:
+    # Compare on the bound's own precision, so date_to="2026-02-05" keeps
+    # everything created that day.
+    created_at = created_at or ""
+    if date_from and created_at[: len(date_from)] < date_from:
+        return False
+    if date_to and created_at[: len(date_to)] > date_to:
+        return False
+    return True
+
+
+def record_matches(record: BrainRecord, filters: Dict[str, Any]) -> bool:
+    """True when `record` passes normalized `filters` (see `normalize_filters`)."""
+    if not filters:
+        return True
+    tags = filters.get("tags")
+    # Brain tags are stored lowercased.
+    if tags and not {t.lower() for t in tags} & set(record.tags):
+        return False
+    kinds = filters.get("type")
+    if kinds and (record.kind or "").strip().lower() not in {k.lower() for k in kinds}:
+        return False
+    priorities = filters.get("priority")
+    if priorities and record.priority not in priorities:
+        return False
+    conversation_id = filters.get("conversation_id")
+    if conversation_id and str((record.metadata or {}).get("conversation_id", "")) != conversation_id:
+        return False
+    return in_date_range(record.created_at, filters.get("date_from"), filters.get("date_to"))
@@ -1,17 +1,37 @@
 from __future__ import annotations
 
 import os
-from typing import Optional, List, Dict
+from typing import Iterable, Optional, List, Dict
 
-from .graph_store import GraphStore
+from .graph_cache import AdjacencyCache
+from .graph_store import GraphStore, _utcnow, expand
 
 _GRAPH: Optional[GraphStore] = None
 _GRAPH_ENABLED: bool = False
+_CACHE: AdjacencyCache = AdjacencyCache(max_entities=0)
 
 
-def configure_graph(enabled: bool, base_path: str, db_path: Optional[str] = None) -> None:
-    global _GRAPH, _GRAPH_ENABLED
+def configure_graph(
+    enabled: bool,
+    base_path: str,
+    db_path: Optional[str] = None,
+    max_evidence: int = 5,
+    cache_max_entities: int = 256,
+    cache_max_edges: int = 20000,
+    cache_edges_per_entity: int = 64,
+    cache_evidence: int = 2,
+    cache_sync_interval_ms: int = 250,
+) -> None:
+    """Open the graph store; `cache_max_entities=0` disables the adjacency cache.
+
+    `cache_sync_interval_ms` bounds how long writes from other processes can
+    go unnoticed by the cache.
+    """
+    global _GRAPH, _GRAPH_ENABLED, _CACHE
+    if _GRAPH is not None:
+        _GRAPH.close()
     _GRAPH_ENABLED = bool(enabled)
+    _CACHE = AdjacencyCache(max_entities=0)
     if not _GRAPH_ENABLED:
         _GRAPH = None
         return
@@ -19,7 +39,49 @@ def configure_graph(enabled: bool, base_path: str, db_path: Optional[str] = None
         path = db_path
     else:
         path = os.path.join(base_path, "brain", "graph.sqlite3")
-    _GRAPH = GraphStore(path)
+    _GRAPH = GraphStore(path, max_evidence=max_evidence)
+    _CACHE = AdjacencyCache(
+        max_entities=cache_max_entities,
+        max_edges=cache_max_edges,
+        max_edges_per_entity=cache_edges_per_entity,
+        evidence_limit=min(cache_evidence, max_evidence),
+        sync_interval=max(0, int(cache_sync_interval_ms)) / 1000.0,
+    )
+
+
+def graph_cache_stats() -> Dict:
+    """Adjacency cache counters (hits/misses/bypassed/evictions/write_through/invalidations)."""
+    return _CACHE.stats()
+
+
+def _cached_adjacency(entities: List[str], evidence_limit: int) -> Optional[Dict[str, List[Dict]]]:
+    """Adjacency for `entities` via the cache, loading misses in one go.
+
+    Returns None when the cache can't answer (disabled, deeper evidence
+    than cached, or an entity with too many edges to cache).
+    """
+    if not _CACHE.enabled or evidence_limit > _CACHE.evidence_limit:
+        return None
+    # Catches writes from other processes, e.g. scripts/graph_compact.py; at
+    # most once per sync interval, and skipped while an in-process write holds
+    # the writer rather than waiting for it.
+    if _CACHE.sync_due():
+        version = _GRAPH.data_version(wait=False)
+        if version is not None:
+            _CACHE.sync(version)
+    found, missing = _CACHE.get_many(entities, evidence_limit)
+    if missing:
+        generation = _CACHE.generation
+        loaded = _GRAPH.adjacency(
+            missing, max_edges=_CACHE.max_edges_per_entity, evidence_limit=_CACHE.evidence_limit
+        )
+        _CACHE.put_many(loaded, generation)
+        for entity in missing:
+            edges = loaded.get(entity)
+            if edges is None:
+                return None
+            found[entity] = [dict(e, evidence=list(e.get("evidence") or [])[:evidence_limit]) for e in edges]
+    return found
 
 
 def graph_add_edge(
@@ -36,17 +98,33 @@ def graph_add_edge(
 ) -> Optional[int]:
     if not _GRAPH_ENABLED or _GRAPH is None:
         return None
-    return _GRAPH.add_edge(
-        subj=subj,
-        rel=rel,
-        obj=obj,
-        weight=weight,
-        source=source,
-        evidence_text=evidence_text,
-        conversation_id=conversation_id,
-        round_num=round_num,
-        entity_types=entity_types,
-    )
+    return graph_add_edges_batch(
+        [
+            {
+                "subj": subj,
+                "rel": rel,
+                "obj": obj,
+                "weight": weight,
+                "source": source,
+                "evidence_text": evidence_text,
+                "conversation_id": conversation_id,
+                "round_num": round_num,
+                "entity_types": entity_types,
+            }
+        ]
+    )[0]
+
+
+def graph_add_edges_batch(edges: List[Dict]) -> List[Optional[int]]:
+    """Add many edges (dicts of `graph_add_edge` arguments) in one transaction."""
+    if not _GRAPH_ENABLED or _GRAPH is None:
+        return [None] * len(edges)
+    ids = _GRAPH.add_edges_batch(edges)
+    if _CACHE.enabled:
+        now = _utcnow()
+        for edge, edge_id in zip(edges, ids):
+            _CACHE.apply_write(edge, edge_id, now)
+    return ids
 
 
 def graph_query(
@@ -70,8 +148,61 @@ def graph_related(entity: str, limit: int = 20) -> List[Dict]:
 def graph_related_with_evidence(entity: str, limit: int = 20, evidence_limit: int = 1) -> List[Dict]:
     if not _GRAPH_ENABLED or _GRAPH is None:
         return []
+    cached = _cached_adjacency([entity], evidence_limit) if entity else None
+    if cached is not None:
+        # Cached adjacency is kept newest first, like GraphStore.related.
+        return cached[entity][: int(limit)]
     edges = _GRAPH.related(entity, limit=limit)
+    evidence = _GRAPH.evidence_for_edges([edge.get("id") for edge in edges], limit=evidence_limit)
     for edge in edges:
-        edge_id = edge.get("id")
-        edge["evidence"] = _GRAPH.evidence_for_edge(edge_id, limit=evidence_limit)
+        edge["evidence"] = evidence.get(edge.get("id"), [])
     return edges
+
+
+def graph_traverse_with_evidence(
+    seeds: Iterable[str],
+    *,
+    hops: int = 1,
+    limit: int = 20,
+    fanout: int = 10,
+    min_weight: float = 0.0,
+    evidence_limit: int = 1,
+) -> List[Dict]:
+    """k-hop neighbourhood of several seeds plus evidence (see GraphStore.traverse).
+
+    Served from the adjacency cache when every entity reached is cacheable;
+    otherwise runs the SQL traversal.
+    """
+    if not _GRAPH_ENABLED or _GRAPH is None:
+        return []
+    if _CACHE.enabled and evidence_limit <= _CACHE.evidence_limit:
+
+        class _Uncacheable(Exception):
+            pass
+
+        def _fetch(frontier: List[str]) -> List[Dict]:
+            adjacency = _cached_adjacency(frontier, evidence_limit)
+            if adjacency is None:
+                raise _Uncacheable()
+            reached = []
+            for entity, edges in adjacency.items():
+                for edge in edges:
+                    if (edge.get("weight") or 0.0) >= min_weight:
+                        edge["via"] = entity
+                        if evidence_limit <= 0:
+                            edge.pop("evidence", None)
+                        reached.append(edge)
+            return reached
+
+        try:
+            return expand(seeds, _fetch, hops=hops, limit=limit, fanout=fanout)
+        except _Uncacheable:
+            pass
+    return _GRAPH.traverse(
+        seeds,
+        hops=hops,
+        limit=limit,
+        fanout=fanout,
+        min_weight=min_weight,
+        evidence_limit=evidence_limit,
+    )
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def _copy_edge(edge: Dict[str, Any], evidence_limit: int) -> Dict[str, Any]:
+    out = dict(edge)
+    out["evidence"] = [dict(ev) for ev in (edge.get("evidence") or [])[:evidence_limit]]
+    return out
+
+
+class AdjacencyCache:
+    """LRU of hot entities' full adjacency (edges newest first + top evidence).
+
+    Bounded by entity count and total cached edges. Entities with more than
+    `max_edges_per_entity` edges are never cached (callers go to SQLite).
+    Writes are applied in place to cached endpoints (write-through); a load
+    that raced with a write is discarded rather than cached stale. Changes
+    made by other connections are caught by `sync`, which drops everything
+    when the database's data_version moves; callers check it at most once
+    per `sync_interval` seconds (`sync_due`).
+    """
+
+    def __init__(
+        self,
+        max_entities: int = 256,
+        max_edges: int = 20000,
+        max_edges_per_entity: int = 64,
+        evidence_limit: int = 2,
+        sync_interval: float = 0.25,
+    ) -> None:
+        self.max_entities = max(0, int(max_entities))
+        self.max_edges = max(0, int(max_edges))
+        self.max_edges_per_entity = max(1, int(max_edges_per_entity))
+        self.evidence_limit = max(0, int(evidence_limit))
+        self.sync_interval = max(0.0, float(sync_interval))
+        self._synced_at: Optional[float] = None
+        self._entries: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._edges = 0
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.data_version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.write_through = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entities > 0
+
+    def sync_due(self) -> bool:
+        synced_at = self._synced_at
+        return synced_at is None or time.monotonic() - synced_at >= self.sync_interval
+
+    def sync(self, data_version: int) -> None:
+        """Clear the cache if another connection committed since the last sync."""
+        with self._lock:
+            self._synced_at = time.monotonic()
+            if data_version == self.data_version:
+                return
+            if self.data_version is not None and self._entries:
+                self.invalidations += 1
+            self.data_version = data_version
+            self._entries.clear()
+            self._edges = 0
+            self.generation += 1
+
+    def get_many(self, entities: Iterable[str], evidence_limit: int) -> Tuple[Dict[str, List[Dict]], List[str]]:
+        """Copies of cached adjacency for `entities`, plus the ones that missed."""
+        found: Dict[str, List[Dict]] = {}
+        missing: List[str] = []
+        with self._lock:
+            for entity in dict.fromkeys(entities):
+                edges = self._entries.get(entity)
+                if edges is None:
+                    self.misses += 1
+                    missing.append(entity)
+                    continue
+                self.hits += 1
+                self._entries.move_to_end(entity)
+                found[entity] = [_copy_edge(e, evidence_limit) for e in edges]
+        return found, missing
+
+    def put_many(self, adjacency: Dict[str, Optional[List[Dict]]], generation: int) -> None:
+        """Cache loaded adjacency; None (too many edges) is counted and skipped."""
+        with self._lock:
+            for entity, edges in adjacency.items():
+                if edges is None:
+                    self.bypassed += 1
+                    continue
+                if generation != self.generation or not self.enabled:
+                    continue
+                self._drop(entity)
+                self._entries[entity] = [_copy_edge(e, self.evidence_limit) for e in edges]
+                self._edges += len(edges)
+            self._evict()
+
+    def apply_write(self, edge: Dict[str, Any], edge_id: Optional[int], now: str) -> None:
+        """Mirror GraphStore's upsert of `edge` into cached endpoints."""
+        if edge_id is None:
+            return
+        with self._lock:
+            self.generation += 1
+            for entity in dict.fromkeys((edge["subj"], edge["obj"])):
+                edges = self._entries.get(entity)
+                if edges is None:
+                    continue
+                self.write_through += 1
+                self._entries.move_to_end(entity)
+                pos = next((i for i, e in enumerate(edges) if e["id"] == edge_id), None)
+                if pos is None:
+                    cached = {
+                        "id": edge_id,
+                        "subj": edge["subj"],
+                        "rel": edge["rel"],
+                        "obj": edge["obj"],
+                        "weight": 0.0,
+                        "created_at": now,
+                        "hits": 0,
+                        "evidence": [],
+                    }
+                    self._edges += 1
+                else:
+                    cached = edges.pop(pos)
+                cached["weight"] = (cached.get("weight") or 0.0) + float(edge.get("weight", 1.0))
+                cached["hits"] = (cached.get("hits") or 0) + 1
+                cached["source"] = edge.get("source", "")
+                cached["conversation_id"] = edge.get("conversation_id", "")
+                cached["round_num"] = int(edge.get("round_num", 0))
+                cached["updated_at"] = now
+                edges.insert(0, cached)
+                text = edge.get("evidence_text")
+                if text and self.evidence_limit and all(ev.get("text") != text for ev in cached["evidence"]):
+                    if len(cached["evidence"]) >= self.evidence_limit:
+                        # SQLite may already hold this text below the cached
+                        # window, where it stays; only a reload can tell.
+                        self._drop(entity)
+                        continue
+                    ev = {"id": None, "text": text, "source": edge.get("source", ""), "created_at": now}
+                    cached["evidence"] = [ev] + cached["evidence"]
+                if len(edges) > self.max_edges_per_entity:
+                    self._drop(entity)
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._edges = 0
+            self.generation += 1
+
+    def _drop(self, entity: str) -> None:
+        edges = self._entries.pop(entity, None)
+        if edges is not None:
+            self._edges -= len(edges)
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entities or self._edges > self.max_edges):
+            _, edges = self._entries.popitem(last=False)
+            self._edges -= len(edges)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entities": len(self._entries),
+                "edges": self._edges,
+                "max_entities": self.max_entities,
+                "max_edges": self.max_edges,
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "evictions": self.evictions,
+                "write_through": self.write_through,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -1,27 +1,164 @@
 from __future__ import annotations
 
+import logging
 import os
 import sqlite3
+import threading
+import weakref
 from datetime import datetime, timezone
-from typing import Iterable, List, Optional, Dict
+from typing import Any, Callable, Iterable, List, Optional, Dict
 
 
 def _utcnow() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+logger = logging.getLogger(__name__)
+
+# Same (subj, rel, obj) again: accumulate weight and hits, keep the latest provenance.
+_EDGE_UPSERT = """
+    INSERT INTO edges(subj, rel, obj, weight, source, conversation_id, round_num, created_at, hits, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, ?)
+    ON CONFLICT(subj, rel, obj) DO UPDATE SET
+        weight = weight + excluded.weight,
+        hits = hits + 1,
+        source = excluded.source,
+        conversation_id = excluded.conversation_id,
+        round_num = excluded.round_num,
+        updated_at = excluded.updated_at
+"""
+_EDGE_INSERT = """
+    INSERT INTO edges(subj, rel, obj, weight, source, conversation_id, round_num, created_at, hits, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, ?)
+"""
+_EDGE_BUMP = """
+    UPDATE edges SET weight = weight + ?, hits = hits + 1, source = ?, conversation_id = ?, round_num = ?, updated_at = ?
+    WHERE id = ?
+"""
+_EDGE_ID = "SELECT MAX(id) FROM edges WHERE subj = ? AND rel = ? AND obj = ?"
+_ENTITY_INSERT = "INSERT OR IGNORE INTO entities(name, type, created_at) VALUES (?, ?, ?)"
+# Repeated evidence text for an edge is stored once.
+_EVIDENCE_INSERT = """
+    INSERT INTO evidence(edge_id, text, source, created_at)
+    SELECT ?, ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM evidence WHERE edge_id = ? AND text = ?)
+"""
+_EVIDENCE_TRIM = """
+    DELETE FROM evidence WHERE edge_id = ? AND id NOT IN (
+        SELECT id FROM evidence WHERE edge_id = ? ORDER BY id DESC LIMIT ?
+    )
+"""
+_EDGE_FIELDS = (
+    "id", "subj", "rel", "obj", "weight", "source", "conversation_id", "round_num", "created_at", "hits", "updated_at",
+)
+# Upserted edges keep their first id; recency is the last time they were seen.
+_RECENT_FIRST = "COALESCE(updated_at, created_at) DESC, id DESC"
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER on older builds is 999.
+_MAX_PARAMS = 400
+
+
+def _chunks(items: List, size: int = _MAX_PARAMS) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _close_quietly(conn: sqlite3.Connection) -> None:
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+
+class _Reader:
+    """A thread's read connection, closed once the thread-local drops it."""
+
+    __slots__ = ("conn", "close", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.close = weakref.finalize(self, _close_quietly, conn)
+
+
 class GraphStore:
-    def __init__(self, db_path: str):
+    """SQLite entity/edge/evidence store.
+
+    Each thread reuses one connection for reads (pragmas applied once,
+    statements kept in sqlite3's per-connection statement cache); it is held
+    only by the thread-local, so it is closed when its thread exits. Writes go
+    through a single writer connection, serialized by a lock (SQLite takes one
+    writer at a time anyway). `close()` closes them all.
+
+    Edges are unique per (subj, rel, obj): re-adding one accumulates its
+    weight and hit count and keeps at most `max_evidence` evidence rows.
+    Databases written before that constraint existed keep working (the
+    latest duplicate is updated) until `compact_edges()` merges them.
+    """
+
+    def __init__(self, db_path: str, max_evidence: int = 5):
         self.db_path = db_path
+        self.max_evidence = max(1, int(max_evidence))
+        self.needs_compaction = False
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._local = threading.local()
+        self._readers: "weakref.WeakSet[_Reader]" = weakref.WeakSet()
+        self._writer_conn: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.RLock()
+        self._pid = os.getpid()
         self._init_db()
 
-    def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
+    def _open(self) -> sqlite3.Connection:
+        # check_same_thread=False: close() may run on another thread.
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
         conn.execute("PRAGMA journal_mode=WAL")
         conn.execute("PRAGMA synchronous=NORMAL")
         return conn
 
+    def _check_fork(self) -> None:
+        if self._pid != os.getpid():
+            # Forked: the parent's connections must not be used here.
+            self._local = threading.local()
+            self._readers = weakref.WeakSet()
+            self._writer_conn = None
+            self._pid = os.getpid()
+
+    def _connect(self) -> sqlite3.Connection:
+        self._check_fork()
+        reader = getattr(self._local, "reader", None)
+        if reader is None:
+            reader = self._local.reader = _Reader(self._open())
+            self._readers.add(reader)
+        return reader.conn
+
+    def _writer(self) -> sqlite3.Connection:
+        """The shared write connection; callers hold `_write_lock`."""
+        self._check_fork()
+        if self._writer_conn is None:
+            self._writer_conn = self._open()
+        return self._writer_conn
+
+    def data_version(self, wait: bool = True) -> Optional[int]:
+        """`PRAGMA data_version` of the writer connection.
+
+        It changes only when some other connection commits - another process
+        (e.g. `scripts/graph_compact.py`) or a direct SQLite edit - never for
+        this store's own writes. With `wait=False`, returns None instead of
+        queueing behind a write in progress.
+        """
+        if not self._write_lock.acquire(blocking=wait):
+            return None
+        try:
+            return int(self._writer().execute("PRAGMA data_version").fetchone()[0])
+        finally:
+            self._write_lock.release()
+
+    def close(self) -> None:
+        readers, self._readers = list(self._readers), weakref.WeakSet()
+        for reader in readers:
+            reader.close()
+        writer, self._writer_conn = self._writer_conn, None
+        if writer is not None:
+            _close_quietly(writer)
+        self._local = threading.local()
+
     def _init_db(self) -> None:
         with self._connect() as conn:
             conn.executescript(
@@ -53,17 +190,49 @@ class GraphStore:
                 CREATE INDEX IF NOT EXISTS idx_edges_subj ON edges(subj);
                 CREATE INDEX IF NOT EXISTS idx_edges_obj ON edges(obj);
                 CREATE INDEX IF NOT EXISTS idx_edges_rel ON edges(rel);
+                CREATE INDEX IF NOT EXISTS idx_evidence_edge ON evidence(edge_id);
                 """
             )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(edges)")}
+            if "hits" not in columns:
+                conn.execute("ALTER TABLE edges ADD COLUMN hits INTEGER NOT NULL DEFAULT 1")
+            if "updated_at" not in columns:
+                conn.execute("ALTER TABLE edges ADD COLUMN updated_at TEXT")
+        self._ensure_unique_index()
 
-    def _ensure_entity(self, name: str, entity_type: Optional[str] = None) -> None:
-        if not name:
-            return
-        with self._connect() as conn:
-            conn.execute(
-                "INSERT OR IGNORE INTO entities(name, type, created_at) VALUES (?, ?, ?)",
-                (name, entity_type or "unknown", _utcnow()),
+    def _ensure_unique_index(self) -> bool:
+        try:
+            with self._write_lock, self._writer() as conn:
+                conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_edges_triple ON edges(subj, rel, obj)")
+            self.needs_compaction = False
+        except sqlite3.IntegrityError:
+            logger.warning(
+                f"{self.db_path} has duplicate edges; run "
+                "`python -m deepsea_nexus.scripts.graph_compact` to merge them"
             )
+            self.needs_compaction = True
+        return not self.needs_compaction
+
+    @staticmethod
+    def _ensure_entities(conn: sqlite3.Connection, entities: Iterable[tuple]) -> None:
+        now = _utcnow()
+        conn.executemany(
+            _ENTITY_INSERT,
+            [(name, entity_type or "unknown", now) for name, entity_type in entities if name],
+        )
+
+    def _upsert_edge(self, conn: sqlite3.Connection, edge: Dict[str, Any], now: str) -> int:
+        triple = (edge["subj"], edge["rel"], edge["obj"])
+        weight = float(edge.get("weight", 1.0))
+        provenance = (edge.get("source", ""), edge.get("conversation_id", ""), int(edge.get("round_num", 0)))
+        if not self.needs_compaction:
+            conn.execute(_EDGE_UPSERT, (*triple, weight, *provenance, now, now))
+            return conn.execute(_EDGE_ID, triple).fetchone()[0]
+        existing = conn.execute(_EDGE_ID, triple).fetchone()[0]
+        if existing is not None:
+            conn.execute(_EDGE_BUMP, (weight, *provenance, now, existing))
+            return existing
+        return conn.execute(_EDGE_INSERT, (*triple, weight, *provenance, now, now)).lastrowid
 
     def add_edge(
         self,
@@ -80,25 +249,112 @@ class GraphStore:
     ) -> Optional[int]:
         if not (subj and rel and obj):
             return None
-        entity_types = entity_types or {}
-        self._ensure_entity(subj, entity_types.get("subj"))
-        self._ensure_entity(obj, entity_types.get("obj"))
+        ids = self.add_edges_batch(
+            [
+                {
+                    "subj": subj,
+                    "rel": rel,
+                    "obj": obj,
+                    "weight": weight,
+                    "source": source,
+                    "evidence_text": evidence_text,
+                    "conversation_id": conversation_id,
+                    "round_num": round_num,
+                    "entity_types": entity_types,
+                }
+            ]
+        )
+        return ids[0]
 
-        with self._connect() as conn:
-            cur = conn.execute(
+    def add_edges_batch(self, edges: Iterable[Dict[str, Any]]) -> List[Optional[int]]:
+        """Insert entities, edges and evidence for many edges in one transaction.
+
+        Each edge dict takes the `add_edge` keyword arguments. Returns one
+        edge id per input (None for edges missing subj/rel/obj).
+        """
+        edges = list(edges)
+        ids: List[Optional[int]] = [None] * len(edges)
+        valid = [(i, e) for i, e in enumerate(edges) if e.get("subj") and e.get("rel") and e.get("obj")]
+        if not valid:
+            return ids
+        now = _utcnow()
+        entities = {}
+        for _, edge in valid:
+            types = edge.get("entity_types") or {}
+            entities.setdefault(edge["subj"], types.get("subj"))
+            entities.setdefault(edge["obj"], types.get("obj"))
+        with self._write_lock, self._writer() as conn:
+            self._ensure_entities(conn, entities.items())
+            evidence = []
+            for i, edge in valid:
+                ids[i] = self._upsert_edge(conn, edge, now)
+                text = edge.get("evidence_text")
+                if text:
+                    evidence.append((ids[i], text, edge.get("source", ""), now, ids[i], text))
+            if evidence:
+                conn.executemany(_EVIDENCE_INSERT, evidence)
+                touched = sorted({row[0] for row in evidence})
+                conn.executemany(_EVIDENCE_TRIM, [(e, e, self.max_evidence) for e in touched])
+        return ids
+
+    def compact_edges(self) -> Dict[str, int]:
+        """Merge duplicate (subj, rel, obj) edges and add the unique constraint.
+
+        One-time migration for databases from before edges were upserted:
+        weights and hit counts are summed into the oldest row, evidence is
+        re-pointed to it, de-duplicated and trimmed to `max_evidence`.
+        """
+        with self._write_lock, self._writer() as conn:
+            edges_before = conn.execute("SELECT COUNT(*) FROM edges").fetchone()[0]
+            evidence_before = conn.execute("SELECT COUNT(*) FROM evidence").fetchone()[0]
+            groups = conn.execute(
                 """
-                INSERT INTO edges(subj, rel, obj, weight, source, conversation_id, round_num, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (subj, rel, obj, float(weight), source, conversation_id, int(round_num), _utcnow()),
-            )
-            edge_id = cur.lastrowid
-            if evidence_text:
+                SELECT subj, rel, obj, MIN(id), MAX(id), SUM(weight), SUM(COALESCE(hits, 1)),
+                       MIN(created_at), MAX(COALESCE(updated_at, created_at))
+                FROM edges GROUP BY subj, rel, obj HAVING COUNT(*) > 1
+                """
+            ).fetchall()
+            for subj, rel, obj, keep, latest, weight, hits, created_at, updated_at in groups:
+                triple = (subj, rel, obj)
+                conn.execute(
+                    """
+                    UPDATE evidence SET edge_id = ? WHERE edge_id IN (
+                        SELECT id FROM edges WHERE subj = ? AND rel = ? AND obj = ? AND id != ?
+                    )
+                    """,
+                    (keep, *triple, keep),
+                )
                 conn.execute(
-                    "INSERT INTO evidence(edge_id, text, source, created_at) VALUES (?, ?, ?, ?)",
-                    (edge_id, evidence_text, source, _utcnow()),
+                    """
+                    UPDATE edges SET weight = ?, hits = ?, created_at = ?, updated_at = ?,
+                        source = (SELECT source FROM edges WHERE id = ?),
+                        conversation_id = (SELECT conversation_id FROM edges WHERE id = ?),
+                        round_num = (SELECT round_num FROM edges WHERE id = ?)
+                    WHERE id = ?
+                    """,
+                    (weight, hits, created_at, updated_at, latest, latest, latest, keep),
                 )
-        return edge_id
+                conn.execute("DELETE FROM edges WHERE subj = ? AND rel = ? AND obj = ? AND id != ?", (*triple, keep))
+            conn.execute("DELETE FROM evidence WHERE id NOT IN (SELECT MAX(id) FROM evidence GROUP BY edge_id, text)")
+            conn.execute(
+                """
+                DELETE FROM evidence WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (PARTITION BY edge_id ORDER BY id DESC) AS rn FROM evidence
+                    ) WHERE rn > ?
+                )
+                """,
+                (self.max_evidence,),
+            )
+            edges_after = conn.execute("SELECT COUNT(*) FROM edges").fetchone()[0]
+            evidence_after = conn.execute("SELECT COUNT(*) FROM evidence").fetchone()[0]
+        self._ensure_unique_index()
+        return {
+            "edges_before": edges_before,
+            "edges_after": edges_after,
+            "merged_groups": len(groups),
+            "evidence_removed": evidence_before - evidence_after,
+        }
 
     def query_edges(
         self,
@@ -120,26 +376,11 @@ class GraphStore:
             clauses.append("rel = ?")
             params.append(rel)
         where = " AND ".join(clauses) if clauses else "1=1"
-        sql = f"SELECT id, subj, rel, obj, weight, source, conversation_id, round_num, created_at FROM edges WHERE {where} ORDER BY id DESC LIMIT ?"
+        sql = f"SELECT {', '.join(_EDGE_FIELDS)} FROM edges WHERE {where} ORDER BY {_RECENT_FIRST} LIMIT ?"
         params.append(int(limit))
         with self._connect() as conn:
             rows = conn.execute(sql, params).fetchall()
-        out = []
-        for r in rows:
-            out.append(
-                {
-                    "id": r[0],
-                    "subj": r[1],
-                    "rel": r[2],
-                    "obj": r[3],
-                    "weight": r[4],
-                    "source": r[5],
-                    "conversation_id": r[6],
-                    "round_num": r[7],
-                    "created_at": r[8],
-                }
-            )
-        return out
+        return [dict(zip(_EDGE_FIELDS, r)) for r in rows]
 
     def evidence_for_edge(self, edge_id: int, limit: int = 1) -> List[Dict]:
         if not edge_id:
@@ -159,28 +400,193 @@ class GraphStore:
             return []
         with self._connect() as conn:
             rows = conn.execute(
-                """
-                SELECT id, subj, rel, obj, weight, source, conversation_id, round_num, created_at
+                f"""
+                SELECT {', '.join(_EDGE_FIELDS)}
                 FROM edges
                 WHERE subj = ? OR obj = ?
-                ORDER BY id DESC
+                ORDER BY {_RECENT_FIRST}
                 LIMIT ?
                 """,
                 (entity, entity, int(limit)),
             ).fetchall()
-        out = []
-        for r in rows:
-            out.append(
-                {
-                    "id": r[0],
-                    "subj": r[1],
-                    "rel": r[2],
-                    "obj": r[3],
-                    "weight": r[4],
-                    "source": r[5],
-                    "conversation_id": r[6],
-                    "round_num": r[7],
-                    "created_at": r[8],
-                }
-            )
+        return [dict(zip(_EDGE_FIELDS, r)) for r in rows]
+
+    def evidence_for_edges(self, edge_ids: Iterable[int], limit: int = 1) -> Dict[int, List[Dict]]:
+        """Latest `limit` evidence rows for each edge id, fetched in one query per 400 ids."""
+        ids = sorted({int(i) for i in edge_ids if i})
+        out: Dict[int, List[Dict]] = {i: [] for i in ids}
+        if not ids or limit <= 0:
+            return out
+        conn = self._connect()
+        for chunk in _chunks(ids):
+            marks = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"""
+                SELECT edge_id, id, text, source, created_at FROM (
+                    SELECT edge_id, id, text, source, created_at,
+                           ROW_NUMBER() OVER (PARTITION BY edge_id ORDER BY id DESC) AS rn
+                    FROM evidence WHERE edge_id IN ({marks})
+                ) WHERE rn <= ? ORDER BY edge_id, id DESC
+                """,
+                (*chunk, int(limit)),
+            ).fetchall()
+            for r in rows:
+                out[r[0]].append({"id": r[1], "text": r[2], "source": r[3], "created_at": r[4]})
+        return out
+
+    def _frontier_edges(self, frontier: List[str], fanout: int, min_weight: float) -> List[Dict]:
+        """Each frontier entity's top `4 * fanout` edges by weight, tagged with `via`."""
+        conn = self._connect()
+        cols = ", ".join(_EDGE_FIELDS)
+        reached: List[Dict] = []
+        for chunk in _chunks(frontier):
+            marks = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"""
+                SELECT {cols}, via FROM (
+                    SELECT *, ROW_NUMBER() OVER (PARTITION BY via ORDER BY weight DESC, id DESC) AS rn
+                    FROM (
+                        SELECT {cols}, subj AS via FROM edges WHERE subj IN ({marks}) AND weight >= ?
+                        UNION ALL
+                        SELECT {cols}, obj AS via FROM edges WHERE obj IN ({marks}) AND weight >= ?
+                    )
+                ) WHERE rn <= ?
+                """,
+                (*chunk, float(min_weight), *chunk, float(min_weight), fanout * 4),
+            ).fetchall()
+            for r in rows:
+                edge = dict(zip(_EDGE_FIELDS, r[:-1]))
+                edge["via"] = r[-1]
+                reached.append(edge)
+        return reached
+
+    def adjacency(
+        self, entities: Iterable[str], max_edges: int = 64, evidence_limit: int = 1
+    ) -> Dict[str, Optional[List[Dict]]]:
+        """All edges of each entity (newest first) with their latest evidence.
+
+        One edge query per 400 entities plus one evidence query. Entities
+        with more than `max_edges` edges map to None.
+        """
+        names = sorted({e for e in entities if e})
+        out: Dict[str, Optional[List[Dict]]] = {name: [] for name in names}
+        if not names:
+            return out
+        conn = self._connect()
+        cols = ", ".join(_EDGE_FIELDS)
+        for chunk in _chunks(names):
+            marks = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"""
+                SELECT {cols}, via FROM (
+                    SELECT *, ROW_NUMBER() OVER (PARTITION BY via ORDER BY {_RECENT_FIRST}) AS rn
+                    FROM (
+                        SELECT {cols}, subj AS via FROM edges WHERE subj IN ({marks})
+                        UNION ALL
+                        SELECT {cols}, obj AS via FROM edges WHERE obj IN ({marks}) AND subj != obj
+                    )
+                ) WHERE rn <= ? ORDER BY via, rn
+                """,
+                (*chunk, *chunk, int(max_edges) + 1),
+            ).fetchall()
+            for r in rows:
+                edges = out[r[-1]]
+                if edges is None:
+                    continue
+                if len(edges) >= max_edges:
+                    out[r[-1]] = None
+                    continue
+                edges.append(dict(zip(_EDGE_FIELDS, r[:-1])))
+        if evidence_limit > 0:
+            ids = [e["id"] for edges in out.values() if edges for e in edges]
+            evidence = self.evidence_for_edges(ids, limit=evidence_limit)
+            for edges in out.values():
+                for edge in edges or []:
+                    edge["evidence"] = evidence.get(edge["id"], [])
         return out
+
+    def traverse(
+        self,
+        seeds: Iterable[str],
+        *,
+        hops: int = 1,
+        limit: int = 20,
+        fanout: int = 10,
+        min_weight: float = 0.0,
+        evidence_limit: int = 0,
+    ) -> List[Dict]:
+        """Breadth-first k-hop expansion from `seeds` with bounded fan-out.
+
+        Each hop is one query over the whole frontier, picking from each
+        entity's top `4 * fanout` edges (see `expand`). With `evidence_limit`,
+        all evidence is fetched in a single extra query.
+        """
+        fanout = max(1, int(fanout))
+        edges = expand(
+            seeds,
+            lambda frontier: self._frontier_edges(frontier, fanout, min_weight),
+            hops=hops,
+            limit=limit,
+            fanout=fanout,
+        )
+        if evidence_limit > 0:
+            evidence = self.evidence_for_edges([e["id"] for e in edges], limit=evidence_limit)
+            for edge in edges:
+                edge["evidence"] = evidence.get(edge["id"], [])
+        return edges
+
+
+def expand(
+    seeds: Iterable[str],
+    fetch: Callable[[List[str]], List[Dict]],
+    *,
+    hops: int = 1,
+    limit: int = 20,
+    fanout: int = 10,
+) -> List[Dict]:
+    """Bounded breadth-first expansion shared by the SQL and cached traversals.
+
+    `fetch(frontier)` returns fresh edge dicts tagged with `via`, the
+    frontier entity they touch (already filtered by weight). Every frontier
+    entity adds at most `fanout` not-yet-seen edges, heaviest (then newest)
+    first; edges back to entities expanded on an earlier hop are skipped.
+    Edges are returned once, ordered by hop depth, then seed order, then
+    weight, and carry `depth`, `seed` and `via`.
+    """
+    order: Dict[str, int] = {}
+    for seed in seeds:
+        if seed and seed not in order:
+            order[seed] = len(order)
+    if not order or hops <= 0 or limit <= 0:
+        return []
+    fanout = max(1, int(fanout))
+    seed_of: Dict[str, str] = {s: s for s in order}
+    frontier = list(order)
+    seen_edges: Dict[int, Dict] = {}
+    for depth in range(1, int(hops) + 1):
+        reached = fetch(frontier)
+        frontier_set = set(frontier)
+        behind = {e for e in seed_of if e not in frontier_set}
+        next_frontier: List[str] = []
+        added: Dict[str, int] = {}
+        reached.sort(key=lambda e: (e["via"], -(e["weight"] or 0.0), -e["id"]))
+        for edge in reached:
+            via = edge["via"]
+            other = edge["obj"] if edge["subj"] == via else edge["subj"]
+            if edge["id"] in seen_edges or other in behind or added.get(via, 0) >= fanout:
+                continue
+            added[via] = added.get(via, 0) + 1
+            edge["depth"] = depth
+            edge["seed"] = seed_of[via]
+            seen_edges[edge["id"]] = edge
+            if other not in seed_of:
+                seed_of[other] = edge["seed"]
+                next_frontier.append(other)
+        frontier = next_frontier
+        if not frontier:
+            break
+
+    return sorted(
+        seen_edges.values(),
+        key=lambda e: (e["depth"], order[e["seed"]], -(e["weight"] or 0.0), -e["id"]),
+    )[: int(limit)]
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable, List, Set
+
+from .models import BrainRecord
+from .text import is_cjk, tokenize
+
+_QUERY_SPLIT_RE = re.compile(r"\W+")
+
+
+def record_tokens(record: BrainRecord) -> Set[str]:
+    """Tokens of the text KeywordScorer matches against (kind/source/content/tags)."""
+    return set(tokenize(" ".join([record.kind, record.source, record.content, " ".join(record.tags)])))
+
+
+class KeywordIndex:
+    """Token -> record position postings for keyword recall.
+
+    Positions refer to the store's resident record list and are added in
+    order as records are appended. `candidates` returns every position whose
+    record could get a keyword match, mirroring KeywordScorer's substring
+    test:
+
+    - a word token matches any indexed word containing it ("vec" -> "vector");
+    - CJK query text matches records holding all of its bigrams (a single
+      CJK character matches any bigram/unigram containing it).
+    """
+
+    def __init__(self) -> None:
+        self._words: Dict[str, List[int]] = {}
+        self._cjk: Dict[str, List[int]] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, position: int, record: BrainRecord) -> None:
+        for token in record_tokens(record):
+            postings = self._cjk if is_cjk(token) else self._words
+            postings.setdefault(token, []).append(position)
+        self._size = max(self._size, position + 1)
+
+    def extend(self, records: Iterable[BrainRecord], start: int = 0) -> None:
+        for offset, record in enumerate(records):
+            self.add(start + offset, record)
+
+    def _lookup(self, part: str, cache: Dict[str, Set[int]]) -> Set[int]:
+        hits = cache.get(part)
+        if hits is not None:
+            return hits
+        hits = set()
+        if is_cjk(part) and len(part) > 1:
+            hits.update(self._cjk.get(part, ()))
+        else:
+            vocab = self._cjk if is_cjk(part) else self._words
+            for token, positions in vocab.items():
+                if part in token:
+                    hits.update(positions)
+        cache[part] = hits
+        return hits
+
+    def candidates(self, query: str) -> List[int]:
+        """Sorted positions of records sharing at least one query token."""
+        out: Set[int] = set()
+        cache: Dict[str, Set[int]] = {}
+        for q_token in _QUERY_SPLIT_RE.split((query or "").lower()):
+            matched = None
+            for part in tokenize(q_token):
+                hits = self._lookup(part, cache)
+                matched = hits if matched is None else matched & hits
+                if not matched:
+                    break
+            if matched:
+                out |= matched
+        return sorted(out)
@@ -3,10 +3,12 @@ from __future__ import annotations
 from dataclasses import dataclass
 import math
 import re
-from typing import Protocol
+from typing import List, Protocol
 
 from .models import BrainRecord
 
+_PRIORITY_WEIGHTS = {"P0": 1.2, "P1": 1.0, "P2": 0.8}
+
 
 class Scorer(Protocol):
     def score(self, *, query: str, record: BrainRecord, mode: str) -> float: ...
@@ -22,22 +24,31 @@ class KeywordScorer:
 
     mode_bonus: float = 0.1
 
+    def query_tokens(self, query: str) -> List[str]:
+        return [t for t in re.split(r"\W+", query.lower()) if t]
+
     def score(self, *, query: str, record: BrainRecord, mode: str) -> float:
-        q_tokens = [t for t in re.split(r"\W+", query.lower()) if t]
+        q_tokens = self.query_tokens(query)
         if not q_tokens:
             return 0.0
 
         text = " ".join([record.kind, record.source, record.content, " ".join(record.tags)]).lower()
         matches = sum(1 for t in q_tokens if t and t in text)
-        base = matches / max(1, len(q_tokens))
+        return self.weighted(matches / max(1, len(q_tokens)), record=record, mode=mode)
 
+    def weighted(self, base: float, *, record: BrainRecord, mode: str) -> float:
+        """Apply mode bonus, priority and decay weights to a match ratio."""
         bonus = 0.0
         if mode == "facts" and record.kind.lower() in {"fact", "facts"}:
             bonus = self.mode_bonus
         if mode == "strategy" and record.kind.lower() in {"strategy", "plan"}:
             bonus = self.mode_bonus
 
-        priority_weight = {"P0": 1.2, "P1": 1.0, "P2": 0.8}.get(record.priority, 1.0)
+        priority_weight = _PRIORITY_WEIGHTS.get(record.priority, 1.0)
         decay_weight = record.decay if record.decay > 0 else 0.1
 
         return min(1.0, (base + bonus) * priority_weight * math.sqrt(decay_weight))
+
+    def unmatched_ceiling(self) -> float:
+        """Highest score a record without any query token can get (decay <= 1)."""
+        return min(1.0, self.mode_bonus * max(_PRIORITY_WEIGHTS.values()))
@@ -1,13 +1,43 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from dataclasses import replace
 from datetime import datetime, timezone
+import heapq
 import json
+import os
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+import shutil
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from collections import OrderedDict
 
+from .columnar import read_columnar, write_columnar
+from .keyword_index import KeywordIndex
 from .models import BrainRecord
+from .usage import UsageAggregator
+
+COMPACTION_MODES = {"memory", "external"}
+SNAPSHOT_FORMATS = {"jsonl", "columnar"}
+
+
+def _run_key(line: str) -> Tuple[str, ...]:
+    # (hash, updated_at, zero-padded seq) -- same order the in-memory dedupe uses.
+    return tuple(line.split("\t", 3)[:3])
+
+
+def _last_per_hash(lines: Iterable[str]) -> Iterator[str]:
+    prev: Optional[str] = None
+    prev_hash = None
+    for line in lines:
+        line_hash = line.split("\t", 1)[0]
+        if prev is not None and line_hash != prev_hash:
+            yield prev
+        prev, prev_hash = line, line_hash
+    if prev is not None:
+        yield prev
 
 
 class BrainStore(ABC):
@@ -42,7 +72,16 @@ class JSONLBrainStore(BrainStore):
         decay_on_checkpoint_days: int = 14,
         decay_floor: float = 0.1,
         decay_step: float = 0.05,
+        compaction: str = "memory",
+        compaction_run_size: int = 50000,
+        snapshot_format: str = "jsonl",
+        usage_flush_max_ids: int = 256,
+        usage_flush_interval_seconds: float = 5.0,
     ) -> None:
+        if compaction not in COMPACTION_MODES:
+            raise ValueError("compaction must be one of memory/external")
+        if snapshot_format not in SNAPSHOT_FORMATS:
+            raise ValueError("snapshot_format must be one of jsonl/columnar")
         self.base_path = Path(base_path)
         self.max_snapshots = max(1, int(max_snapshots))
         self.dedupe_on_write = bool(dedupe_on_write)
@@ -50,15 +89,34 @@ class JSONLBrainStore(BrainStore):
         self.decay_on_checkpoint_days = max(0, int(decay_on_checkpoint_days))
         self.decay_floor = max(0.0, float(decay_floor))
         self.decay_step = max(0.0, float(decay_step))
+        self.compaction = compaction
+        self.compaction_run_size = max(1, int(compaction_run_size))
+        self.snapshot_format = snapshot_format
+        self._checkpoint_lock = threading.Lock()
         self._recent_hashes: "OrderedDict[str, None]" = OrderedDict()
         self.brain_dir = self.base_path / "brain"
         self.snapshots_dir = self.brain_dir / "snapshots"
         self.records_path = self.brain_dir / "records.jsonl"
         self.snapshot_path = self.brain_dir / "snapshot.jsonl"
+        # Columnar sidecar of snapshot.jsonl (snapshot_format="columnar").
+        self.columnar_path = self.brain_dir / "snapshot.nxb"
         self.changelog_path = self.brain_dir / "changelog.jsonl"
         self.usage_path = self.brain_dir / "usage.jsonl"
         self.brain_dir.mkdir(parents=True, exist_ok=True)
         self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+        self._usage = UsageAggregator(
+            self.usage_path,
+            flush_max_ids=usage_flush_max_ids,
+            flush_interval_seconds=usage_flush_interval_seconds,
+        )
+        # Resident record index: snapshot + WAL parsed once, then tailed by offset.
+        self._index_lock = threading.RLock()
+        self._index: Optional[List[BrainRecord]] = None
+        self._index_offset = 0
+        self._index_sig: Tuple[Optional[Tuple[int, int]], Optional[int], Tuple[str, ...]] = (None, None, ())
+        # Keyword postings over `_index`; built on first use, then extended as records are tailed.
+        self._keyword_index: Optional[KeywordIndex] = None
+        self._keyword_index_for: Optional[List[BrainRecord]] = None
         self._warm_recent_hashes()
 
     def _warm_recent_hashes(self) -> None:
@@ -90,14 +148,32 @@ class JSONLBrainStore(BrainStore):
                 self._recent_hashes.popitem(last=False)
         return record
 
+    def write_many(self, records: List[BrainRecord]) -> List[BrainRecord]:
+        """Append `records` to the write-ahead log in a single write."""
+        lines: List[str] = []
+        for record in records:
+            if self.dedupe_on_write and record.hash:
+                if record.hash in self._recent_hashes:
+                    continue
+                self._recent_hashes[record.hash] = None
+                if len(self._recent_hashes) > self.dedupe_recent_max:
+                    self._recent_hashes.popitem(last=False)
+            lines.append(json.dumps(record.to_dict(), ensure_ascii=True) + "\n")
+        if lines:
+            with self.records_path.open("a", encoding="utf-8") as f:
+                f.write("".join(lines))
+        return list(records)
+
     def log_usage(self, record_ids: List[str], ts_iso: Optional[str] = None) -> None:
+        """Count recall hits in memory; deltas reach `usage.jsonl` in the background."""
         if not record_ids:
             return
         now_iso = ts_iso or datetime.now(timezone.utc).isoformat()
-        with self.usage_path.open("a", encoding="utf-8") as f:
-            for rid in record_ids:
-                if rid:
-                    f.write(json.dumps({"id": rid, "ts": now_iso}, ensure_ascii=True) + "\n")
+        self._usage.record(record_ids, now_iso)
+
+    def flush_usage(self) -> int:
+        """Write pending usage deltas to `usage.jsonl` now."""
+        return self._usage.flush()
 
     def _iter_jsonl(self, path: Path) -> Iterable[dict]:
         if not path.exists():
@@ -113,11 +189,147 @@ class JSONLBrainStore(BrainStore):
                     continue
 
     def read_all(self) -> List[BrainRecord]:
-        records = [BrainRecord.from_dict(x) for x in self._iter_jsonl(self.snapshot_path)]
-        records.extend(BrainRecord.from_dict(x) for x in self._iter_jsonl(self.records_path))
-        return records
+        """Return snapshot + appended records from the resident index.
+
+        The index is loaded once and then only the bytes appended to
+        `records.jsonl` since the last call are parsed. Returned records are
+        shared with the index; callers must copy before mutating.
+        """
+        with self._index_lock:
+            self._refresh_index()
+            return list(self._index or [])
+
+    def keyword_candidates(self, query: str) -> Tuple[List[BrainRecord], List[int]]:
+        """Return (all records, positions of records sharing a token with `query`).
+
+        The postings index is built once per resident index and then only
+        covers newly appended records.
+        """
+        with self._index_lock:
+            self._refresh_index()
+            items = self._index if self._index is not None else []
+            if self._keyword_index is None or self._keyword_index_for is not items:
+                self._keyword_index = KeywordIndex()
+                self._keyword_index_for = items
+            index = self._keyword_index
+            start = len(index)
+            index.extend(items[start:], start=start)
+            return list(items), index.candidates(query)
+
+    def _file_sig(self) -> Tuple[Optional[Tuple[int, int]], Optional[int], Tuple[str, ...]]:
+        try:
+            st = self.snapshot_path.stat()
+            snap_sig: Optional[Tuple[int, int]] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            snap_sig = None
+        try:
+            records_ino: Optional[int] = self.records_path.stat().st_ino
+        except OSError:
+            records_ino = None
+        rotated = tuple(p.name for p in self._compacting_paths("records"))
+        return snap_sig, records_ino, rotated
+
+    def _invalidate_index(self) -> None:
+        with self._index_lock:
+            self._index = None
+            self._index_offset = 0
+            self._index_sig = (None, None, ())
+
+    def _refresh_index(self) -> None:
+        sig = self._file_sig()
+        if self._index is not None and sig != self._index_sig:
+            # Snapshot replaced or WAL rotated (e.g. by another process).
+            self._index = None
+        if self._index is not None:
+            try:
+                size = self.records_path.stat().st_size
+            except OSError:
+                size = 0
+            if size < self._index_offset:
+                self._index = None
+
+        if self._index is None:
+            self._index = self._load_snapshot()
+            # WAL segments rotated out by an in-flight (or crashed) compaction.
+            for path in self._compacting_paths("records"):
+                self._index.extend(BrainRecord.from_dict(x) for x in self._iter_jsonl(path))
+            self._index_offset = 0
+            self._index_sig = sig
+        self._tail_records()
+
+    def _load_snapshot(self) -> List[BrainRecord]:
+        if self.snapshot_format == "columnar" and self.snapshot_path.exists():
+            records = read_columnar(self.columnar_path, source_path=self.snapshot_path)
+            if records is not None:
+                return records
+            # Missing or stale sidecar: parse JSONL this time, mmap next time.
+            self._write_columnar_snapshot()
+        return [BrainRecord.from_dict(x) for x in self._iter_jsonl(self.snapshot_path)]
+
+    def _write_columnar_snapshot(self) -> None:
+        """Refresh snapshot.nxb from snapshot.jsonl (best-effort; JSONL stays authoritative)."""
+        if self.snapshot_format != "columnar" or not self.snapshot_path.exists():
+            return
+        try:
+            write_columnar(self.snapshot_path, self.columnar_path)
+        except OSError:
+            if self.columnar_path.exists():
+                self.columnar_path.unlink()
+
+    def _tail_records(self) -> None:
+        if not self.records_path.exists():
+            return
+        with self.records_path.open("rb") as f:
+            f.seek(self._index_offset)
+            chunk = f.read()
+        # Only consume complete lines; a trailing partial write is picked up later.
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            return
+        for line in chunk[: end + 1].splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                self._index.append(BrainRecord.from_dict(json.loads(line)))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+        self._index_offset += end + 1
 
     def checkpoint(self) -> Dict[str, int]:
+        with self._checkpoint_lock:
+            if self.compaction == "external":
+                try:
+                    return self._checkpoint_external()
+                finally:
+                    self._invalidate_index()
+            with self._index_lock:
+                try:
+                    return self._checkpoint()
+                finally:
+                    self._invalidate_index()
+
+    def checkpoint_in_background(
+        self, on_done: Optional[Callable[[Dict[str, int]], None]] = None
+    ) -> threading.Thread:
+        """Run `checkpoint()` on a daemon thread and return the started thread.
+
+        With `compaction="external"` writers keep appending to a fresh
+        `records.jsonl` and readers keep serving from the resident index while
+        the merge runs; only the WAL rotation and the final snapshot swap are
+        done under the index lock.
+        """
+
+        def _run() -> None:
+            stats = self.checkpoint()
+            if on_done is not None:
+                on_done(stats)
+
+        t = threading.Thread(target=_run, name="brain-checkpoint", daemon=True)
+        t.start()
+        return t
+
+    def _checkpoint(self) -> Dict[str, int]:
         now = datetime.now(timezone.utc)
         now_iso = now.isoformat()
         version = now.strftime("%Y%m%dT%H%M%SZ")
@@ -129,25 +341,164 @@ class JSONLBrainStore(BrainStore):
             if existing is None or rec.updated_at >= existing.updated_at:
                 deduped[key] = rec
 
-        # Apply usage-based promotion and decay before snapshotting
+        # Apply usage-based promotion and decay before snapshotting. Both swap
+        # in updated copies: the records themselves are shared with the
+        # resident index and with readers, which keep seeing the old values
+        # until the new snapshot is published and the index reloads.
         usage_stats = self._apply_usage(deduped, now_iso)
         decay_stats = self._apply_decay(deduped, now)
 
-        # Write current snapshot
-        with self.snapshot_path.open("w", encoding="utf-8") as f:
+        # Write current snapshot once; the versioned copy is a hard link to it.
+        tmp_path = self.brain_dir / "snapshot.jsonl.tmp"
+        with tmp_path.open("w", encoding="utf-8") as f:
             for rec in deduped.values():
                 f.write(json.dumps(rec.to_dict(), ensure_ascii=True) + "\n")
+        versioned_path = self._publish_snapshot(tmp_path, version)
+        self._write_columnar_snapshot()
+
+        wal_paths = self._compacting_paths("records") + [self.records_path]
+        appended = sum(1 for p in wal_paths for _ in self._iter_jsonl(p))
+        for path in wal_paths:
+            if path.exists():
+                path.unlink()
+        self.records_path.touch()
+
+        return self._finish_checkpoint(
+            version=version,
+            now_iso=now_iso,
+            snapshot_count=len(deduped),
+            appended=appended,
+            usage_stats=usage_stats,
+            decay_stats=decay_stats,
+            versioned_path=versioned_path,
+        )
+
+    def _checkpoint_external(self) -> Dict[str, int]:
+        """Bounded-memory compaction: hash-sorted runs merged into one snapshot."""
+        now = datetime.now(timezone.utc)
+        now_iso = now.isoformat()
+        version = now.strftime("%Y%m%dT%H%M%SZ")
+
+        # Rotate the WAL and usage log so writers carry on with fresh files.
+        with self._index_lock, self._usage.lock:
+            stamp = time.time_ns()
+            for prefix, live in (("records", self.records_path), ("usage", self.usage_path)):
+                if live.exists() and live.stat().st_size > 0:
+                    live.replace(self.brain_dir / f"{prefix}.{stamp}.compacting.jsonl")
+            self.records_path.touch()
+            pending_usage = self._usage.drain()
+        wal_paths = self._compacting_paths("records")
+        usage_paths = self._compacting_paths("usage")
+
+        usage_by_id, last_used = self._load_usage(usage_paths, now_iso, pending=pending_usage)
+        used_ids: set = set()
+        usage_updated = 0
+        decay_updated = 0
+        decay_skipped = 0
+        snapshot_count = 0
+        appended = 0
+
+        tmp_path = self.brain_dir / "snapshot.jsonl.tmp"
+        with tempfile.TemporaryDirectory(dir=str(self.brain_dir), prefix="compact-") as run_dir:
+            runs: List[Path] = []
+            buf: List[Tuple[str, str, int, str]] = []
+            seq = 0
+            for path in [self.snapshot_path] + wal_paths:
+                is_wal = path != self.snapshot_path
+                for item in self._iter_jsonl(path):
+                    rec = BrainRecord.from_dict(item)
+                    if is_wal:
+                        appended += 1
+                    buf.append((rec.hash, rec.updated_at, seq, json.dumps(rec.to_dict(), ensure_ascii=True)))
+                    seq += 1
+                    if len(buf) >= self.compaction_run_size:
+                        runs.append(self._write_run(buf, Path(run_dir) / f"run-{len(runs)}.tsv"))
+                        buf = []
+            if buf or not runs:
+                runs.append(self._write_run(buf, Path(run_dir) / f"run-{len(runs)}.tsv"))
+                buf = []
+
+            handles = [p.open("r", encoding="utf-8") for p in runs]
+            try:
+                merged = heapq.merge(*handles, key=_run_key)
+                with tmp_path.open("w", encoding="utf-8") as out:
+                    for line in _last_per_hash(merged):
+                        rec = BrainRecord.from_dict(json.loads(line.split("\t", 3)[3]))
+                        count = usage_by_id.get(rec.id) if rec.id else None
+                        if count:
+                            rec = self._promote_usage(rec, count, last_used.get(rec.id, now_iso), now_iso)
+                            used_ids.add(rec.id)
+                            usage_updated += 1
+                        rec, decayed = self._decay_record(rec, now)
+                        if decayed is True:
+                            decay_updated += 1
+                        elif decayed is False:
+                            decay_skipped += 1
+                        out.write(json.dumps(rec.to_dict(), ensure_ascii=True) + "\n")
+                        snapshot_count += 1
+            finally:
+                for h in handles:
+                    h.close()
+
+        with self._index_lock:
+            versioned_path = self._publish_snapshot(tmp_path, version)
+            for path in wal_paths + usage_paths:
+                if path.exists():
+                    path.unlink()
+        # Readers fall back to JSONL until the sidecar matches the new snapshot.
+        self._write_columnar_snapshot()
+
+        usage_stats = {"updated": usage_updated, "skipped": len(set(usage_by_id) - used_ids)}
+        if not usage_by_id:
+            usage_stats = {"updated": 0, "skipped": 0}
+        return self._finish_checkpoint(
+            version=version,
+            now_iso=now_iso,
+            snapshot_count=snapshot_count,
+            appended=appended,
+            usage_stats=usage_stats,
+            decay_stats={"updated": decay_updated, "skipped": decay_skipped},
+            versioned_path=versioned_path,
+        )
 
-        # Also write versioned snapshot for rollback/audit
+    @staticmethod
+    def _write_run(buf: List[Tuple[str, str, int, str]], path: Path) -> Path:
+        buf.sort()
+        with path.open("w", encoding="utf-8") as f:
+            for idx, (rec_hash, updated_at, seq, payload) in enumerate(buf):
+                # Only the last entry per hash (newest, then latest-written) can win.
+                if idx + 1 < len(buf) and buf[idx + 1][0] == rec_hash:
+                    continue
+                f.write(f"{rec_hash}\t{updated_at}\t{seq:012d}\t{payload}\n")
+        return path
+
+    def _compacting_paths(self, prefix: str) -> List[Path]:
+        """Rotated logs awaiting compaction (also left behind by a crashed run)."""
+        return sorted(self.brain_dir.glob(f"{prefix}.*.compacting.jsonl"), key=lambda p: p.name)
+
+    def _publish_snapshot(self, tmp_path: Path, version: str) -> Path:
+        """Link the finished snapshot into snapshots/ and atomically make it current."""
         versioned_path = self.snapshots_dir / f"{version}.jsonl"
-        with versioned_path.open("w", encoding="utf-8") as f:
-            for rec in deduped.values():
-                f.write(json.dumps(rec.to_dict(), ensure_ascii=True) + "\n")
+        if versioned_path.exists():
+            versioned_path.unlink()
+        try:
+            os.link(tmp_path, versioned_path)
+        except OSError:
+            shutil.copyfile(tmp_path, versioned_path)
+        os.replace(tmp_path, self.snapshot_path)
+        return versioned_path
 
-        appended = sum(1 for _ in self._iter_jsonl(self.records_path))
-        if self.records_path.exists():
-            self.records_path.unlink()
-        self.records_path.touch()
+    def _finish_checkpoint(
+        self,
+        *,
+        version: str,
+        now_iso: str,
+        snapshot_count: int,
+        appended: int,
+        usage_stats: Dict[str, int],
+        decay_stats: Dict[str, int],
+        versioned_path: Path,
+    ) -> Dict[str, int]:
         if self.dedupe_on_write:
             self._recent_hashes.clear()
 
@@ -165,7 +516,7 @@ class JSONLBrainStore(BrainStore):
             "ts": now_iso,
             "event": "checkpoint",
             "version": version,
-            "snapshot_count": len(deduped),
+            "snapshot_count": snapshot_count,
             "compacted_from": appended,
             "usage_updates": usage_stats,
             "decay_updates": decay_stats,
@@ -186,105 +537,127 @@ class JSONLBrainStore(BrainStore):
 
         return {
             "version": version,
-            "snapshot_count": len(deduped),
+            "snapshot_count": snapshot_count,
             "compacted_from": appended,
         }
 
-    def _iter_usage(self) -> Iterable[dict]:
-        if not self.usage_path.exists():
-            return []
-        with self.usage_path.open("r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    yield json.loads(line)
-                except json.JSONDecodeError:
-                    continue
+    def _iter_usage(self, paths: Optional[List[Path]] = None) -> Iterable[dict]:
+        if paths is None:
+            paths = self._compacting_paths("usage") + [self.usage_path]
+        for path in paths:
+            yield from self._iter_jsonl(path)
 
-    def _apply_usage(self, deduped: Dict[str, BrainRecord], now_iso: str) -> Dict[str, int]:
-        """Apply usage stats to records (priority/decay promotion)."""
+    def _load_usage(
+        self,
+        paths: Optional[List[Path]],
+        now_iso: str,
+        pending: Optional[Tuple[Dict[str, int], Dict[str, str]]] = None,
+    ) -> Tuple[Dict[str, int], Dict[str, str]]:
+        """Sum usage log lines (one hit each, or aggregated `count`) plus `pending` deltas."""
         usage_by_id: Dict[str, int] = {}
         last_used: Dict[str, str] = {}
-        for item in self._iter_usage():
+        for item in self._iter_usage(paths):
             rid = str(item.get("id", ""))
             if not rid:
                 continue
-            usage_by_id[rid] = usage_by_id.get(rid, 0) + 1
+            try:
+                count = max(1, int(item.get("count", 1)))
+            except (TypeError, ValueError):
+                count = 1
+            usage_by_id[rid] = usage_by_id.get(rid, 0) + count
             last_used[rid] = str(item.get("ts", now_iso))
+        if pending is not None:
+            counts, pending_last = pending
+            for rid, count in counts.items():
+                usage_by_id[rid] = usage_by_id.get(rid, 0) + count
+                last_used[rid] = pending_last.get(rid, now_iso)
+        return usage_by_id, last_used
+
+    @staticmethod
+    def _promote_usage(rec: BrainRecord, count: int, last_used: str, now_iso: str) -> BrainRecord:
+        """Return a copy of `rec` with usage folded into priority/decay/metadata."""
+        meta = dict(rec.metadata or {})
+        prev_count = int(meta.get("usage_count", 0) or 0)
+        new_count = prev_count + count
+        meta["usage_count"] = new_count
+        meta["last_used"] = last_used
+
+        # Promote priority based on usage (P1 stays P1 until the higher threshold)
+        priority = rec.priority
+        if new_count >= 10:
+            priority = "P0"
+        elif new_count >= 3 and priority == "P2":
+            priority = "P1"
+
+        # Increase decay floor based on usage
+        decay = min(1.0, max(rec.decay, 0.2 + 0.05 * min(new_count, 10)))
+        return replace(rec, priority=priority, decay=decay, metadata=meta, updated_at=now_iso)
+
+    def _apply_usage(self, deduped: Dict[str, BrainRecord], now_iso: str) -> Dict[str, int]:
+        """Apply usage stats to records (priority/decay promotion)."""
+        with self._usage.lock:
+            usage_paths = self._compacting_paths("usage") + [self.usage_path]
+            usage_by_id, last_used = self._load_usage(usage_paths, now_iso, pending=self._usage.drain())
+            # Reset usage log once its hits are folded into the snapshot below.
+            for path in usage_paths:
+                if path.exists():
+                    path.unlink()
+            self.usage_path.touch()
 
         if not usage_by_id:
             return {"updated": 0, "skipped": 0}
 
         # Build lookup by id
-        id_map: Dict[str, BrainRecord] = {rec.id: rec for rec in deduped.values() if rec.id}
+        id_map: Dict[str, str] = {rec.id: key for key, rec in deduped.items() if rec.id}
         updated = 0
         skipped = 0
 
         for rid, count in usage_by_id.items():
-            rec = id_map.get(rid)
-            if rec is None:
+            key = id_map.get(rid)
+            if key is None:
                 skipped += 1
                 continue
-
-            meta = dict(rec.metadata or {})
-            prev_count = int(meta.get("usage_count", 0) or 0)
-            new_count = prev_count + count
-            meta["usage_count"] = new_count
-            meta["last_used"] = last_used.get(rid, now_iso)
-
-            # Promote priority based on usage
-            if new_count >= 10:
-                rec.priority = "P0"
-            elif new_count >= 3:
-                if rec.priority == "P2":
-                    rec.priority = "P1"
-                elif rec.priority == "P1":
-                    # keep P1 unless higher threshold hit
-                    rec.priority = "P1"
-
-            # Increase decay floor based on usage
-            rec.decay = min(1.0, max(rec.decay, 0.2 + 0.05 * min(new_count, 10)))
-            rec.metadata = meta
-            rec.updated_at = now_iso
+            deduped[key] = self._promote_usage(deduped[key], count, last_used.get(rid, now_iso), now_iso)
             updated += 1
 
-        # Reset usage log after applying
-        if self.usage_path.exists():
-            self.usage_path.unlink()
-            self.usage_path.touch()
-
         return {"updated": updated, "skipped": skipped}
 
+    def _decay_record(self, rec: BrainRecord, now: datetime) -> Tuple[BrainRecord, Optional[bool]]:
+        """Decay one record into a copy.
+
+        Returns (record, flag): flag is True if decayed, False if skipped and
+        None if decay is off; unchanged records are returned as-is.
+        """
+        if self.decay_on_checkpoint_days <= 0:
+            return rec, None
+        meta = rec.metadata or {}
+        last_used = meta.get("last_used") or rec.updated_at or rec.created_at
+        try:
+            last_dt = datetime.fromisoformat(str(last_used))
+            if last_dt.tzinfo is None:
+                last_dt = last_dt.replace(tzinfo=timezone.utc)
+        except Exception:
+            return rec, False
+
+        age_days = (now - last_dt).days
+        if age_days < self.decay_on_checkpoint_days:
+            return rec, False
+
+        steps = max(1, age_days // self.decay_on_checkpoint_days)
+        new_decay = max(self.decay_floor, rec.decay - (self.decay_step * steps))
+        if new_decay < rec.decay:
+            return replace(rec, decay=new_decay, updated_at=now.isoformat()), True
+        return rec, False
+
     def _apply_decay(self, deduped: Dict[str, BrainRecord], now: datetime) -> Dict[str, int]:
         if self.decay_on_checkpoint_days <= 0:
             return {"updated": 0, "skipped": 0}
 
         updated = 0
         skipped = 0
-
-        for rec in deduped.values():
-            meta = rec.metadata or {}
-            last_used = meta.get("last_used") or rec.updated_at or rec.created_at
-            try:
-                last_dt = datetime.fromisoformat(str(last_used))
-                if last_dt.tzinfo is None:
-                    last_dt = last_dt.replace(tzinfo=timezone.utc)
-            except Exception:
-                skipped += 1
-                continue
-
-            age_days = (now - last_dt).days
-            if age_days < self.decay_on_checkpoint_days:
-                skipped += 1
-                continue
-
-            steps = max(1, age_days // self.decay_on_checkpoint_days)
-            new_decay = max(self.decay_floor, rec.decay - (self.decay_step * steps))
-            if new_decay < rec.decay:
-                rec.decay = new_decay
-                rec.updated_at = now.isoformat()
+        for key, rec in deduped.items():
+            deduped[key], decayed = self._decay_record(rec, now)
+            if decayed:
                 updated += 1
             else:
                 skipped += 1
@@ -308,6 +681,13 @@ class JSONLBrainStore(BrainStore):
 
     def rollback(self, version: str) -> bool:
         """Rollback current snapshot to a previous version (local file rollback)."""
+        with self._checkpoint_lock, self._index_lock:
+            try:
+                return self._rollback(version)
+            finally:
+                self._invalidate_index()
+
+    def _rollback(self, version: str) -> bool:
         versioned_path = self.snapshots_dir / f"{version}.jsonl"
         if not versioned_path.exists():
             return False
@@ -320,10 +700,24 @@ class JSONLBrainStore(BrainStore):
             archived_records_path = self.snapshots_dir / f"records_before_rollback_{now.strftime('%Y%m%dT%H%M%SZ')}.jsonl"
             self.records_path.replace(archived_records_path)
 
+        # Segments left behind by an interrupted compaction are archived too.
+        leftovers = self._compacting_paths("records")
+        if leftovers:
+            if archived_records_path is None:
+                archived_records_path = self.snapshots_dir / f"records_before_rollback_{now.strftime('%Y%m%dT%H%M%SZ')}.jsonl"
+            with archived_records_path.open("ab") as out:
+                for path in leftovers:
+                    with path.open("rb") as f:
+                        shutil.copyfileobj(f, out)
+                    path.unlink()
+
         self.records_path.touch()
 
-        # Restore snapshot
-        self.snapshot_path.write_text(versioned_path.read_text(encoding="utf-8"), encoding="utf-8")
+        # Restore snapshot (never write in place: snapshot.jsonl may be a hard link)
+        tmp_path = self.brain_dir / "snapshot.jsonl.tmp"
+        shutil.copyfile(versioned_path, tmp_path)
+        os.replace(tmp_path, self.snapshot_path)
+        self._write_columnar_snapshot()
 
         changelog_event = {
             "ts": now_iso,
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import re
+from typing import List
+
+# CJK Unified Ideographs (+ Ext A), Hiragana/Katakana and Hangul syllables.
+_CJK_CLASS = "぀-ヿ㐀-䶿一-鿿가-힯"
+_TOKEN_RE = re.compile(rf"[{_CJK_CLASS}]+|[^\W{_CJK_CLASS}]+")
+_CJK_RE = re.compile(rf"[{_CJK_CLASS}]")
+
+
+def is_cjk(token: str) -> bool:
+    """True when `token` starts with a CJK character (bigram/unigram tokens)."""
+    return bool(_CJK_RE.match(token or ""))
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens; CJK runs are split into overlapping bigrams.
+
+    Chinese/Japanese text has no whitespace between words, so a CJK run like
+    "向量检索" becomes ["向量", "量检", "检索"]. A single CJK character is kept
+    as a unigram.
+    """
+    out: List[str] = []
+    for run in _TOKEN_RE.findall((text or "").lower()):
+        if is_cjk(run):
+            if len(run) == 1:
+                out.append(run)
+            else:
+                out.extend(run[i : i + 2] for i in range(len(run) - 1))
+        else:
+            out.append(run)
+    return out
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import atexit
+import json
+from pathlib import Path
+import threading
+from typing import Dict, List, Optional, Tuple
+import weakref
+
+_LIVE: "weakref.WeakSet[UsageAggregator]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_live() -> None:
+    # Timers are daemon threads; write whatever is still pending at shutdown.
+    for aggregator in list(_LIVE):
+        aggregator._flush_in_background()
+
+
+class UsageAggregator:
+    """In-memory recall counters, group-committed to the usage log.
+
+    `record` only bumps per-id counters. Aggregated deltas are appended to
+    `path` as one `{"id", "count", "ts"}` line per id, on a background thread,
+    once `flush_max_ids` hits are pending or `flush_interval_seconds` after
+    the first pending hit. Checkpoints take pending deltas via `drain` instead
+    of waiting for them to reach the file.
+    """
+
+    def __init__(self, path: Path, flush_max_ids: int = 256, flush_interval_seconds: float = 5.0) -> None:
+        self.path = path
+        self.flush_max_ids = max(1, int(flush_max_ids))
+        self.flush_interval_seconds = max(0.0, float(flush_interval_seconds))
+        # Held for the whole swap + append so a checkpoint can fence out flushes.
+        self.lock = threading.RLock()
+        # Guards the counters only, so `record` never waits on file I/O.
+        self._state_lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._last_used: Dict[str, str] = {}
+        self._pending = 0
+        self._timer: Optional[threading.Timer] = None
+        self._flushing = False
+        _LIVE.add(self)
+
+    def record(self, record_ids: List[str], ts_iso: str) -> None:
+        with self._state_lock:
+            for rid in record_ids:
+                if not rid:
+                    continue
+                self._counts[rid] = self._counts.get(rid, 0) + 1
+                self._last_used[rid] = ts_iso
+                self._pending += 1
+            if not self._pending:
+                return
+            if self._pending >= self.flush_max_ids or self.flush_interval_seconds <= 0:
+                self._schedule(0.0)
+            elif self._timer is None:
+                self._schedule(self.flush_interval_seconds)
+
+    def _schedule(self, delay: float) -> None:
+        if self._flushing:
+            return
+        if self._timer is not None:
+            if delay > 0:
+                return
+            self._timer.cancel()
+        self._flushing = delay <= 0
+        timer = threading.Timer(delay, self._flush_in_background)
+        timer.daemon = True
+        self._timer = timer
+        timer.start()
+
+    def _flush_in_background(self) -> None:
+        try:
+            self.flush()
+        except OSError:
+            # Deltas were put back; the next hit or checkpoint picks them up.
+            pass
+
+    def drain(self) -> Tuple[Dict[str, int], Dict[str, str]]:
+        """Take pending (counts, last_used) deltas without writing them."""
+        with self._state_lock:
+            counts, last_used = self._counts, self._last_used
+            self._counts, self._last_used = {}, {}
+            self._pending = 0
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._flushing = False
+            return counts, last_used
+
+    def flush(self) -> int:
+        """Append pending deltas to the usage log; returns the number of ids written."""
+        with self.lock:
+            counts, last_used = self.drain()
+            if not counts:
+                return 0
+            lines = [
+                json.dumps({"id": rid, "count": count, "ts": last_used[rid]}, ensure_ascii=True) + "\n"
+                for rid, count in counts.items()
+            ]
+            try:
+                with self.path.open("a", encoding="utf-8") as f:
+                    f.write("".join(lines))
+            except OSError:
+                with self._state_lock:
+                    for rid, count in counts.items():
+                        self._counts[rid] = self._counts.get(rid, 0) + count
+                        self._last_used.setdefault(rid, last_used[rid])
+                        self._pending += count
+                raise
+            return len(lines)
@@ -1,17 +1,108 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
 import hashlib
+from itertools import repeat
 import math
-from typing import Dict, Optional
+import threading
+from typing import Dict, List, Optional, Sequence
 
+from .embedding_cache import EmbeddingCache, embedding_cache_key
+from .embedding_service import EmbeddingService, get_embedding_service
 from .models import BrainRecord
 from .scoring import Scorer
 
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; batch scoring falls back to per-record
+    np = None
+
+_PRIORITY_WEIGHTS = {"P0": 1.2, "P1": 1.0, "P2": 0.85}
+_MODE_BONUS = 0.05
+
 
 def _tokenize(text: str) -> list[str]:
     return [t for t in text.lower().split() if t]
 
 
+def _hash_token(token: str) -> int:
+    h = hashlib.sha256(token.encode("utf-8")).digest()
+    return int.from_bytes(h[:4], "big")
+
+
+def _hashed_embedding(text: str, dim: int) -> list[float]:
+    """Dependency-free hashed bag-of-words embedding (L2-normalized)."""
+    vec = [0.0] * dim
+    for tok in _tokenize(text):
+        vec[_hash_token(tok) % dim] += 1.0
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+class _EmbeddingMatrix:
+    """Contiguous float32 embeddings plus per-record weight vectors.
+
+    Rows are aligned with `records`. The matrix only grows by appending, which
+    matches how the store's resident index grows between checkpoints.
+    """
+
+    def __init__(self, dim: int) -> None:
+        self.dim = dim
+        self.records: List[BrainRecord] = []
+        self._rows = np.zeros((0, dim), dtype=np.float32)
+        self._weights = np.zeros(0, dtype=np.float32)
+        self._is_fact = np.zeros(0, dtype=bool)
+        self._is_strategy = np.zeros(0, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def is_prefix_of(self, records: Sequence[BrainRecord]) -> bool:
+        if len(self.records) > len(records):
+            return False
+        return all(a is b for a, b in zip(self.records, records))
+
+    def _reserve(self, size: int) -> None:
+        cap = self._rows.shape[0]
+        if size <= cap:
+            return
+        new_cap = max(size, cap * 2, 64)
+        rows = np.zeros((new_cap, self.dim), dtype=np.float32)
+        rows[:cap] = self._rows
+        self._rows = rows
+        for name, dtype in (("_weights", np.float32), ("_is_fact", bool), ("_is_strategy", bool)):
+            old = getattr(self, name)
+            grown = np.zeros(new_cap, dtype=dtype)
+            grown[:cap] = old
+            setattr(self, name, grown)
+
+    def extend(self, records: Sequence[BrainRecord], vector_for) -> None:
+        if not records:
+            return
+        start = len(self.records)
+        self._reserve(start + len(records))
+        for i, rec in enumerate(records, start):
+            vec = np.asarray(vector_for(rec), dtype=np.float32).ravel()[: self.dim]
+            self._rows[i, : vec.shape[0]] = vec
+            self._rows[i, vec.shape[0] :] = 0.0
+            decay = rec.decay if rec.decay > 0 else 0.1
+            self._weights[i] = _PRIORITY_WEIGHTS.get(rec.priority, 1.0) * math.sqrt(decay)
+            kind = (rec.kind or "").strip().lower()
+            self._is_fact[i] = kind in {"fact", "facts"}
+            self._is_strategy[i] = kind in {"strategy", "plan"}
+        self.records.extend(records)
+
+    def score(self, query_vec, mode: str, rows=None):
+        """Scores for every record, or only for the positions in `rows`."""
+        sel = slice(0, len(self.records)) if rows is None else rows
+        base = np.clip(self._rows[sel] @ query_vec, 0.0, 1.0)
+        if mode == "facts":
+            base = base + _MODE_BONUS * self._is_fact[sel]
+        elif mode == "strategy":
+            base = base + _MODE_BONUS * self._is_strategy[sel]
+        return np.minimum(1.0, base * self._weights[sel])
+
+
 class VectorScorer(Scorer):
     """Vector-like scorer with optional real embeddings.
 
@@ -26,53 +117,107 @@ class VectorScorer(Scorer):
         dim: int = 256,
         use_sentence_transformers: bool = True,
         model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        cache_max_entries: int = 10000,
+        cache_max_bytes: int = 64 * 1024 * 1024,
+        cache_path: Optional[str] = None,
     ) -> None:
         if dim <= 0:
             raise ValueError("dim must be positive")
         self.dim = dim
         self.model_name = model_name
         self.use_sentence_transformers = bool(use_sentence_transformers)
-        self._cache: Dict[str, list[float]] = {}
+        self._cache = EmbeddingCache(
+            max_entries=cache_max_entries,
+            max_bytes=cache_max_bytes,
+            path=cache_path,
+        )
+        self._matrix: Optional[_EmbeddingMatrix] = None
+        self._matrix_lock = threading.Lock()
 
         self._st_model = None
+        self._service: Optional[EmbeddingService] = None
         if self.use_sentence_transformers:
-            try:
-                from sentence_transformers import SentenceTransformer
-
-                # Lazy-ish init: construct once, reuse, and keep fallback path.
-                self._st_model = SentenceTransformer(self.model_name)
-            except Exception:
-                self._st_model = None
+            # The model is loaded once per process and shared with the vector
+            # recall leg, which embeds the same queries.
+            service = get_embedding_service(self.model_name)
+            self._st_model = service.model()
+            if self._st_model is not None:
+                self._service = service
 
     def _hash_token(self, token: str) -> int:
-        h = hashlib.sha256(token.encode("utf-8")).digest()
-        return int.from_bytes(h[:4], "big")
+        return _hash_token(token)
+
+    def _embedder(self) -> str:
+        return "st" if self._st_model is not None else "hash"
 
     def embed(self, text: str) -> list[float]:
-        key = f"{self.model_name}:{self.dim}:{text}"
+        key = embedding_cache_key(self.model_name, self.dim, text, self._embedder())
         cached = self._cache.get(key)
         if cached is not None:
             return cached
 
         # Prefer real embeddings when available.
+        if self._service is not None and self._st_model is self._service.model():
+            vec = self._service.embed(text)
+            if vec is not None:
+                self._cache.put(key, vec)
+                return vec
         if self._st_model is not None:
             emb = self._st_model.encode([text], normalize_embeddings=True)
             vec = [float(x) for x in emb[0].tolist()]
-            self._cache[key] = vec
+            self._cache.put(key, vec)
             return vec
 
         # Fallback: hashed bag-of-words embedding
-        vec = [0.0] * self.dim
-        for tok in _tokenize(text):
-            idx = self._hash_token(tok) % self.dim
-            vec[idx] += 1.0
-
-        # L2 normalize
-        norm = math.sqrt(sum(v * v for v in vec)) or 1.0
-        vec = [v / norm for v in vec]
-        self._cache[key] = vec
+        vec = _hashed_embedding(text, self.dim)
+        self._cache.put(key, vec)
         return vec
 
+    def embed_many(self, texts: Sequence[str], batch_size: int = 64, workers: int = 1) -> List[list[float]]:
+        """Embed many texts, encoding cache misses `batch_size` at a time.
+
+        With sentence-transformers, each batch is one `encode` call. The
+        hashed fallback can spread large batches over `workers` processes.
+        """
+        batch_size = max(1, int(batch_size))
+        embedder = self._embedder()
+        keys = [embedding_cache_key(self.model_name, self.dim, text, embedder) for text in texts]
+        out: List[Optional[list[float]]] = [self._cache.get(key) for key in keys]
+        missing = [i for i, vec in enumerate(out) if vec is None]
+
+        pool = None
+        if self._st_model is None and workers > 1 and len(missing) > 1:
+            pool = ProcessPoolExecutor(max_workers=int(workers))
+        try:
+            for start in range(0, len(missing), batch_size):
+                chunk = missing[start : start + batch_size]
+                chunk_texts = [texts[i] for i in chunk]
+                shared = None
+                if self._service is not None and self._st_model is self._service.model():
+                    # Goes through the shared query cache the vector leg fills.
+                    shared = self._service.embed_many(chunk_texts)
+                if shared is not None and len(shared) == len(chunk_texts):
+                    vecs = shared
+                elif self._st_model is not None:
+                    emb = self._st_model.encode(chunk_texts, normalize_embeddings=True)
+                    vecs = [[float(x) for x in row.tolist()] for row in emb]
+                elif pool is not None:
+                    chunksize = max(1, len(chunk_texts) // (int(workers) * 4))
+                    vecs = list(pool.map(_hashed_embedding, chunk_texts, repeat(self.dim), chunksize=chunksize))
+                else:
+                    vecs = [_hashed_embedding(text, self.dim) for text in chunk_texts]
+                for i, vec in zip(chunk, vecs):
+                    self._cache.put(keys[i], vec)
+                    out[i] = vec
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return [vec if vec is not None else self.embed(texts[i]) for i, vec in enumerate(out)]
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Embedding cache counters (hits/misses/evictions/resident bytes)."""
+        return self._cache.stats()
+
     def record_text(self, record: BrainRecord) -> str:
         return " ".join(
             [
@@ -90,30 +235,72 @@ class VectorScorer(Scorer):
             dot += a[i] * b[i]
         return dot
 
+    def record_vector(self, record: BrainRecord) -> list[float]:
+        """Stored embedding when present, otherwise an on-the-fly embedding."""
+        meta = record.metadata or {}
+        emb = meta.get("embedding")
+        if isinstance(emb, list) and emb:
+            return [float(x) for x in emb]
+        return self.embed(self.record_text(record))
+
     def score(self, query: str, record: BrainRecord, mode: str) -> float:
         if not query.strip():
             return 0.0
 
-        record_text = self.record_text(record)
         qv = self.embed(query)
-
-        rv = None
-        meta = record.metadata or {}
-        emb = meta.get("embedding")
-        if isinstance(emb, list) and emb:
-            rv = [float(x) for x in emb]
-        if rv is None:
-            rv = self.embed(record_text)
+        rv = self.record_vector(record)
         base = max(0.0, min(1.0, self.cosine(qv, rv)))
 
         mode_bonus = 0.0
         kind = (record.kind or "").strip().lower()
         if mode == "facts" and kind in {"fact", "facts"}:
-            mode_bonus = 0.05
+            mode_bonus = _MODE_BONUS
         if mode == "strategy" and kind in {"strategy", "plan"}:
-            mode_bonus = 0.05
+            mode_bonus = _MODE_BONUS
 
-        priority_weight = {"P0": 1.2, "P1": 1.0, "P2": 0.85}.get(record.priority, 1.0)
+        priority_weight = _PRIORITY_WEIGHTS.get(record.priority, 1.0)
         decay_weight = record.decay if record.decay > 0 else 0.1
 
         return min(1.0, (base + mode_bonus) * priority_weight * math.sqrt(decay_weight))
+
+    def score_batch(self, query: str, records: Sequence[BrainRecord], mode: str) -> List[float]:
+        """Score many records with one matrix-vector product.
+
+        Record embeddings are packed into a float32 matrix that is reused across
+        queries as long as `records` extends the previously scored sequence
+        (same objects, same order). Without numpy this falls back to `score()`.
+        """
+        if not records:
+            return []
+        if not query.strip():
+            return [0.0] * len(records)
+        if np is None:
+            return [self.score(query, rec, mode) for rec in records]
+
+        qv = np.asarray(self.embed(query), dtype=np.float32)
+        matrix = self._matrix_for(records, qv.shape[0])
+        return matrix.score(qv, mode).tolist()
+
+    def score_rows(
+        self, query: str, records: Sequence[BrainRecord], positions: Sequence[int], mode: str
+    ) -> List[float]:
+        """Like `score_batch`, but only for `records[positions]` (e.g. filter candidates)."""
+        if not positions:
+            return []
+        if not query.strip():
+            return [0.0] * len(positions)
+        if np is None:
+            return [self.score(query, records[i], mode) for i in positions]
+
+        qv = np.asarray(self.embed(query), dtype=np.float32)
+        matrix = self._matrix_for(records, qv.shape[0])
+        return matrix.score(qv, mode, np.asarray(positions, dtype=np.intp)).tolist()
+
+    def _matrix_for(self, records: Sequence[BrainRecord], dim: int) -> _EmbeddingMatrix:
+        with self._matrix_lock:
+            matrix = self._matrix
+            if matrix is None or matrix.dim != dim or not matrix.is_prefix_of(records):
+                matrix = _EmbeddingMatrix(dim)
+            matrix.extend(records[len(matrix) :], self.record_vector)
+            self._matrix = matrix
+            return matrix
@@ -14,7 +14,7 @@ Both APIs work simultaneously - no breaking changes!
 import asyncio
 import os
 
-from .compat_async import run_coro_sync
+from .compat_async import configure_sync_bridge, get_sync_bridge_mode, run_coro_sync
 from typing import List, Dict, Any, Optional
 import logging
 
@@ -22,10 +22,12 @@ try:
     from .core.plugin_system import get_plugin_registry, PluginState
     from .core.config_manager import get_config_manager
     from .plugins.nexus_core_plugin import RecallResult
+    from .storage.base import StorageResult
 except ImportError:
     from core.plugin_system import get_plugin_registry, PluginState
     from core.config_manager import get_config_manager
     from plugins.nexus_core_plugin import RecallResult
+    from storage.base import StorageResult
 
 logger = logging.getLogger(__name__)
 
@@ -84,6 +86,14 @@ def nexus_init(config_path: Optional[str] = None) -> bool:
             "flush_manager",
         ]
     cfg["plugins"] = plugins_cfg
+    bridge_cfg = cfg.get("compat", {}) if isinstance(cfg.get("compat", {}), dict) else {}
+    if bridge_cfg.get("sync_bridge") or bridge_cfg.get("timeout_sec"):
+        try:
+            configure_sync_bridge(
+                str(bridge_cfg.get("sync_bridge") or get_sync_bridge_mode()), bridge_cfg.get("timeout_sec")
+            )
+        except ValueError as e:
+            logger.warning(f"Ignoring compat.sync_bridge={bridge_cfg.get('sync_bridge')!r}: {e}")
     brain_cfg = cfg.get("brain", {}) if isinstance(cfg, dict) else {}
     env_enabled = os.environ.get("DEEPSEA_BRAIN_ENABLED", "").strip().lower() in {"1", "true", "yes", "on"}
     brain_enabled = bool(brain_cfg.get("enabled", False) or env_enabled)
@@ -120,13 +130,15 @@ def nexus_init(config_path: Optional[str] = None) -> bool:
     return bool(ok and ok2)
 
 
-def nexus_recall(query: str, n: int = 5) -> List[RecallResult]:
+def nexus_recall(query: str, n: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[RecallResult]:
     """
     Semantic recall/search (v2.x compatible)
     
     Args:
         query: Search query
         n: Number of results to return
+        filters: Optional metadata filters (tags, type, conversation_id,
+            date_from, date_to, priority), applied before scoring
         
     Returns:
         List of RecallResult objects
@@ -151,6 +163,8 @@ def nexus_recall(query: str, n: int = 5) -> List[RecallResult]:
     
     # Run async search
     try:
+        if filters:
+            return run_coro_sync(plugin.search_recall(query, n, filters=filters))
         return run_coro_sync(plugin.search_recall(query, n))
     except Exception as e:
         logger.error(f"Recall error: {e}")
@@ -161,6 +175,92 @@ def nexus_recall(query: str, n: int = 5) -> List[RecallResult]:
 nexus_search = nexus_recall
 
 
+def nexus_recall_many(queries: List[str], n: int = 5, max_concurrency: int = 8) -> List[List[RecallResult]]:
+    """
+    Recall several queries with a single sync/async bridge crossing.
+    
+    Queries run concurrently (at most `max_concurrency` in flight); each
+    recall's brain and vector legs run on the nexus_core recall thread pool.
+    
+    Args:
+        queries: Search queries
+        n: Number of results per query
+        max_concurrency: Maximum recalls in flight
+        
+    Returns:
+        One result list per query, in input order ([] for a failed query)
+    """
+    if not queries:
+        return []
+    registry = get_plugin_registry()
+    plugin = registry.get("nexus_core")
+    
+    # Auto-initialize if needed
+    if plugin is None or plugin.state != PluginState.ACTIVE:
+        if not nexus_init():
+            logger.error("Failed to initialize Nexus")
+            return [[] for _ in queries]
+        plugin = registry.get("nexus_core")
+    
+    if plugin is None:
+        return [[] for _ in queries]
+    
+    async def _recall_all() -> List[List[RecallResult]]:
+        sem = asyncio.Semaphore(max(1, int(max_concurrency)))
+
+        async def _one(query: str) -> List[RecallResult]:
+            async with sem:
+                try:
+                    return await plugin.search_recall(query, n)
+                except Exception as e:
+                    logger.error(f"Recall error: {e}")
+                    return []
+
+        return list(await asyncio.gather(*(_one(q) for q in queries)))
+    
+    try:
+        return run_coro_sync(_recall_all())
+    except Exception as e:
+        logger.error(f"Recall error: {e}")
+        return [[] for _ in queries]
+
+
+def nexus_recall_batch(
+    queries: List[str], n: int = 5, filters: Optional[Dict[str, Any]] = None
+) -> List[List[RecallResult]]:
+    """
+    Recall several queries as one batch (one embedding call, one vector query).
+    
+    Args:
+        queries: Search queries
+        n: Number of results per query
+        filters: Optional metadata filters, as for `nexus_recall`
+        
+    Returns:
+        One result list per query, in input order
+    """
+    if not queries:
+        return []
+    registry = get_plugin_registry()
+    plugin = registry.get("nexus_core")
+    
+    # Auto-initialize if needed
+    if plugin is None or plugin.state != PluginState.ACTIVE:
+        if not nexus_init():
+            logger.error("Failed to initialize Nexus")
+            return [[] for _ in queries]
+        plugin = registry.get("nexus_core")
+    
+    if plugin is None:
+        return [[] for _ in queries]
+    
+    try:
+        return run_coro_sync(plugin.search_recall_batch(list(queries), n, filters=filters))
+    except Exception as e:
+        logger.error(f"Recall error: {e}")
+        return [[] for _ in queries]
+
+
 def nexus_add(content: str, title: str, tags: str = "") -> Optional[str]:
     """
     Add document to index (v2.x compatible)
@@ -214,17 +314,41 @@ def nexus_add_documents(documents: List[Dict[str, str]], batch_size: int = 10) -
     Returns:
         List of document IDs
     """
-    results = []
+    return [r.data for r in nexus_add_documents_batch(documents, batch_size) if r.success]
+
+
+def nexus_add_documents_batch(documents: List[Dict[str, str]], batch_size: int = 64) -> List[StorageResult]:
+    """
+    Bulk-add documents, crossing the sync/async bridge once per batch.
     
-    for doc in documents:
-        doc_id = nexus_add(
-            content=doc.get("content", ""),
-            title=doc.get("title", ""),
-            tags=doc.get("tags", ""),
-        )
-        if doc_id:
-            results.append(doc_id)
+    Args:
+        documents: List of {content, title, tags, doc_id} dicts
+        batch_size: Documents per backend call
+        
+    Returns:
+        One StorageResult per document (data = doc ID on success)
+    """
+    registry = get_plugin_registry()
+    plugin = registry.get("nexus_core")
     
+    # Auto-initialize if needed
+    if plugin is None or plugin.state != PluginState.ACTIVE:
+        if not nexus_init():
+            return [StorageResult.err("nexus not initialized") for _ in documents]
+        plugin = registry.get("nexus_core")
+    
+    if plugin is None:
+        return [StorageResult.err("nexus_core plugin not loaded") for _ in documents]
+    
+    batch_size = max(1, int(batch_size))
+    results: List[StorageResult] = []
+    for i in range(0, len(documents), batch_size):
+        batch = documents[i:i + batch_size]
+        try:
+            results.extend(run_coro_sync(plugin.add_documents_batch(batch, batch_size=len(batch))))
+        except Exception as e:
+            logger.error(f"Add error: {e}")
+            results.extend(StorageResult.err(str(e)) for _ in batch)
     return results
 
 
@@ -452,9 +576,9 @@ def brain_list_versions() -> List[str]:
     return list(_brain_list_versions())
 
 
-def brain_backfill_embeddings(limit: int = 0) -> Dict[str, int]:
+def brain_backfill_embeddings(limit: int = 0, batch_size: int = 64, workers: int = 1) -> Dict[str, int]:
     """Optional brain-layer embedding backfill hook (MVP)."""
-    return _brain_backfill_embeddings(limit=limit)
+    return _brain_backfill_embeddings(limit=limit, batch_size=batch_size, workers=workers)
 
 
 def get_version() -> str:
@@ -468,9 +592,12 @@ __all__ = [
     "nexus_init",
     "nexus_recall",
     "nexus_search",
+    "nexus_recall_many",
+    "nexus_recall_batch",
     "nexus_add",
     "nexus_add_document",
     "nexus_add_documents",
+    "nexus_add_documents_batch",
     "nexus_stats",
     "nexus_health",
     
@@ -4,9 +4,15 @@ The legacy API surface in `compat.py` is synchronous, but the v3 system is async
 Python 3.11 tightened event loop semantics (no implicit default loop), so we
 provide a deterministic bridge:
 
-- If no running loop: run via `asyncio.run()`.
-- If already inside a running loop: use a dedicated background loop thread and
+- mode "auto" (default): with no running loop, run via `asyncio.run()`;
+  inside a running loop, use a dedicated background loop thread and
   `run_coroutine_threadsafe`.
+- mode "background": always dispatch onto the single long-lived background
+  loop, so loop-bound plugin state (locks, tasks) survives between calls and
+  repeated sync calls don't pay for a new loop each time.
+
+The mode comes from `configure_sync_bridge()` or the
+`DEEPSEA_NEXUS_SYNC_BRIDGE` environment variable.
 
 This avoids `RuntimeError: There is no current event loop in thread 'MainThread'.`
 """
@@ -14,44 +20,84 @@ This avoids `RuntimeError: There is no current event loop in thread 'MainThread'
 from __future__ import annotations
 
 import asyncio
+import os
 import threading
-from concurrent.futures import Future
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from typing import Any, Coroutine, Optional, TypeVar
 
 T = TypeVar("T")
 
+BRIDGE_MODES = {"auto", "background"}
 
 _BG_LOOP: Optional[asyncio.AbstractEventLoop] = None
 _BG_THREAD: Optional[threading.Thread] = None
 _BG_LOCK = threading.Lock()
+_MODE = os.environ.get("DEEPSEA_NEXUS_SYNC_BRIDGE", "auto").strip().lower() or "auto"
+_DEFAULT_TIMEOUT: Optional[float] = None
+
+
+def configure_sync_bridge(mode: str = "auto", timeout: Optional[float] = None) -> None:
+    """Select the bridge mode and the default timeout (seconds) for `run_coro_sync`."""
+    global _MODE, _DEFAULT_TIMEOUT
+    mode = (mode or "auto").strip().lower()
+    if mode not in BRIDGE_MODES:
+        raise ValueError("sync bridge mode must be one of auto/background")
+    timeout = float(timeout) if timeout else None
+    _MODE = mode
+    _DEFAULT_TIMEOUT = timeout
+
+
+def get_sync_bridge_mode() -> str:
+    return _MODE if _MODE in BRIDGE_MODES else "auto"
 
 
 def _ensure_bg_loop() -> asyncio.AbstractEventLoop:
     global _BG_LOOP, _BG_THREAD
     with _BG_LOCK:
-        if _BG_LOOP is not None and _BG_LOOP.is_running():
+        if _BG_LOOP is not None and _BG_THREAD is not None and _BG_THREAD.is_alive():
             return _BG_LOOP
 
         loop = asyncio.new_event_loop()
+        started = threading.Event()
 
         def runner() -> None:
             asyncio.set_event_loop(loop)
+            loop.call_soon(started.set)
             loop.run_forever()
 
         t = threading.Thread(target=runner, name="deepsea-nexus-bg-loop", daemon=True)
         t.start()
+        # Wait until the loop runs so concurrent callers never start a second one.
+        started.wait()
         _BG_LOOP = loop
         _BG_THREAD = t
         return loop
 
 
 def run_coro_sync(coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
-    """Run an async coroutine from sync code safely."""
-    try:
-        asyncio.get_running_loop()
-    except RuntimeError:
-        return asyncio.run(coro)
+    """Run an async coroutine from sync code safely.
+
+    `timeout` (or the configured default) bounds the wait; on expiry the
+    coroutine is cancelled and `TimeoutError` is raised.
+    """
+    if timeout is None:
+        timeout = _DEFAULT_TIMEOUT
+
+    if get_sync_bridge_mode() == "auto":
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            if timeout is not None:
+                return asyncio.run(asyncio.wait_for(coro, timeout))
+            return asyncio.run(coro)
 
     loop = _ensure_bg_loop()
+    if threading.current_thread() is _BG_THREAD:
+        coro.close()
+        raise RuntimeError("run_coro_sync called from the bridge loop thread; await the coroutine instead")
     fut: Future[T] = asyncio.run_coroutine_threadsafe(coro, loop)
-    return fut.result(timeout=timeout)
+    try:
+        return fut.result(timeout=timeout)
+    except FutureTimeoutError:
+        fut.cancel()
+        raise TimeoutError(f"coroutine did not finish within {timeout}s") from None
@@ -78,11 +78,18 @@ class ConfigManager:
             "keep_archived_days": 90,
         },
         "storage": {
-            "vector_backend": "chromadb",  # chromadb, faiss, milvus
+            "vector_backend": "chromadb",  # chromadb, numpy (async_backend only), faiss, milvus
             "session_backend": "json",     # json, sqlite, redis
             "cache_enabled": True,
             "cache_size": 128,
             "batch_size": 10,
+            # Registered async VectorStorageBackend instead of the sync VectorStore
+            "async_backend": False,
+            "workers": 4,
+            "write_behind": True,
+            "write_batch_size": 64,
+            "write_flush_interval_sec": 0.05,
+            "write_queue_max": 10000,
         },
         "recall": {
             "default_limit": 5,
@@ -90,6 +97,19 @@ class ConfigManager:
             "min_relevance": 0.0,
             "cache_enabled": True,
             "cache_size": 128,
+            "cache_ttl_sec": 60.0,
+            "executor_workers": 4,
+            "brain_timeout_sec": 2.0,
+            "brain_cold_timeout_sec": 30.0,  # until the brain index and model are loaded
+            "vector_timeout_sec": 5.0,
+            "shared_embeddings": True,
+            "fusion": "legacy",  # legacy, rrf, calibrated
+            "fusion_rrf_k": 60,
+            "leg_k": 0,  # per-leg fetch size for rrf/calibrated (0 = n)
+        },
+        "compat": {
+            "sync_bridge": None,  # auto, background; None keeps DEEPSEA_NEXUS_SYNC_BRIDGE / auto
+            "timeout_sec": None,
         },
         "summary": {
             "enabled": True,
@@ -123,6 +143,7 @@ class ConfigManager:
         "NEXUS_FLUSH_ENABLED": ("flush.enabled", lambda x: x.lower() in ("true", "1", "yes")),
         "NEXUS_FLUSH_COMPRESS": ("flush.compress_enabled", lambda x: x.lower() in ("true", "1", "yes")),
         "NEXUS_LOG_LEVEL": ("logging.level", str),
+        "DEEPSEA_NEXUS_SYNC_BRIDGE": ("compat.sync_bridge", lambda x: x.strip().lower()),
     }
     
     def __init__(self, config_path: Optional[str] = None):
@@ -7,19 +7,100 @@ Simplified core with storage abstraction and unified compression.
 
 import sys
 import os
-from typing import List, Dict, Any, Optional
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from functools import lru_cache
 
-from ..core.plugin_system import NexusPlugin, PluginMetadata
+from ..core.plugin_system import NexusPlugin, PluginMetadata, PluginState
 from ..core.event_bus import EventTypes
 from ..core.config_manager import get_config_manager
-from ..storage.base import RecallResult, StorageResult
+from ..storage.base import RecallResult, StorageBackendFactory, StorageResult, VectorStorageBackend
+from ..storage.chroma_backend import (
+    DATE_FILTER_OVERFETCH,
+    chroma_where as _chroma_where,
+    filter_by_date,
+    has_date_filter,
+)
+from .recall_fusion import FUSION_METHODS, RRF_K, fuse, legacy_merge
 
 import logging
 logger = logging.getLogger(__name__)
 
 
+def _normalize_query(query: str) -> str:
+    return " ".join((query or "").lower().split())
+
+
+def _filters_key(filters: Dict[str, Any]) -> Tuple:
+    return tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in filters.items()))
+
+
+class _RecallCache:
+    """TTL + LRU cache of search_recall results.
+
+    Keys include the write generation, so entries from before a write simply
+    stop matching and age out of the LRU.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl_seconds: float = 60.0) -> None:
+        self.max_entries = max(0, int(max_entries))
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self._entries: "OrderedDict[Tuple, Tuple[float, List[RecallResult]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def get(self, key: Tuple) -> Optional[List[RecallResult]]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and self.ttl_seconds and time.monotonic() - item[0] > self.ttl_seconds:
+                del self._entries[key]
+                self.expired += 1
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(item[1])
+
+    def put(self, key: Tuple, results: List[RecallResult]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), list(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
 class NexusCorePlugin(NexusPlugin):
     """
     Nexus Core Plugin - Semantic Memory System
@@ -52,6 +133,38 @@ class NexusCorePlugin(NexusPlugin):
         self._brain_mode = "facts"
         self._brain_min_score = 0.2
         self._brain_merge = "append"  # append|replace
+
+        # Recall legs (brain / vector) run on a bounded thread pool so the
+        # event loop stays responsive while Chroma or the brain store work.
+        self._recall_workers = 4
+        self._brain_timeout = 2.0
+        # Used until the brain index/snapshot/model are resident (warm-up in
+        # initialize, or the first brain recall that completes).
+        self._brain_cold_timeout = 30.0
+        self._brain_warm = threading.Event()
+        self._vector_timeout = 5.0
+        self._recall_executor: Optional[ThreadPoolExecutor] = None
+        self._recall_lock = threading.Lock()
+        self._recall_queued = 0
+        self._recall_running = 0
+        self._recall_stats: Dict[str, Dict[str, Any]] = {}
+
+        # Result cache, invalidated by `_generation` (vector writes/deletes)
+        # and the brain write generation.
+        self._recall_cache: Optional[_RecallCache] = _RecallCache()
+        self._generation = 0
+
+        # Process-wide query embedder shared with the brain scorer; None means
+        # Chroma embeds `query_texts` itself.
+        self._embedding_service = None
+
+        # How brain + vector legs are merged (see recall_fusion). With rrf /
+        # calibrated fusion each leg fetches `_leg_k` results (0 = n).
+        self._fusion = "legacy"
+        self._fusion_k = RRF_K
+        self._fusion_calibration: Optional[Dict[str, Any]] = None
+        self._fusion_weights: Optional[Dict[str, float]] = None
+        self._leg_k = 0
     
     async def initialize(self, config: Dict[str, Any]) -> bool:
         """Initialize Nexus Core"""
@@ -72,6 +185,38 @@ class NexusCorePlugin(NexusPlugin):
                 "embedder_name": config.get("nexus", {}).get("embedder_name", "all-MiniLM-L6-v2"),
                 "cache_size": config.get("recall", {}).get("cache_size", 128),
             }
+            recall_cfg = config.get("recall", {}) if isinstance(config, dict) else {}
+            self._recall_workers = max(1, int(recall_cfg.get("executor_workers", 4)))
+            self._brain_timeout = float(recall_cfg.get("brain_timeout_sec", 2.0))
+            self._brain_cold_timeout = max(
+                self._brain_timeout, float(recall_cfg.get("brain_cold_timeout_sec", 30.0))
+            )
+            self._vector_timeout = float(recall_cfg.get("vector_timeout_sec", 5.0))
+            if recall_cfg.get("cache_enabled", True):
+                self._recall_cache = _RecallCache(
+                    max_entries=int(recall_cfg.get("cache_size", 128)),
+                    ttl_seconds=float(recall_cfg.get("cache_ttl_sec", 60.0)),
+                )
+            else:
+                self._recall_cache = None
+            if recall_cfg.get("shared_embeddings", True):
+                try:
+                    from ..brain.embedding_service import get_embedding_service
+
+                    self._embedding_service = get_embedding_service(self._config["embedder_name"])
+                    self._embedding_service.warm_up()
+                except Exception as e:
+                    logger.warning(f"Shared embedding service unavailable: {e}")
+                    self._embedding_service = None
+            fusion = str(recall_cfg.get("fusion", "legacy")).strip().lower()
+            if fusion not in FUSION_METHODS:
+                logger.warning(f"Unknown recall fusion '{fusion}'; using legacy merge")
+                fusion = "legacy"
+            self._fusion = fusion
+            self._fusion_k = max(1, int(recall_cfg.get("fusion_rrf_k", RRF_K)))
+            self._fusion_calibration = recall_cfg.get("fusion_calibration") or None
+            self._fusion_weights = recall_cfg.get("fusion_weights") or None
+            self._leg_k = max(0, int(recall_cfg.get("leg_k", 0)))
 
             # Optional brain hook config
             brain_cfg = config.get("brain", {}) if isinstance(config, dict) else {}
@@ -84,6 +229,8 @@ class NexusCorePlugin(NexusPlugin):
             brain_max_snapshots = int(brain_cfg.get("max_snapshots", 20))
             brain_backfill_on_start = bool(brain_cfg.get("backfill_on_start", False))
             brain_backfill_limit = int(brain_cfg.get("backfill_limit", 0))
+            brain_backfill_batch_size = int(brain_cfg.get("backfill_batch_size", 64))
+            brain_backfill_workers = int(brain_cfg.get("backfill_workers", 1))
             brain_dedupe_on_write = bool(brain_cfg.get("dedupe_on_write", False))
             brain_dedupe_recent_max = int(brain_cfg.get("dedupe_recent_max", 5000))
             brain_track_usage = bool(brain_cfg.get("track_usage", True))
@@ -94,14 +241,23 @@ class NexusCorePlugin(NexusPlugin):
             brain_tiered_order = brain_cfg.get("tiered_order")
             brain_tiered_limits = brain_cfg.get("tiered_limits")
             brain_dedupe_on_recall = bool(brain_cfg.get("dedupe_on_recall", True))
+            brain_compaction = str(brain_cfg.get("compaction", "memory"))
+            brain_compaction_run_size = int(brain_cfg.get("compaction_run_size", 50000))
+            brain_snapshot_format = str(brain_cfg.get("snapshot_format", "jsonl"))
+            brain_usage_flush_max_ids = int(brain_cfg.get("usage_flush_max_ids", 256))
+            brain_usage_flush_interval_seconds = float(brain_cfg.get("usage_flush_interval_seconds", 5.0))
             brain_novelty_cfg = brain_cfg.get("novelty", {}) if isinstance(brain_cfg, dict) else {}
             brain_novelty_enabled = bool(brain_novelty_cfg.get("enabled", False))
             brain_novelty_min_similarity = float(brain_novelty_cfg.get("min_similarity", 0.92))
             brain_novelty_window_seconds = int(brain_novelty_cfg.get("window_seconds", 3600))
+            brain_cache_cfg = brain_cfg.get("embedding_cache", {}) if isinstance(brain_cfg, dict) else {}
+            brain_cache_max_entries = int(brain_cache_cfg.get("max_entries", 10000))
+            brain_cache_max_bytes = int(brain_cache_cfg.get("max_bytes", 64 * 1024 * 1024))
+            brain_cache_path = brain_cache_cfg.get("path") or None
 
             if self._brain_enabled:
                 try:
-                    from ..brain.api import configure_brain, backfill_embeddings
+                    from ..brain.api import configure_brain, backfill_embeddings, warm_up
                     import threading
 
                     configure_brain(
@@ -122,14 +278,40 @@ class NexusCorePlugin(NexusPlugin):
                         tiered_order=brain_tiered_order,
                         tiered_limits=brain_tiered_limits,
                         dedupe_on_recall=brain_dedupe_on_recall,
+                        embedding_cache_max_entries=brain_cache_max_entries,
+                        embedding_cache_max_bytes=brain_cache_max_bytes,
+                        embedding_cache_path=brain_cache_path,
+                        compaction=brain_compaction,
+                        compaction_run_size=brain_compaction_run_size,
+                        snapshot_format=brain_snapshot_format,
+                        usage_flush_max_ids=brain_usage_flush_max_ids,
+                        usage_flush_interval_seconds=brain_usage_flush_interval_seconds,
                     )
                     self._brain_available = True
                     logger.info("✓ Brain hook enabled")
 
+                    def _warm_up_task():
+                        try:
+                            loaded = warm_up(self._brain_mode)
+                            self._brain_warm.set()
+                            logger.debug(f"Brain warm-up loaded {loaded} records")
+                        except Exception as e:
+                            logger.warning(f"Brain warm-up failed: {e}")
+
+                    threading.Thread(target=_warm_up_task, name="brain-warmup", daemon=True).start()
+
                     if brain_backfill_on_start:
                         def _backfill_task():
                             try:
-                                stats = backfill_embeddings(limit=brain_backfill_limit)
+                                stats = backfill_embeddings(
+                                    limit=brain_backfill_limit,
+                                    batch_size=brain_backfill_batch_size,
+                                    workers=brain_backfill_workers,
+                                    progress=lambda p: logger.debug(
+                                        f"Brain backfill {p['position']}/{p['total']} "
+                                        f"({p['rate']:.1f} rec/s, eta {p['eta_seconds']:.0f}s)"
+                                    ),
+                                )
                                 logger.info(f"✓ Brain backfill complete: {stats}")
                             except Exception as e:
                                 logger.warning(f"Brain backfill failed: {e}")
@@ -143,158 +325,598 @@ class NexusCorePlugin(NexusPlugin):
             if self._available:
                 logger.info("🔄 Initializing vector store...")
 
-                store = create_vector_store(config)
+                storage_cfg = config.get("storage", {}) if isinstance(config, dict) else {}
+                store = None
+                if storage_cfg.get("async_backend", False):
+                    store = await self._create_storage_backend(storage_cfg)
+                if store is None:
+                    store = create_vector_store(config)
                 self._vector_backend = store
 
                 stats = await self._get_stats()
                 logger.info(f"✓ Nexus Core ready ({stats.get('total_documents', 0)} documents)")
 
             return True
-            
+
         except Exception as e:
             logger.exception("✗ Nexus Core init failed")
             return False
-    
+
+    async def _create_storage_backend(self, storage_cfg: Dict[str, Any]) -> Optional[VectorStorageBackend]:
+        """Create the registered async vector backend named by `storage.vector_backend`.
+
+        Returns None when it can't be created, so the caller falls back to
+        the synchronous VectorStore.
+        """
+        # Importing registers the bundled backends with the factory.
+        from ..storage import chroma_backend, numpy_backend  # noqa: F401
+
+        name = str(storage_cfg.get("vector_backend", "chromadb"))
+        backend_cfg = dict(storage_cfg)
+        backend_cfg.setdefault("persist_path", self._config.get("vector_db_path"))
+        backend_cfg.setdefault("embedder_name", self._config.get("embedder_name"))
+        try:
+            backend = StorageBackendFactory.create_vector(name, backend_cfg)
+            if await backend.initialize(backend_cfg):
+                logger.info(f"✓ Async vector backend '{name}' ready")
+                return backend
+            logger.warning(f"Async vector backend '{name}' failed to initialize; using VectorStore")
+        except Exception as e:
+            logger.warning(f"Async vector backend '{name}' unavailable ({e}); using VectorStore")
+        return None
+
     async def start(self) -> bool:
         """Start the plugin"""
         logger.info("✓ Nexus Core started")
         return True
-    
+
     async def stop(self) -> bool:
         """Stop the plugin"""
-        if self._vector_backend:
-            # Cleanup if needed
-            pass
+        if isinstance(self._vector_backend, VectorStorageBackend):
+            # Drains the write-behind queue before the workers go away.
+            await self._vector_backend.close()
+        if self._recall_executor is not None:
+            # Timed-out legs may still be running; don't block shutdown on them.
+            self._recall_executor.shutdown(wait=False)
+            self._recall_executor = None
         logger.info("✓ Nexus Core stopped")
         return True
     
     # Core API Methods
     
-    async def search_recall(self, query: str, n: int = 5) -> List[RecallResult]:
-        """Semantic search, optionally augmented by brain store (feature-flagged)."""
-        out: List[RecallResult] = []
+    def _get_recall_executor(self) -> ThreadPoolExecutor:
+        with self._recall_lock:
+            if self._recall_executor is None:
+                self._recall_executor = ThreadPoolExecutor(
+                    max_workers=self._recall_workers, thread_name_prefix="nexus-recall"
+                )
+            return self._recall_executor
 
-        # 1) Brain recall (optional)
-        if self._brain_enabled and self._brain_available:
+    def _leg_stats(self, leg: str) -> Dict[str, Any]:
+        return self._recall_stats.setdefault(
+            leg, {"calls": 0, "timeouts": 0, "errors": 0, "total_ms": 0.0, "last_ms": 0.0, "max_ms": 0.0}
+        )
+
+    def _record_leg(self, leg: str, outcome: str, elapsed_ms: float = 0.0) -> None:
+        with self._recall_lock:
+            stats = self._leg_stats(leg)
+            if outcome == "timeout":
+                stats["timeouts"] += 1
+                return
+            stats["calls"] += 1
+            if outcome == "error":
+                stats["errors"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["last_ms"] = elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    def recall_metrics(self) -> Dict[str, Any]:
+        """Recall executor queue depth and per-leg latency counters."""
+        with self._recall_lock:
+            legs = {}
+            for leg, stats in self._recall_stats.items():
+                calls = stats["calls"]
+                legs[leg] = {
+                    "calls": calls,
+                    "timeouts": stats["timeouts"],
+                    "errors": stats["errors"],
+                    "avg_ms": round(stats["total_ms"] / calls, 3) if calls else 0.0,
+                    "last_ms": round(stats["last_ms"], 3),
+                    "max_ms": round(stats["max_ms"], 3),
+                }
+            return {
+                "workers": self._recall_workers,
+                "queue_depth": self._recall_queued,
+                "running": self._recall_running,
+                "legs": legs,
+            }
+
+    async def _run_recall_leg(
+        self, leg: str, fn: Callable[[], Any], timeout: float
+    ) -> Optional[List[RecallResult]]:
+        """Run one recall leg off the event loop.
+
+        Synchronous legs run on the recall executor; coroutine functions
+        (async storage backends) are awaited directly. Returns None when the
+        leg failed or timed out (degraded), so the caller can still serve
+        whatever the other leg produced.
+        """
+
+        async def _coro_job() -> List[RecallResult]:
+            started = time.perf_counter()
+            outcome = "ok"
             try:
-                from ..brain.api import brain_retrieve
+                return await fn()
+            except Exception:
+                outcome = "error"
+                raise
+            finally:
+                self._record_leg(leg, outcome, (time.perf_counter() - started) * 1000.0)
 
-                # Determine how many brain results to pull based on merge strategy
-                if self._brain_merge == "replace":
-                    brain_limit = max(1, n)
-                else:
-                    # append mode: only fill gaps later
-                    brain_limit = max(1, n)
-
-                for rec in brain_retrieve(
-                    query=query,
-                    mode=self._brain_mode,
-                    limit=brain_limit,
-                    min_score=self._brain_min_score,
-                ):
-                    # Brain results get capped relevance to avoid overriding high-confidence vector hits
-                    brain_score = float(rec.get("score", 0.65))
-                    # Cap brain relevance at 0.85 to leave headroom for vector results
-                    relevance = min(0.85, brain_score * 1.2)
-
-                    out.append(
-                        RecallResult(
-                            content=str(rec.get("content", "")),
-                            source=f"🧠 {rec.get('source', 'brain')}",
-                            relevance=round(relevance, 3),
-                            metadata={
-                                "origin": "brain",
-                                "brain": True,
-                                "brain_kind": rec.get("kind", "fact"),
-                                "brain_priority": rec.get("priority", "P1"),
-                                "brain_score": brain_score,
-                                **{k: v for k, v in rec.items() if k not in {"content", "kind", "priority", "source"}},
-                            },
-                            doc_id=str(rec.get("id", "")),
-                        )
-                    )
-            except Exception as e:
+        def _job() -> List[RecallResult]:
+            with self._recall_lock:
+                self._recall_queued -= 1
+                self._recall_running += 1
+            started = time.perf_counter()
+            outcome = "ok"
+            try:
+                return fn()
+            except Exception:
+                outcome = "error"
+                raise
+            finally:
+                with self._recall_lock:
+                    self._recall_running -= 1
+                self._record_leg(leg, outcome, (time.perf_counter() - started) * 1000.0)
+
+        future = None
+        if asyncio.iscoroutinefunction(fn):
+            awaitable = _coro_job()
+        else:
+            executor = self._get_recall_executor()
+            with self._recall_lock:
+                self._recall_queued += 1
+            future = executor.submit(_job)
+            awaitable = asyncio.wrap_future(future)
+        try:
+            return await asyncio.wait_for(awaitable, timeout=timeout if timeout > 0 else None)
+        except asyncio.TimeoutError:
+            if future is not None and future.cancel():
+                # Never started: take it back out of the queue count.
+                with self._recall_lock:
+                    self._recall_queued -= 1
+            self._record_leg(leg, "timeout")
+            logger.warning(f"{leg.capitalize()} recall timed out after {timeout}s; returning degraded results")
+        except Exception as e:
+            if leg == "brain":
                 logger.warning(f"Brain recall failed; continuing without brain: {e}")
+            else:
+                logger.error(f"Search error: {e}")
+        return None
 
-        # 2) Vector recall (existing behavior)
-        if not self._available or not self._vector_backend:
-            # If vector backend is down, still allow brain-only recall.
-            return sorted(out, key=lambda r: r.relevance, reverse=True)[:n]
+    def _brain_leg_timeout(self) -> float:
+        return self._brain_timeout if self._brain_warm.is_set() else self._brain_cold_timeout
+
+    def _brain_recall(self, query: str, n: int, filters: Optional[Dict[str, Any]] = None) -> List[RecallResult]:
+        from ..brain.api import brain_retrieve
+
+        # Determine how many brain results to pull based on merge strategy
+        if self._brain_merge == "replace":
+            brain_limit = max(1, n)
+        else:
+            # append mode: only fill gaps later
+            brain_limit = max(1, n)
+
+        records = brain_retrieve(
+            query=query,
+            mode=self._brain_mode,
+            limit=brain_limit,
+            min_score=self._brain_min_score,
+            filters=filters,
+        )
+        self._brain_warm.set()
+        return self._brain_results(records)
+
+    def _brain_recall_many(
+        self, queries: List[str], n: int, filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[RecallResult]]:
+        from ..brain.api import brain_retrieve_many
 
+        batches = brain_retrieve_many(
+            queries,
+            mode=self._brain_mode,
+            limit=max(1, n),
+            min_score=self._brain_min_score,
+            filters=filters,
+        )
+        self._brain_warm.set()
+        return [self._brain_results(recs) for recs in batches]
+
+    @staticmethod
+    def _brain_results(records: List[Dict[str, Any]]) -> List[RecallResult]:
+        out: List[RecallResult] = []
+        for rec in records:
+            # Brain results get capped relevance to avoid overriding high-confidence vector hits
+            brain_score = float(rec.get("score", 0.65))
+            # Cap brain relevance at 0.85 to leave headroom for vector results
+            relevance = min(0.85, brain_score * 1.2)
+
+            out.append(
+                RecallResult(
+                    content=str(rec.get("content", "")),
+                    source=f"🧠 {rec.get('source', 'brain')}",
+                    relevance=round(relevance, 3),
+                    metadata={
+                        "origin": "brain",
+                        "brain": True,
+                        "brain_kind": rec.get("kind", "fact"),
+                        "brain_priority": rec.get("priority", "P1"),
+                        "brain_score": brain_score,
+                        **{k: v for k, v in rec.items() if k not in {"content", "kind", "priority", "source"}},
+                    },
+                    doc_id=str(rec.get("id", "")),
+                )
+            )
+        return out
+
+    def _vector_recall(self, query: str, n: int, filters: Optional[Dict[str, Any]] = None) -> List[RecallResult]:
+        backend = self._vector_backend
         vector_results: List[RecallResult] = []
-        try:
-            backend = self._vector_backend
+        where = _chroma_where(filters or {})
+        # Date bounds can't be pushed down to Chroma (see chroma_backend).
+        dated = has_date_filter(filters)
+        fetch = n * DATE_FILTER_OVERFETCH if dated else n
 
-            if isinstance(backend, dict) and "recall" in backend:
-                recall = backend["recall"]
-                results = recall.search(query, n_results=n)
-
-                vector_results = [
-                    RecallResult(
-                        content=r.content,
-                        source=r.metadata.get('title', r.doc_id),
-                        relevance=r.relevance_score,
-                        metadata={"origin": "vector", **(r.metadata or {})},
-                        doc_id=r.doc_id,
-                    )
-                    for r in results
-                ]
-            else:
-                # VectorStore wrapper path
-                raw = backend.search(query=query, n_results=n)
-                docs = (raw or {}).get("documents") or [[]]
-                metas = (raw or {}).get("metadatas") or [[]]
-                ids = (raw or {}).get("ids") or [[]]
-                dists = (raw or {}).get("distances") or [[]]
-
-                for i in range(min(n, len(docs[0]) if docs else 0)):
-                    content = docs[0][i]
-                    meta = metas[0][i] if metas and metas[0] and i < len(metas[0]) else {}
-                    doc_id = ids[0][i] if ids and ids[0] and i < len(ids[0]) else ""
-                    dist = dists[0][i] if dists and dists[0] and i < len(dists[0]) else None
-                    # Convert distance -> pseudo relevance (best-effort). If missing, default 0.5.
-                    relevance = 0.5 if dist is None else max(0.0, 1.0 - float(dist))
-
-                    vector_results.append(
-                        RecallResult(
-                            content=str(content),
-                            source=str((meta or {}).get("title", doc_id or "doc")),
-                            relevance=float(relevance),
-                            metadata={"origin": "vector", **(meta or {})},
-                            doc_id=str(doc_id),
-                        )
-                    )
+        if isinstance(backend, dict) and "recall" in backend:
+            recall = backend["recall"]
+            results = recall.search(query, n_results=fetch, filters=where) if where else recall.search(query, n_results=fetch)
 
-        except Exception as e:
-            logger.error(f"Search error: {e}")
+            vector_results = [
+                RecallResult(
+                    content=r.content,
+                    source=r.metadata.get('title', r.doc_id),
+                    relevance=r.relevance_score,
+                    metadata={"origin": "vector", **(r.metadata or {})},
+                    doc_id=r.doc_id,
+                )
+                for r in results
+            ]
+        else:
+            # VectorStore wrapper path. Embed through the shared service so the
+            # brain leg (same model) reuses the vector instead of re-encoding.
+            query_embedding = None
+            service = self._embedding_service
+            if service is not None and service.available():
+                query_embedding = service.embed(query)
+            kwargs: Dict[str, Any] = {"where": where} if where else {}
+            if query_embedding is not None:
+                kwargs["query_embedding"] = query_embedding
+            raw = backend.search(query=query, n_results=fetch, **kwargs)
+            vector_results = self._vector_results(raw, 0, fetch)
+        if dated:
+            vector_results = filter_by_date(vector_results, filters, n)
+        return vector_results
+
+    def _vector_recall_many(
+        self,
+        queries: List[str],
+        n: int,
+        query_embeddings: Optional[List[List[float]]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[List[RecallResult]]:
+        backend = self._vector_backend
+        search_many = getattr(backend, "search_many", None)
+        if isinstance(backend, dict) or not callable(search_many):
+            return [self._vector_recall(query, n, filters) for query in queries]
+        # One Chroma query for every query; row i of the result belongs to queries[i].
+        where = _chroma_where(filters or {})
+        kwargs: Dict[str, Any] = {"where": where} if where else {}
+        if query_embeddings is not None:
+            kwargs["query_embeddings"] = query_embeddings
+        if not has_date_filter(filters):
+            raw = search_many(queries, n_results=n, **kwargs)
+            return [self._vector_results(raw, row, n) for row in range(len(queries))]
+        fetch = n * DATE_FILTER_OVERFETCH
+        raw = search_many(queries, n_results=fetch, **kwargs)
+        return [filter_by_date(self._vector_results(raw, row, fetch), filters, n) for row in range(len(queries))]
+
+    def _vector_leg(self, query: str, n: int, filters: Optional[Dict[str, Any]] = None) -> Callable[[], Any]:
+        if isinstance(self._vector_backend, VectorStorageBackend):
+            return partial(self._backend_recall, query, n, filters)
+        return lambda: self._vector_recall(query, n, filters)
+
+    def _vector_leg_many(
+        self,
+        queries: List[str],
+        n: int,
+        query_embeddings: Optional[List[List[float]]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Callable[[], Any]:
+        if isinstance(self._vector_backend, VectorStorageBackend):
+            return partial(self._backend_recall_many, queries, n, query_embeddings, filters)
+        return lambda: self._vector_recall_many(queries, n, query_embeddings, filters)
+
+    async def _backend_recall(
+        self, query: str, n: int, filters: Optional[Dict[str, Any]] = None
+    ) -> List[RecallResult]:
+        result = await self._vector_backend.search(query, limit=n, filters=filters or None)
+        if not result.success:
+            raise RuntimeError(result.error)
+        return result.data
+
+    async def _backend_recall_many(
+        self,
+        queries: List[str],
+        n: int,
+        query_embeddings: Optional[List[List[float]]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[List[RecallResult]]:
+        backend = self._vector_backend
+        search_many = getattr(backend, "search_many", None)
+        if not callable(search_many):
+            return [await self._backend_recall(query, n, filters) for query in queries]
+        result = await search_many(queries, limit=n, filters=filters or None, query_embeddings=query_embeddings)
+        if not result.success:
+            raise RuntimeError(result.error)
+        return result.data
+
+    @staticmethod
+    def _vector_results(raw: Optional[Dict[str, Any]], row: int, n: int) -> List[RecallResult]:
+        """Convert row `row` of a Chroma query result into RecallResults."""
+
+        def _row(field: str) -> List[Any]:
+            rows = (raw or {}).get(field) or []
+            return (rows[row] or []) if row < len(rows) else []
+
+        docs, metas, ids, dists = _row("documents"), _row("metadatas"), _row("ids"), _row("distances")
+        out: List[RecallResult] = []
+        for i in range(min(n, len(docs))):
+            content = docs[i]
+            meta = metas[i] if i < len(metas) else {}
+            doc_id = ids[i] if i < len(ids) else ""
+            dist = dists[i] if i < len(dists) else None
+            # Convert distance -> pseudo relevance (best-effort). If missing, default 0.5.
+            relevance = 0.5 if dist is None else max(0.0, 1.0 - float(dist))
+
+            out.append(
+                RecallResult(
+                    content=str(content),
+                    source=str((meta or {}).get("title", doc_id or "doc")),
+                    relevance=float(relevance),
+                    metadata={"origin": "vector", **(meta or {})},
+                    doc_id=str(doc_id),
+                )
+            )
+        return out
+
+    async def search_recall(
+        self, query: str, n: int = 5, filters: Optional[Dict[str, Any]] = None
+    ) -> List[RecallResult]:
+        """Semantic search, optionally augmented by brain store (feature-flagged).
+
+        The brain and vector legs run concurrently on the recall executor,
+        each bounded by its timeout. A leg that fails or times out contributes
+        no results; the other leg is still returned.
+
+        `filters` (tags, type, conversation_id, date_from, date_to, priority)
+        are pushed down: to Chroma as a `where` clause and to the brain
+        before scoring.
+
+        Results are cached per (normalized query, n, merge mode, filters)
+        until the TTL passes or a document/brain write bumps the write
+        generation.
+        """
+        from ..brain.filters import normalize_filters
+
+        filters = normalize_filters(filters)
+        brain_on = self._brain_enabled and self._brain_available
+        vector_on = bool(self._available and self._vector_backend)
+
+        cache = self._recall_cache
+        cache_key = None
+        if cache is not None:
+            cache_key = (
+                _normalize_query(query),
+                n,
+                self._brain_merge if brain_on else "",
+                self._write_generation(),
+                _filters_key(filters),
+            )
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        results, degraded = await self._search_recall_uncached(query, n, brain_on, vector_on, filters)
+        # Degraded (failed/timed-out leg) results are not worth pinning for the TTL.
+        if cache is not None and not degraded:
+            cache.put(cache_key, results)
+        return results
+
+    async def search_recall_batch(
+        self, queries: List[str], n: int = 5, filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[RecallResult]]:
+        """Recall several queries in one pass; returns one result list per query.
+
+        Uncached queries are embedded with a single model call, sent to the
+        vector store as one multi-embedding query and scored by the brain
+        against its shared record matrix. Filters, per-query merging,
+        degradation and caching follow `search_recall`.
+        """
+        from ..brain.filters import normalize_filters
+
+        if not queries:
+            return []
+        filters = normalize_filters(filters)
+        fkey = _filters_key(filters)
+        brain_on = self._brain_enabled and self._brain_available
+        vector_on = bool(self._available and self._vector_backend)
+
+        cache = self._recall_cache
+        generation = self._write_generation()
+        merge = self._brain_merge if brain_on else ""
+        results: List[Optional[List[RecallResult]]] = [None] * len(queries)
+        # Identical (normalized) queries are recalled once.
+        pending: Dict[str, List[int]] = {}
+        for i, query in enumerate(queries):
+            norm = _normalize_query(query)
+            if cache is not None:
+                cached = cache.get((norm, n, merge, generation, fkey))
+                if cached is not None:
+                    results[i] = cached
+                    continue
+            pending.setdefault(norm, []).append(i)
+
+        if pending:
+            misses = [queries[slots[0]] for slots in pending.values()]
+
+            async def _skip() -> Optional[List[List[RecallResult]]]:
+                return None
+
+            leg_k = self._leg_fetch(n)
+            query_embeddings = None
+            if vector_on and self._embedding_service is not None and not isinstance(self._vector_backend, dict):
+                query_embeddings = await self._run_recall_leg(
+                    "embed", lambda: self._embed_queries(misses), self._vector_timeout
+                )
+            brain_res, vector_res = await asyncio.gather(
+                self._run_recall_leg(
+                    "brain", lambda: self._brain_recall_many(misses, leg_k, filters), self._brain_leg_timeout()
+                )
+                if brain_on
+                else _skip(),
+                self._run_recall_leg(
+                    "vector",
+                    self._vector_leg_many(misses, leg_k, query_embeddings, filters),
+                    self._vector_timeout,
+                )
+                if vector_on
+                else _skip(),
+            )
+            degraded = (brain_on and brain_res is None) or (vector_on and vector_res is None)
+            for j, (norm, slots) in enumerate(pending.items()):
+                merged = self._merge_recall(
+                    brain_res[j] if brain_res is not None else None,
+                    vector_res[j] if vector_res is not None else None,
+                    n,
+                    brain_on,
+                    vector_on,
+                )
+                if cache is not None and not degraded:
+                    cache.put((norm, n, merge, generation, fkey), merged)
+                for i in slots:
+                    results[i] = merged
+        return [r if r is not None else [] for r in results]
+
+    def _embed_queries(self, queries: List[str]) -> Optional[List[List[float]]]:
+        service = self._embedding_service
+        if service is None or not service.available():
+            return None
+        vecs = service.embed_many(queries)
+        # A partial batch can't be lined up with its queries; let Chroma embed.
+        return vecs if vecs is not None and len(vecs) == len(queries) else None
+
+    def _write_generation(self) -> Tuple[int, int]:
+        brain_gen = 0
+        if self._brain_enabled and self._brain_available:
+            try:
+                from ..brain.api import brain_generation
+
+                brain_gen = brain_generation()
+            except Exception:
+                pass
+        return self._generation, brain_gen
+
+    def _invalidate_recall_cache(self) -> None:
+        self._generation += 1
+
+    async def _search_recall_uncached(
+        self, query: str, n: int, brain_on: bool, vector_on: bool, filters: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[RecallResult], bool]:
+        async def _skip() -> Optional[List[RecallResult]]:
+            return None
+
+        leg_k = self._leg_fetch(n)
+        brain_res, vector_res = await asyncio.gather(
+            self._run_recall_leg("brain", lambda: self._brain_recall(query, leg_k, filters), self._brain_leg_timeout())
+            if brain_on
+            else _skip(),
+            self._run_recall_leg("vector", self._vector_leg(query, leg_k, filters), self._vector_timeout)
+            if vector_on
+            else _skip(),
+        )
+        degraded = (brain_on and brain_res is None) or (vector_on and vector_res is None)
+        return self._merge_recall(brain_res, vector_res, n, brain_on, vector_on), degraded
+
+    def _merge_recall(
+        self,
+        brain_res: Optional[List[RecallResult]],
+        vector_res: Optional[List[RecallResult]],
+        n: int,
+        brain_on: bool,
+        vector_on: bool,
+    ) -> List[RecallResult]:
+        out: List[RecallResult] = brain_res or []
+
+        if not vector_on:
+            # If vector backend is down, still allow brain-only recall.
+            return sorted(out, key=lambda r: r.relevance, reverse=True)[:n]
+        vector_results: List[RecallResult] = vector_res or []
 
         # Merge strategy:
         # - replace: brain-only (vector ignored)
-        # - append (default): vector primary, brain fills gaps / adds extra if vector empty
-        merged: List[RecallResult]
-        if self._brain_enabled and self._brain_available and self._brain_merge == "replace":
-            merged = out
-        else:
-            merged = list(vector_results)
-            if len(merged) < n:
-                merged.extend(out)
-            elif not merged:
-                merged = out
-
-        # De-dupe by (source, content) keeping highest relevance
-        dedup: Dict[str, RecallResult] = {}
-        for r in merged:
-            key = f"{r.source}\n{r.content}".strip()
-            existing = dedup.get(key)
-            if existing is None or r.relevance > existing.relevance:
-                dedup[key] = r
-
-        return sorted(dedup.values(), key=lambda r: r.relevance, reverse=True)[:n]
+        # - append (default): fused per `recall.fusion`; the legacy fusion
+        #   keeps vector primary with brain filling gaps
+        if brain_on and self._brain_merge == "replace":
+            return legacy_merge(brain=out, vector=[], n=n)
+        return fuse(
+            self._fusion,
+            out,
+            vector_results,
+            n,
+            rrf_k=self._fusion_k,
+            calibration=self._fusion_calibration,
+            weights=self._fusion_weights,
+        )
+
+    def _leg_fetch(self, n: int) -> int:
+        """Results each leg fetches for a merged top-n."""
+        if self._fusion == "legacy" or self._leg_k <= 0:
+            return n
+        return self._leg_k
     
     # Alias for backward compatibility
     search = search_recall
     recall = search_recall
     
+    @staticmethod
+    def _brain_payload(content: str, title: str, tags: str, doc_id: Optional[str]) -> Dict[str, Any]:
+        # Infer kind from tags/content hints
+        tag_list = [t.strip() for t in tags.split(",") if t.strip()] if tags else []
+        content_lower = (content or "").lower()
+        # Simple heuristic for kind inference
+        if any(k in content_lower for k in ["strategy", "plan", "roadmap", "goal"]):
+            inferred_kind = "strategy"
+        elif any(k in content_lower for k in ["step", "how", "guide", "tutorial"]):
+            inferred_kind = "guide"
+        else:
+            inferred_kind = "fact"
+
+        # Priority inference: P0 for critical tags, P1 for normal, P2 for low-priority
+        priority = "P1"
+        if any(t.lower() in {"important", "critical", "urgent", "p0"} for t in tag_list):
+            priority = "P0"
+        elif any(t in content_lower for t in ["draft", "todo", "maybe", "low"]):
+            priority = "P2"
+
+        return {
+            "id": doc_id or "",
+            "kind": inferred_kind,
+            "priority": priority,
+            "source": title or doc_id or "nexus",
+            "tags": tag_list,
+            "content": content,
+        }
+
     async def add_document(self, content: str, 
                           title: str = "",
                           tags: str = "",
@@ -316,34 +938,7 @@ class NexusCorePlugin(NexusPlugin):
             try:
                 from ..brain.api import brain_write
 
-                # Infer kind from tags/content hints
-                tag_list = [t.strip() for t in tags.split(",") if t.strip()] if tags else []
-                content_lower = (content or "").lower()
-                # Simple heuristic for kind inference
-                if any(k in content_lower for k in ["strategy", "plan", "roadmap", "goal"]):
-                    inferred_kind = "strategy"
-                elif any(k in content_lower for k in ["step", "how", "guide", "tutorial"]):
-                    inferred_kind = "guide"
-                else:
-                    inferred_kind = "fact"
-
-                # Priority inference: P0 for critical tags, P1 for normal, P2 for low-priority
-                priority = "P1"
-                if any(t.lower() in {"important", "critical", "urgent", "p0"} for t in tag_list):
-                    priority = "P0"
-                elif any(t in content_lower for t in ["draft", "todo", "maybe", "low"]):
-                    priority = "P2"
-
-                brain_write(
-                    {
-                        "id": doc_id or "",
-                        "kind": inferred_kind,
-                        "priority": priority,
-                        "source": title or doc_id or "nexus",
-                        "tags": tag_list,
-                        "content": content,
-                    }
-                )
+                brain_write(self._brain_payload(content, title, tags, doc_id))
             except Exception as e:
                 logger.warning(f"Brain write failed; continuing without brain: {e}")
 
@@ -366,6 +961,11 @@ class NexusCorePlugin(NexusPlugin):
                     metadata=metadata,
                     note_id=doc_id,
                 )
+            elif isinstance(backend, VectorStorageBackend):
+                result = await backend.add(content, metadata, doc_id=doc_id)
+                if not result.success:
+                    raise RuntimeError(result.error)
+                new_id = result.data
             else:
                 # VectorStore wrapper path
                 import uuid
@@ -377,6 +977,8 @@ class NexusCorePlugin(NexusPlugin):
                     metadatas=[metadata],
                 )
 
+            self._invalidate_recall_cache()
+
             # Emit event
             await self.emit(EventTypes.DOCUMENT_ADDED, {
                 "doc_id": new_id,
@@ -402,23 +1004,122 @@ class NexusCorePlugin(NexusPlugin):
         Returns:
             List of document IDs
         """
-        results = []
-        
+        results = await self.add_documents_batch(documents, batch_size=batch_size)
+        return [r.data for r in results if r.success]
+
+    async def add_documents_batch(self, documents: List[Dict[str, str]],
+                                  batch_size: int = 64) -> List[StorageResult]:
+        """
+        Bulk-ingest documents, one backend call per batch.
+
+        Each batch is embedded together, written with a single
+        `collection.add` and a single brain append. If a batch add fails,
+        its documents are retried one by one so failures are attributed.
+
+        Args:
+            documents: List of {content, title, tags, doc_id}
+            batch_size: Documents per backend call
+
+        Returns:
+            One StorageResult per input document (data = doc ID on success)
+        """
+        import uuid
+
+        batch_size = max(1, int(batch_size))
+        results: List[StorageResult] = []
+
         for i in range(0, len(documents), batch_size):
             batch = documents[i:i + batch_size]
-            
-            for doc in batch:
-                doc_id = await self.add_document(
-                    content=doc.get("content", ""),
-                    title=doc.get("title", ""),
-                    tags=doc.get("tags", ""),
-                    doc_id=doc.get("doc_id"),
-                )
-                if doc_id:
-                    results.append(doc_id)
-        
+            batch_results: List[Optional[StorageResult]] = [None] * len(batch)
+            rows = []
+            for j, doc in enumerate(batch):
+                content = doc.get("content", "")
+                if not content:
+                    batch_results[j] = StorageResult.err("empty content")
+                    continue
+                title = doc.get("title", "")
+                tags = doc.get("tags", "")
+                doc_id = doc.get("doc_id") or str(uuid.uuid4())[:8]
+                metadata = {"title": title or "Untitled"}
+                if tags:
+                    metadata["tags"] = [t.strip() for t in tags.split(",") if t.strip()]
+                rows.append((j, content, title, tags, doc_id, metadata))
+
+            # Optional brain write (best-effort; does not block vector write)
+            if rows and self._brain_enabled and self._brain_available:
+                try:
+                    from ..brain.api import brain_write_many
+
+                    brain_write_many([self._brain_payload(c, t, g, d) for _, c, t, g, d, _ in rows])
+                except Exception as e:
+                    logger.warning(f"Brain write failed; continuing without brain: {e}")
+
+            if rows and (not self._available or not self._vector_backend):
+                for j, *_ in rows:
+                    batch_results[j] = StorageResult.err("Vector backend not available")
+                rows = []
+
+            if rows:
+                if isinstance(self._vector_backend, VectorStorageBackend):
+                    written = await self._backend_add_batch(rows)
+                else:
+                    written = self._vector_add_batch(rows)
+                for j, result in zip([r[0] for r in rows], written):
+                    batch_results[j] = result
+                self._invalidate_recall_cache()
+                for j, _, title, tags, doc_id, _ in rows:
+                    if batch_results[j].success:
+                        await self.emit(EventTypes.DOCUMENT_ADDED, {
+                            "doc_id": doc_id,
+                            "title": title,
+                            "tags": tags,
+                        })
+
+            results.extend(batch_results)
+
         return results
+
+    def _vector_add_batch(self, rows: List[Tuple]) -> List[StorageResult]:
+        """Write (index, content, title, tags, doc_id, metadata) rows in one backend call."""
+        backend = self._vector_backend
+        contents = [r[1] for r in rows]
+        ids = [r[4] for r in rows]
+        metadatas = [r[5] for r in rows]
+        try:
+            if isinstance(backend, dict) and "manager" in backend:
+                notes = [{"content": c, "metadata": m, "id": d} for c, m, d in zip(contents, metadatas, ids)]
+                backend["manager"].add_notes_batch(notes, chunk_size=len(notes))
+            else:
+                embeddings = None
+                service = self._embedding_service
+                if service is not None and service.available():
+                    # Bypass the query cache so bulk ingest can't evict hot queries.
+                    embeddings = service.embed_many(contents, cache=False)
+                backend.add(documents=contents, embeddings=embeddings, ids=ids, metadatas=metadatas)
+            return [StorageResult.ok(doc_id) for doc_id in ids]
+        except Exception as e:
+            if len(rows) == 1:
+                logger.error(f"Add document error: {e}")
+                return [StorageResult.err(str(e))]
+            logger.warning(f"Batch add failed ({e}); retrying documents individually")
+            return [self._vector_add_batch([row])[0] for row in rows]
     
+    async def _backend_add_batch(self, rows: List[Tuple]) -> List[StorageResult]:
+        """`_vector_add_batch` for async storage backends (one add_batch call)."""
+        backend = self._vector_backend
+        result = await backend.add_batch([(r[1], r[5], r[4]) for r in rows])
+        if result.success:
+            written = set(result.data or [])
+            return [
+                StorageResult.ok(r[4]) if r[4] in written else StorageResult.err("write failed")
+                for r in rows
+            ]
+        if len(rows) == 1:
+            logger.error(f"Add document error: {result.error}")
+            return [StorageResult.err(result.error or "write failed")]
+        logger.warning(f"Batch add failed ({result.error}); retrying documents individually")
+        return [(await self._backend_add_batch([row]))[0] for row in rows]
+
     # Backward compatibility alias
     add = add_document
     
@@ -428,7 +1129,11 @@ class NexusCorePlugin(NexusPlugin):
             return None
         
         try:
-            manager = self._vector_backend['manager']
+            backend = self._vector_backend
+            if isinstance(backend, VectorStorageBackend):
+                result = await backend.get(doc_id)
+                return result.data if result.success else None
+            manager = backend['manager']
             # Implementation depends on backend
             return None
         except Exception as e:
@@ -441,8 +1146,15 @@ class NexusCorePlugin(NexusPlugin):
             return False
         
         try:
-            manager = self._vector_backend['manager']
-            # Implementation depends on backend
+            backend = self._vector_backend
+            if isinstance(backend, VectorStorageBackend):
+                result = await backend.delete(doc_id)
+                if not result.success:
+                    raise RuntimeError(result.error)
+            else:
+                manager = backend['manager']
+                # Implementation depends on backend
+            self._invalidate_recall_cache()
             await self.emit(EventTypes.DOCUMENT_DELETED, {"doc_id": doc_id})
             return True
         except Exception as e:
@@ -456,6 +1168,12 @@ class NexusCorePlugin(NexusPlugin):
         
         backend = self._vector_backend
         try:
+            if isinstance(backend, VectorStorageBackend):
+                result = await backend.get_stats()
+                stats = dict(result.data or {}) if result.success else {"total_documents": 0}
+                stats["status"] = "active" if self.state == PluginState.ACTIVE else "inactive"
+                return stats
+
             if isinstance(backend, dict) and "recall" in backend:
                 recall = backend["recall"]
                 stats = recall.get_recall_stats()
@@ -476,11 +1194,22 @@ class NexusCorePlugin(NexusPlugin):
     
     def stats(self) -> Dict[str, Any]:
         """Get public stats"""
+        out = self._backend_stats()
+        cache = self._recall_cache
+        out["recall_cache"] = cache.stats() if cache is not None else {"enabled": False}
+        return out
+
+    def _backend_stats(self) -> Dict[str, Any]:
         import asyncio
         try:
             loop = asyncio.get_event_loop()
             if loop.is_running():
                 # In async context, just return basic stats
+                snapshot = getattr(self._vector_backend, "stats_snapshot", None)
+                if callable(snapshot):
+                    stats = snapshot()
+                    stats["status"] = "active" if self.state == PluginState.ACTIVE else "inactive"
+                    return stats
                 if self._vector_backend:
                     manager = self._vector_backend.get('manager')
                     if manager:
@@ -510,6 +1239,7 @@ class NexusCorePlugin(NexusPlugin):
             "documents": self.stats().get("total_documents", 0),
             "state": self.state.name,
             "version": "3.0.0",
+            "recall": self.recall_metrics(),
         }
     
     # NOTE: Compression methods REMOVED
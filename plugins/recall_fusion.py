@@ -0,0 +1,157 @@
+"""
+Recall fusion - merge brain and vector recall legs into one ranked list.
+
+Methods:
+- legacy: vector results first, brain fills gaps; dedupe on (source, content)
+- rrf: reciprocal-rank fusion, sum(weight / (k + rank)) over legs
+- calibrated: per-leg raw scores mapped onto [0, 1] with fixed (lo, hi)
+  bounds, then a weighted sum over legs
+
+`rrf` and `calibrated` dedupe on a hash of the normalized content, so the
+same text recalled by both legs (or stored twice) counts once. Because both
+are rank/score based and do not depend on one leg filling the other's gaps,
+each leg only needs to fetch a small k.
+"""
+
+import hashlib
+from dataclasses import replace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..storage.base import RecallResult
+
+FUSION_METHODS = ("legacy", "rrf", "calibrated")
+
+# (lo, hi) of each leg's raw score; raw <= lo maps to 0, raw >= hi to 1.
+DEFAULT_CALIBRATION: Dict[str, Tuple[float, float]] = {
+    "vector": (0.0, 1.0),
+    "brain": (0.0, 1.0),
+}
+DEFAULT_WEIGHTS: Dict[str, float] = {"vector": 1.0, "brain": 1.0}
+RRF_K = 60
+
+
+def content_key(result: RecallResult) -> str:
+    """Dedupe key: hash of lowercased, whitespace-collapsed content."""
+    text = " ".join((result.content or "").lower().split())
+    if not text:
+        return f"id:{result.doc_id or result.source}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def raw_score(leg: str, result: RecallResult) -> float:
+    """The leg's own score, before any cross-leg capping."""
+    meta = result.metadata or {}
+    if leg == "brain" and "brain_score" in meta:
+        return float(meta["brain_score"])
+    return float(result.relevance)
+
+
+def calibrate(leg: str, score: float, calibration: Optional[Dict[str, Sequence[float]]] = None) -> float:
+    lo, hi = (calibration or DEFAULT_CALIBRATION).get(leg, DEFAULT_CALIBRATION.get(leg, (0.0, 1.0)))
+    if hi <= lo:
+        return 1.0 if score >= hi else 0.0
+    return max(0.0, min(1.0, (score - lo) / (hi - lo)))
+
+
+def legacy_merge(brain: List[RecallResult], vector: List[RecallResult], n: int) -> List[RecallResult]:
+    """Vector results first; brain results only when vector has fewer than n."""
+    merged = list(vector)
+    if len(merged) < n:
+        merged.extend(brain)
+
+    # De-dupe by (source, content) keeping highest relevance
+    dedup: Dict[str, RecallResult] = {}
+    for r in merged:
+        key = f"{r.source}\n{r.content}".strip()
+        existing = dedup.get(key)
+        if existing is None or r.relevance > existing.relevance:
+            dedup[key] = r
+    return sorted(dedup.values(), key=lambda r: r.relevance, reverse=True)[:n]
+
+
+def _fused(method: str, entries: Dict[str, List], n: int) -> List[RecallResult]:
+    # entries: key -> [fused score, best result, best relevance, legs]
+    ranked = sorted(entries.values(), key=lambda e: (e[0], e[2]), reverse=True)[:n]
+    out = []
+    for score, result, relevance, legs in ranked:
+        meta = dict(result.metadata or {})
+        meta.update({"fusion": method, "fusion_score": round(score, 6), "fusion_legs": legs})
+        out.append(replace(result, relevance=round(relevance, 4), metadata=meta))
+    return out
+
+
+def rrf_fuse(
+    legs: Dict[str, List[RecallResult]],
+    n: int,
+    k: int = RRF_K,
+    weights: Optional[Dict[str, float]] = None,
+) -> List[RecallResult]:
+    """Reciprocal-rank fusion; each result keeps its best leg relevance."""
+    weights = weights or DEFAULT_WEIGHTS
+    entries: Dict[str, List] = {}
+    for leg, results in legs.items():
+        weight = float(weights.get(leg, 1.0))
+        ranked = sorted(results, key=lambda r: r.relevance, reverse=True)
+        seen = set()
+        for rank, r in enumerate(ranked, 1):
+            key = content_key(r)
+            if key in seen:
+                continue
+            seen.add(key)
+            entry = entries.get(key)
+            contribution = weight / (k + rank)
+            if entry is None:
+                entries[key] = [contribution, r, r.relevance, [leg]]
+                continue
+            entry[0] += contribution
+            if leg not in entry[3]:
+                entry[3].append(leg)
+            if r.relevance > entry[2]:
+                entry[1], entry[2] = r, r.relevance
+    return _fused("rrf", entries, n)
+
+
+def calibrated_fuse(
+    legs: Dict[str, List[RecallResult]],
+    n: int,
+    calibration: Optional[Dict[str, Sequence[float]]] = None,
+    weights: Optional[Dict[str, float]] = None,
+) -> List[RecallResult]:
+    """Weighted sum of calibrated leg scores; relevance is the best calibrated score."""
+    weights = weights or DEFAULT_WEIGHTS
+    entries: Dict[str, List] = {}
+    for leg, results in legs.items():
+        weight = float(weights.get(leg, 1.0))
+        best: Dict[str, Tuple[float, RecallResult]] = {}
+        for r in results:
+            key = content_key(r)
+            score = calibrate(leg, raw_score(leg, r), calibration)
+            if key not in best or score > best[key][0]:
+                best[key] = (score, r)
+        for key, (score, r) in best.items():
+            entry = entries.get(key)
+            if entry is None:
+                entries[key] = [weight * score, r, score, [leg]]
+                continue
+            entry[0] += weight * score
+            entry[3].append(leg)
+            if score > entry[2]:
+                entry[1], entry[2] = r, score
+    return _fused("calibrated", entries, n)
+
+
+def fuse(
+    method: str,
+    brain: List[RecallResult],
+    vector: List[RecallResult],
+    n: int,
+    rrf_k: int = RRF_K,
+    calibration: Optional[Dict[str, Sequence[float]]] = None,
+    weights: Optional[Dict[str, float]] = None,
+) -> List[RecallResult]:
+    """Merge brain and vector results with `method` (see FUSION_METHODS)."""
+    if method == "rrf":
+        return rrf_fuse({"vector": vector, "brain": brain}, n, k=rrf_k, weights=weights)
+    if method == "calibrated":
+        return calibrated_fuse({"vector": vector, "brain": brain}, n, calibration=calibration, weights=weights)
+    return legacy_merge(brain, vector, n)
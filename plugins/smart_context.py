@@ -31,7 +31,14 @@ from .session_manager import SessionManagerPlugin
 from ..core.plugin_system import NexusPlugin, PluginMetadata
 from ..core.event_bus import EventTypes
 from ..compat_async import run_coro_sync
-from ..brain.graph_api import configure_graph, graph_add_edge, graph_related_with_evidence
+from . import turn_analyzer
+from .turn_analyzer import GRAPH_EDGE_PATTERNS, TurnFeatures, analyze_turn
+from ..brain.graph_api import (
+    configure_graph,
+    graph_add_edges_batch,
+    graph_cache_stats,
+    graph_traverse_with_evidence,
+)
 
 
 # ===================== 配置 =====================
@@ -97,6 +104,9 @@ class ContextCompressionConfig:
     graph_inject_enabled: bool = True
     graph_max_items: int = 3
     graph_evidence_max_chars: int = 120
+    graph_hops: int = 1
+    graph_fanout: int = 0  # per-entity edge cap while expanding; 0 = graph_max_items
+    graph_min_weight: float = 0.0
     adaptive_enabled: bool = True
     adaptive_min_threshold: float = 0.35
     adaptive_max_threshold: float = 0.75
@@ -246,6 +256,9 @@ class SmartContextPlugin(NexusPlugin):
                     graph_inject_enabled=smart_cfg.get("graph_inject_enabled", True),
                     graph_max_items=smart_cfg.get("graph_max_items", 3),
                     graph_evidence_max_chars=smart_cfg.get("graph_evidence_max_chars", 120),
+                    graph_hops=smart_cfg.get("graph_hops", 1),
+                    graph_fanout=smart_cfg.get("graph_fanout", 0),
+                    graph_min_weight=smart_cfg.get("graph_min_weight", 0.0),
                     adaptive_enabled=smart_cfg.get("adaptive_enabled", True),
                     adaptive_min_threshold=smart_cfg.get("adaptive_min_threshold", 0.35),
                     adaptive_max_threshold=smart_cfg.get("adaptive_max_threshold", 0.75),
@@ -279,6 +292,12 @@ class SmartContextPlugin(NexusPlugin):
                     enabled=True,
                     base_path=config.get("paths", {}).get("base", "."),
                     db_path=graph_cfg.get("db_path"),
+                    max_evidence=int(graph_cfg.get("max_evidence", 5)),
+                    cache_max_entities=int(graph_cfg.get("cache_max_entities", 256)),
+                    cache_max_edges=int(graph_cfg.get("cache_max_edges", 20000)),
+                    cache_edges_per_entity=int(graph_cfg.get("cache_edges_per_entity", 64)),
+                    cache_evidence=int(graph_cfg.get("cache_evidence", 2)),
+                    cache_sync_interval_ms=int(graph_cfg.get("cache_sync_interval_ms", 250)),
                 )
             self._metrics_path = self._resolve_metrics_path(config)
             self._config_path = self._resolve_config_path()
@@ -408,6 +427,7 @@ class SmartContextPlugin(NexusPlugin):
         token_estimate = self._estimate_tokens(f"{user_message}\n{ai_response}")
         status, reason = self._decide_status_with_tokens(round_num, token_estimate)
         usage_snapshot = self._context_token_usage()
+        features = self._analyze_turn(user_message, ai_response)
 
         if status == "full":
             # 完整保留
@@ -418,14 +438,14 @@ class SmartContextPlugin(NexusPlugin):
         elif status == "summary":
             # 只保留摘要
             result["status"] = "summary"
-            summary = self._extract_summary(ai_response)
+            summary = self._extract_summary(ai_response, features)
             result["summary"] = summary
             result["compressed"] = False
             
         else:  # compress
             # 压缩
             result["status"] = "compressed"
-            summary = self._extract_summary(ai_response)
+            summary = self._extract_summary(ai_response, features)
             result["summary"] = summary
             result["compressed"] = True
             rescue_result = self.rescue_before_compress(f"{user_message}\n{ai_response}")
@@ -460,13 +480,14 @@ class SmartContextPlugin(NexusPlugin):
         
         blocks: List[str] = []
         if self.config.decision_block_enabled:
-            blocks = self._extract_decision_blocks(f"{user_message}\n{ai_response}")
+            blocks = features.decisions
 
         if self.config.summary_on_each_turn:
             turn_summary = self._build_turn_summary(
                 user_message,
                 ai_response,
                 blocks if self.config.decision_block_enabled else [],
+                features,
             )
             if turn_summary:
                 if self._nexus_core:
@@ -479,11 +500,12 @@ class SmartContextPlugin(NexusPlugin):
                     result["stored"] = True
                 self._append_metrics({"event": "turn_summary", "len": len(turn_summary)})
 
-        if self._detect_topic_switch(user_message):
+        if self._detect_topic_switch(user_message, features.user_keywords):
             topic_summary = self._build_turn_summary(
                 user_message,
                 ai_response,
                 blocks if self.config.decision_block_enabled else [],
+                features,
             )
             if topic_summary:
                 if self._nexus_core:
@@ -501,10 +523,8 @@ class SmartContextPlugin(NexusPlugin):
             self._store_context(conversation_id, round_num, result)
             if blocks:
                 self._store_decision_blocks(conversation_id, round_num, blocks)
-            if self.config.topic_block_enabled:
-                topics = self._extract_topics(f"{user_message}\n{ai_response}")
-                if topics:
-                    self._store_topic_blocks(conversation_id, round_num, topics)
+            if self.config.topic_block_enabled and features.topics:
+                self._store_topic_blocks(conversation_id, round_num, features.topics)
             result["stored"] = True
         
         # 更新历史
@@ -585,7 +605,17 @@ class SmartContextPlugin(NexusPlugin):
         except Exception:
             return
     
-    def _extract_summary(self, response: str) -> str:
+    def _analyze_turn(self, user_message: str, ai_response: str) -> TurnFeatures:
+        """一次遍历提取本轮全部特征（关键词/决策块/主题/行动/问题/实体/摘要）"""
+        return analyze_turn(
+            user_message,
+            ai_response,
+            decision_block_max=self.config.decision_block_max,
+            topic_block_max=self.config.topic_block_max,
+            topic_block_min_keywords=self.config.topic_block_min_keywords,
+        )
+
+    def _extract_summary(self, response: str, features: Optional[TurnFeatures] = None) -> str:
         """
         提取摘要
         
@@ -594,35 +624,36 @@ class SmartContextPlugin(NexusPlugin):
         2. ## 📋 总结 格式
         3. 默认摘要
         """
+        if features is None:
+            data = turn_analyzer.json_payload(response)
+            section = turn_analyzer.summary_section(response)
+            entities = None
+        else:
+            data, section, entities = features.response_json, features.summary_section, features.response_entities
+
         # JSON 格式
-        json_match = re.search(r'```json\s*\n([\s\S]*?)\n```', response)
-        if json_match:
-            try:
-                data = json.loads(json_match.group(1))
-                return data.get("本次核心产出", data.get("核心产出", ""))
-            except json.JSONDecodeError:
-                pass
+        if data is not None:
+            return data.get("本次核心产出", data.get("核心产出", ""))
         
         # ## 📋 总结 格式
-        summary_match = re.search(r'## 📋 总结[^\n]*\n([\s\S]*?)(?=\n\n|$)', response)
-        if summary_match:
-            return self._sanitize_summary(summary_match.group(1).strip(), response)
+        if section is not None:
+            return self._sanitize_summary(section, response, entities)
         
         # 默认摘要
-        return self._sanitize_summary(response[:200].strip(), response)
+        return self._sanitize_summary(response[:200].strip(), response, entities)
 
-    def _sanitize_summary(self, summary: str, fallback: str) -> str:
-        summary = (summary or "").strip()
-        summary = re.sub(r'```[\s\S]*?```', '', summary).strip()
+    def _sanitize_summary(self, summary: str, fallback: str, entities: Optional[List[str]] = None) -> str:
+        summary = turn_analyzer.strip_code_fences(summary)
         if summary.endswith("...") and len(summary) < 10:
             summary = summary[:-3].strip()
         min_len = max(20, int(self.config.summary_min_length / 2))
-        entities = self._extract_key_entities(fallback)
+        if entities is None:
+            entities = self._extract_key_entities(fallback)
         if len(summary) >= min_len:
             summary = self._append_entities(summary, entities)
             self._append_metrics({"event": "summary_ok", "len": len(summary)})
             return summary
-        fallback_text = re.sub(r'```[\s\S]*?```', '', (fallback or "")).strip()
+        fallback_text = turn_analyzer.strip_code_fences(fallback)
         if not fallback_text:
             self._append_metrics({"event": "summary_short", "len": len(summary)})
             return summary
@@ -632,25 +663,7 @@ class SmartContextPlugin(NexusPlugin):
         return rebuilt
 
     def _extract_key_entities(self, text: str) -> List[str]:
-        if not text:
-            return []
-        candidates = []
-        for match in re.findall(r'([A-Za-z0-9_./\\-]+\\.[A-Za-z0-9]+)', text):
-            candidates.append(match)
-        for match in re.findall(r'\\b[A-Za-z_][A-Za-z0-9_]{2,}\\(\\)', text):
-            candidates.append(match)
-        cleaned = []
-        for item in candidates:
-            if len(item) < 4 or len(item) > 120:
-                continue
-            lowered = item.lower()
-            if lowered.startswith(("sk-", "nvapi-", "ghp_")):
-                continue
-            if re.search(r'[A-Za-z0-9]{20,}', item):
-                continue
-            if item not in cleaned:
-                cleaned.append(item)
-        return cleaned[:5]
+        return turn_analyzer.extract_key_entities(text)
 
     def _append_entities(self, summary: str, entities: List[str]) -> str:
         if not entities:
@@ -710,16 +723,7 @@ class SmartContextPlugin(NexusPlugin):
     
     def extract_keywords(self, text: str) -> List[str]:
         """提取关键词"""
-        words = re.findall(r'\b\w+\b', text.lower())
-        
-        stop_words = {
-            '的', '了', '是', '在', '我', '你', '他', '这', '那',
-            '和', '就', '都', '也', '会', '可以', '什么', '怎么',
-            '如何', '有没有', '是不是', '能不能'
-        }
-        
-        keywords = [w for w in words if w not in stop_words and len(w) > 2]
-        return list(dict.fromkeys(keywords))[:5]
+        return turn_analyzer.extract_keywords(text)
 
     def _is_context_starved(self, user_message: str) -> bool:
         msg = (user_message or "").strip()
@@ -731,95 +735,31 @@ class SmartContextPlugin(NexusPlugin):
         return False
 
     def _extract_decision_blocks(self, text: str) -> List[str]:
-        if not text:
-            return []
-        blocks: List[str] = []
-
-        json_match = re.search(r'```json\s*\n([\s\S]*?)\n```', text)
-        if json_match:
-            try:
-                data = json.loads(json_match.group(1))
-                for key in ("本次核心产出", "核心产出", "决策上下文"):
-                    val = data.get(key)
-                    if isinstance(val, str) and val.strip():
-                        blocks.append(val.strip())
-            except json.JSONDecodeError:
-                pass
-
-        decision_keywords = ("决定", "选择", "采用", "使用", "结论", "方案", "策略", "切换", "改为")
-        for raw in text.splitlines():
-            line = raw.strip(" \t-•")
-            if not line:
-                continue
-            if "#GOLD" in line:
-                line = re.sub(r".*#GOLD[:\\s]*", "", line).strip()
-            if any(k in line for k in decision_keywords) and len(line) >= 6:
-                blocks.append(line)
-
-        seen = set()
-        uniq = []
-        for b in blocks:
-            if b in seen:
-                continue
-            seen.add(b)
-            uniq.append(b)
-        return uniq[: max(1, int(self.config.decision_block_max))]
+        return turn_analyzer.extract_decision_blocks(text, self.config.decision_block_max)
 
     def _extract_actions(self, text: str) -> List[str]:
-        if not text:
-            return []
-        actions: List[str] = []
-        for raw in text.splitlines():
-            line = raw.strip(" \t-•")
-            if not line:
-                continue
-            if line.lower().startswith(("todo", "next", "步骤")):
-                actions.append(line)
-                continue
-            if "下一步" in line or "继续" in line:
-                actions.append(line)
-        seen = set()
-        uniq = []
-        for item in actions:
-            if item in seen:
-                continue
-            seen.add(item)
-            uniq.append(item)
-        return uniq[:5]
+        return turn_analyzer.extract_actions(text)
 
     def _extract_questions(self, text: str) -> List[str]:
-        if not text:
-            return []
-        questions: List[str] = []
-        for raw in text.splitlines():
-            line = raw.strip(" \t-•")
-            if not line:
-                continue
-            if "?" in line or "？" in line:
-                questions.append(line)
-        seen = set()
-        uniq = []
-        for item in questions:
-            if item in seen:
-                continue
-            seen.add(item)
-            uniq.append(item)
-        return uniq[:5]
+        return turn_analyzer.extract_questions(text)
 
     def _build_turn_summary(
         self,
         user_message: str,
         ai_response: str,
         decisions: List[str],
+        features: Optional[TurnFeatures] = None,
     ) -> str:
-        summary = self._sanitize_summary(ai_response, ai_response)
+        if features is None:
+            features = self._analyze_turn(user_message, ai_response)
+        summary = self._sanitize_summary(ai_response, ai_response, features.response_entities)
         if not self.config.summary_template_enabled:
             return summary
-        actions = self._extract_actions(ai_response)
-        questions = self._extract_questions(user_message + "\n" + ai_response)
-        entities = self._extract_key_entities(user_message + "\n" + ai_response)
-        keywords = self.extract_keywords(user_message + " " + ai_response)
-        topics = self._extract_topics(user_message + "\n" + ai_response)
+        actions = features.actions
+        questions = features.questions
+        entities = features.entities
+        keywords = features.keywords
+        topics = features.topics
 
         fields = set(self.config.summary_template_fields or ())
         lines: List[str] = []
@@ -841,37 +781,19 @@ class SmartContextPlugin(NexusPlugin):
         return "\n".join(lines).strip()
 
     def _extract_topics(self, text: str) -> List[str]:
-        if not text:
-            return []
-        topics: List[str] = []
-        for raw in text.splitlines():
-            line = raw.strip(" \t-•")
-            if not line:
-                continue
-            if line.startswith("## "):
-                topics.append(line[3:].strip()[:60])
-            if any(k in line for k in ("主题", "话题", "模块", "子系统", "项目")) and len(line) <= 80:
-                topics.append(line)
-        keywords = self.extract_keywords(text)
-        if len(keywords) >= int(self.config.topic_block_min_keywords):
-            topics.append(" / ".join(keywords[: int(self.config.topic_block_min_keywords) + 1]))
-        seen = set()
-        uniq = []
-        for t in topics:
-            t = t.strip()
-            if not t or t in seen:
-                continue
-            seen.add(t)
-            uniq.append(t)
-        return uniq[: max(1, int(self.config.topic_block_max))]
+        return turn_analyzer.extract_topics(
+            text, self.config.topic_block_max, self.config.topic_block_min_keywords
+        )
 
-    def _detect_topic_switch(self, user_message: str) -> bool:
+    def _detect_topic_switch(self, user_message: str, keywords: Optional[List[str]] = None) -> bool:
         if not self.config.topic_switch_enabled:
             return False
         msg = (user_message or "").strip()
         if any(k in msg for k in ("换个话题", "另一个问题", "新话题", "顺便问", "另外")):
             return True
-        keywords = self.extract_keywords(msg)[: int(self.config.topic_switch_keywords_max)]
+        if keywords is None:
+            keywords = self.extract_keywords(msg)
+        keywords = keywords[: int(self.config.topic_switch_keywords_max)]
         if not keywords:
             return False
         if not self._last_keywords:
@@ -967,14 +889,8 @@ class SmartContextPlugin(NexusPlugin):
             return []
         subj = f"conversation:{conversation_id}" if conversation_id else "workspace"
         edges: List[Dict[str, Any]] = []
-        patterns = [
-            (r"(使用|采用|选择|改为|切换到)\s*([\\w\\-./]+)", "uses"),
-            (r"(依赖|基于)\s*([\\w\\-./]+)", "depends_on"),
-            (r"(目标|目的)[:：]\\s*([^，。]+)", "goal"),
-            (r"(影响|导致)\\s*([^，。]+)", "impacts"),
-        ]
-        for pattern, rel in patterns:
-            match = re.search(pattern, block)
+        for pattern, rel in GRAPH_EDGE_PATTERNS:
+            match = pattern.search(block)
             if match:
                 obj = match.group(2).strip()
                 if 2 <= len(obj) <= 80:
@@ -992,6 +908,7 @@ class SmartContextPlugin(NexusPlugin):
     def _store_decision_blocks(self, conversation_id: str, round_num: int, blocks: List[str]) -> None:
         if not blocks:
             return
+        graph_edges: List[Dict[str, Any]] = []
         for idx, block in enumerate(blocks, 1):
             self._call_nexus(
                 "add_document",
@@ -1001,21 +918,21 @@ class SmartContextPlugin(NexusPlugin):
             )
             if self._graph_enabled:
                 for edge in self._extract_graph_edges(block, conversation_id):
-                    graph_add_edge(
-                        subj=edge["subj"],
-                        rel=edge["rel"],
-                        obj=edge["obj"],
-                        weight=edge.get("weight", 1.0),
+                    edge.update(
                         source=f"decision_block:{conversation_id}",
                         evidence_text=block,
                         conversation_id=conversation_id,
                         round_num=round_num,
-                        entity_types=edge.get("entity_types"),
                     )
+                    graph_edges.append(edge)
+        if graph_edges:
+            # One transaction for every edge of the turn.
+            graph_add_edges_batch(graph_edges)
 
     def _store_topic_blocks(self, conversation_id: str, round_num: int, topics: List[str]) -> None:
         if not topics:
             return
+        graph_edges: List[Dict[str, Any]] = []
         for idx, topic in enumerate(topics, 1):
             self._call_nexus(
                 "add_document",
@@ -1024,17 +941,21 @@ class SmartContextPlugin(NexusPlugin):
                 tags=f"type:topic_block,round:{round_num},conversation:{conversation_id}"
             )
             if self._graph_enabled:
-                graph_add_edge(
-                    subj=f"conversation:{conversation_id}",
-                    rel="topic",
-                    obj=topic[:80],
-                    weight=0.8,
-                    source=f"topic_block:{conversation_id}",
-                    evidence_text=topic,
-                    conversation_id=conversation_id,
-                    round_num=round_num,
-                    entity_types={"subj": "conversation", "obj": "topic"},
+                graph_edges.append(
+                    {
+                        "subj": f"conversation:{conversation_id}",
+                        "rel": "topic",
+                        "obj": topic[:80],
+                        "weight": 0.8,
+                        "source": f"topic_block:{conversation_id}",
+                        "evidence_text": topic,
+                        "conversation_id": conversation_id,
+                        "round_num": round_num,
+                        "entity_types": {"subj": "conversation", "obj": "topic"},
+                    }
                 )
+        if graph_edges:
+            graph_add_edges_batch(graph_edges)
     
     def store_conversation(self, 
                           conversation_id: str,
@@ -1064,8 +985,10 @@ class SmartContextPlugin(NexusPlugin):
             )
             result["stored"] = True
             
+            features = self._analyze_turn(user_message, ai_response)
+
             # 存储摘要
-            summary = self._extract_summary(ai_response)
+            summary = self._extract_summary(ai_response, features)
             if summary:
                 self._call_nexus(
                     "add_document",
@@ -1075,7 +998,7 @@ class SmartContextPlugin(NexusPlugin):
                 )
             
             # 存储关键词
-            keywords = self.extract_keywords(user_message + " " + ai_response)
+            keywords = features.keywords
             if keywords:
                 self._call_nexus(
                     "add_document",
@@ -1085,13 +1008,10 @@ class SmartContextPlugin(NexusPlugin):
                 )
 
             if self.config.decision_block_enabled:
-                blocks = self._extract_decision_blocks(f"{user_message}\n{ai_response}")
-                self._store_decision_blocks(conversation_id, 0, blocks)
+                self._store_decision_blocks(conversation_id, 0, features.decisions)
 
-            if self.config.topic_block_enabled:
-                topics = self._extract_topics(f"{user_message}\n{ai_response}")
-                if topics:
-                    self._store_topic_blocks(conversation_id, 0, topics)
+            if self.config.topic_block_enabled and features.topics:
+                self._store_topic_blocks(conversation_id, 0, features.topics)
                 
         except Exception as e:
             result["error"] = str(e)
@@ -1218,6 +1138,7 @@ class SmartContextPlugin(NexusPlugin):
                     "reason": reason,
                     "graph_injected": len(graph_items),
                     "graph_ratio": round(graph_ratio, 3),
+                    "graph_cache": graph_cache_stats(),
                 }
             )
             self._record_inject_event(reason, len(final))
@@ -1381,23 +1302,31 @@ class SmartContextPlugin(NexusPlugin):
         max_items = max(1, int(self.config.graph_max_items))
         evidence_max = max(0, int(self.config.graph_evidence_max_chars))
         out: List[Dict] = []
-        for kw in keywords[: max_items]:
-            edges = graph_related_with_evidence(kw, limit=max_items, evidence_limit=1)
-            for e in edges:
-                ev = ""
-                evidence = e.get("evidence") or []
-                if evidence:
-                    ev = (evidence[0].get("text") or "")[:evidence_max]
-                content = f"{e.get('subj')} {e.get('rel')} {e.get('obj')}"
-                if ev:
-                    content = f"{content} | 证据: {ev}"
-                out.append(
-                    {
-                        "content": content,
-                        "source": "graph",
-                        "relevance": e.get("weight", 1.0),
-                    }
-                )
+        # One traversal for all keywords: a query per hop plus one evidence query.
+        edges = graph_traverse_with_evidence(
+            keywords[: max_items],
+            hops=max(1, int(self.config.graph_hops)),
+            limit=max_items,
+            fanout=int(self.config.graph_fanout) or max_items,
+            min_weight=float(self.config.graph_min_weight),
+            evidence_limit=1,
+        )
+        for e in edges:
+            ev = ""
+            evidence = e.get("evidence") or []
+            if evidence:
+                ev = (evidence[0].get("text") or "")[:evidence_max]
+            content = f"{e.get('subj')} {e.get('rel')} {e.get('obj')}"
+            if ev:
+                content = f"{content} | 证据: {ev}"
+            out.append(
+                {
+                    "content": content,
+                    "source": "graph",
+                    # Accumulated weight grows with repeats; relevance stays in [0, 1].
+                    "relevance": min(1.0, e.get("weight", 1.0)),
+                }
+            )
         if self.config.inject_debug and out:
             print(f"[SmartContext] GRAPH inject count={len(out)} keywords={keywords[:max_items]}")
         return out[: max_items]
@@ -1498,100 +1427,25 @@ def store_conversation(conversation_id: str, user_message: str, ai_response: str
     if not nexus_init():
         return {"error": "nexus init failed", "stored": False}
 
-    def _extract_summary(text: str) -> str:
-        json_match = re.search(r'```json\\s*\\n([\\s\\S]*?)\\n```', text)
-        if json_match:
-            try:
-                data = json.loads(json_match.group(1))
-                return data.get("本次核心产出", data.get("核心产出", ""))
-            except json.JSONDecodeError:
-                pass
-        summary_match = re.search(r'## 📋 总结[^\\n]*\\n([\\s\\S]*?)(?=\\n\\n|$)', text)
-        if summary_match:
-            return summary_match.group(1).strip()
-        return (text or "")[:100].strip()
-
-    def _extract_keywords(text: str) -> List[str]:
-        words = re.findall(r'\\b\\w+\\b', text.lower())
-        stop_words = {
-            '的', '了', '是', '在', '我', '你', '他', '这', '那',
-            '和', '就', '都', '也', '会', '可以', '什么', '怎么',
-            '如何', '有没有', '是不是', '能不能'
-        }
-        keywords = [w for w in words if w not in stop_words and len(w) > 2]
-        return list(dict.fromkeys(keywords))[:5]
-
-    def _extract_decisions(text: str) -> List[str]:
-        if not text:
-            return []
-        blocks: List[str] = []
-        json_match = re.search(r'```json\\s*\\n([\\s\\S]*?)\\n```', text)
-        if json_match:
-            try:
-                data = json.loads(json_match.group(1))
-                for key in ("本次核心产出", "核心产出", "决策上下文"):
-                    val = data.get(key)
-                    if isinstance(val, str) and val.strip():
-                        blocks.append(val.strip())
-            except json.JSONDecodeError:
-                pass
-        decision_keywords = ("决定", "选择", "采用", "使用", "结论", "方案", "策略", "切换", "改为")
-        for raw in text.splitlines():
-            line = raw.strip(" \\t-•")
-            if not line:
-                continue
-            if "#GOLD" in line:
-                line = re.sub(r".*#GOLD[:\\s]*", "", line).strip()
-            if any(k in line for k in decision_keywords) and len(line) >= 6:
-                blocks.append(line)
-        seen = set()
-        uniq = []
-        for b in blocks:
-            if b in seen:
-                continue
-            seen.add(b)
-            uniq.append(b)
-        return uniq[:3]
-
-    def _extract_topics(text: str) -> List[str]:
-        if not text:
-            return []
-        topics: List[str] = []
-        for raw in text.splitlines():
-            line = raw.strip(" \t-•")
-            if not line:
-                continue
-            if line.startswith("## "):
-                topics.append(line[3:].strip()[:60])
-            if any(k in line for k in ("主题", "话题", "模块", "子系统", "项目")) and len(line) <= 80:
-                topics.append(line)
-        kws = _extract_keywords(text)
-        if len(kws) >= 2:
-            topics.append(" / ".join(kws[:3]))
-        seen = set()
-        uniq = []
-        for t in topics:
-            if t in seen:
-                continue
-            seen.add(t)
-            uniq.append(t)
-        return uniq[:3]
-
-    summary = _extract_summary(ai_response)
+    features = analyze_turn(user_message, ai_response)
+    if features.response_json is not None:
+        summary = features.response_json.get("本次核心产出", features.response_json.get("核心产出", ""))
+    elif features.summary_section is not None:
+        summary = features.summary_section
+    else:
+        summary = (ai_response or "")[:100].strip()
     nexus_add(ai_response, f"对话 {conversation_id} - 原文", f"type:content,source:{conversation_id}")
     if summary:
         nexus_add(f"[摘要] {summary}", f"对话 {conversation_id} - 摘要", f"type:summary,source:{conversation_id}")
 
-    keywords = _extract_keywords(user_message + " " + ai_response)
+    keywords = features.keywords
     if keywords:
         nexus_add(" ".join(keywords), f"对话 {conversation_id} - 关键词", f"type:keywords,source:{conversation_id}")
 
-    decisions = _extract_decisions(user_message + "\\n" + ai_response)
-    for idx, block in enumerate(decisions, 1):
+    for idx, block in enumerate(features.decisions, 1):
         nexus_add(block, f"决策块 {conversation_id} - ({idx})", f"type:decision_block,source:{conversation_id}")
 
-    topics = _extract_topics(user_message + "\\n" + ai_response)
-    for idx, topic in enumerate(topics, 1):
+    for idx, topic in enumerate(features.topics, 1):
         nexus_add(topic, f"主题块 {conversation_id} - ({idx})", f"type:topic_block,source:{conversation_id}")
 
     return {"stored": True, "conversation_id": conversation_id}
@@ -0,0 +1,263 @@
+"""
+Turn analyzer - every feature SmartContext extracts from one conversation turn.
+
+`analyze_turn` splits each message into lines once and tokenizes it once,
+then runs module-level precompiled patterns over that single pass to collect
+keywords, decision blocks, topics, next actions, questions, key entities and
+the summary candidates of the AI response.
+
+The single-feature helpers (`extract_keywords`, `extract_decision_blocks`, ...)
+keep the per-call API of the old `SmartContextPlugin._extract_*` methods.
+Each of them makes its own pass, so prefer `analyze_turn` when you need more
+than one feature of the same turn.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_JSON_BLOCK_RE = re.compile(r"```json\s*\n([\s\S]*?)\n```")
+_SUMMARY_SECTION_RE = re.compile(r"## 📋 总结[^\n]*\n([\s\S]*?)(?=\n\n|$)")
+_CODE_FENCE_RE = re.compile(r"```[\s\S]*?```")
+_WORD_RE = re.compile(r"\w+")
+_GOLD_RE = re.compile(r".*#GOLD[:\s]*")
+_PATH_RE = re.compile(r"([A-Za-z0-9_./\-]+\.[A-Za-z0-9]+)")
+_CALL_RE = re.compile(r"\b[A-Za-z_][A-Za-z0-9_]{2,}\(\)")
+_SECRET_RE = re.compile(r"[A-Za-z0-9]{20,}")
+_DECISION_RE = re.compile("决定|选择|采用|使用|结论|方案|策略|切换|改为")
+_TOPIC_RE = re.compile("主题|话题|模块|子系统|项目")
+_ACTION_RE = re.compile("下一步|继续")
+_LINE_STRIP = " \t-•"
+
+STOP_WORDS = frozenset(
+    {
+        '的', '了', '是', '在', '我', '你', '他', '这', '那',
+        '和', '就', '都', '也', '会', '可以', '什么', '怎么',
+        '如何', '有没有', '是不是', '能不能',
+    }
+)
+JSON_DECISION_KEYS = ("本次核心产出", "核心产出", "决策上下文")
+
+
+@dataclass
+class TurnFeatures:
+    """Everything extracted from one (user_message, ai_response) turn.
+
+    Lists are de-duplicated in first-seen order and already capped.
+    `entities`/`questions`/`topics`/`decisions`/`keywords` cover the whole
+    turn; `actions`, `response_entities` and the summary fields only the
+    AI response.
+    """
+    keywords: List[str] = field(default_factory=list)
+    user_keywords: List[str] = field(default_factory=list)
+    decisions: List[str] = field(default_factory=list)
+    topics: List[str] = field(default_factory=list)
+    actions: List[str] = field(default_factory=list)
+    questions: List[str] = field(default_factory=list)
+    entities: List[str] = field(default_factory=list)
+    response_entities: List[str] = field(default_factory=list)
+    # Parsed ```json block of the response (None when absent or invalid).
+    response_json: Optional[Dict[str, Any]] = None
+    # Body of the "## 📋 总结" section of the response, if any.
+    summary_section: Optional[str] = None
+
+
+def _uniq(items: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(items))
+
+
+def _strip_lines(text: str) -> List[str]:
+    return [line for line in (raw.strip(_LINE_STRIP) for raw in text.splitlines()) if line]
+
+
+def _parse_json_block(match: Optional["re.Match[str]"]) -> Optional[Dict[str, Any]]:
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(1))
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def json_payload(text: str) -> Optional[Dict[str, Any]]:
+    """Parsed first ```json block of `text` (None when absent or invalid)."""
+    return _parse_json_block(_JSON_BLOCK_RE.search(text or ""))
+
+
+def summary_section(text: str) -> Optional[str]:
+    match = _SUMMARY_SECTION_RE.search(text or "")
+    return match.group(1).strip() if match else None
+
+
+def strip_code_fences(text: str) -> str:
+    return _CODE_FENCE_RE.sub("", text or "").strip()
+
+
+def _keywords_from_words(words: Iterable[str], limit: int = 5) -> List[str]:
+    return _uniq(w for w in words if len(w) > 2 and w not in STOP_WORDS)[:limit]
+
+
+def extract_keywords(text: str, limit: int = 5) -> List[str]:
+    return _keywords_from_words(_WORD_RE.findall((text or "").lower()), limit)
+
+
+def _clean_entities(candidates: Iterable[str]) -> List[str]:
+    cleaned: List[str] = []
+    for item in candidates:
+        if len(item) < 4 or len(item) > 120:
+            continue
+        if item.lower().startswith(("sk-", "nvapi-", "ghp_")):
+            continue
+        if _SECRET_RE.search(item):
+            continue
+        if item not in cleaned:
+            cleaned.append(item)
+            if len(cleaned) == 5:
+                break
+    return cleaned
+
+
+def extract_key_entities(text: str) -> List[str]:
+    """File-like paths and `name()` calls, skipping anything key-shaped."""
+    if not text:
+        return []
+    return _clean_entities(_PATH_RE.findall(text) + _CALL_RE.findall(text))
+
+
+def _decision_line(line: str) -> Optional[str]:
+    if "#GOLD" in line:
+        line = _GOLD_RE.sub("", line).strip()
+    if len(line) >= 6 and _DECISION_RE.search(line):
+        return line
+    return None
+
+
+def _topic_lines(line: str) -> Iterable[str]:
+    if line.startswith("## "):
+        yield line[3:].strip()[:60]
+    if len(line) <= 80 and _TOPIC_RE.search(line):
+        yield line
+
+
+def _is_action(line: str) -> bool:
+    return line.lower().startswith(("todo", "next", "步骤")) or bool(_ACTION_RE.search(line))
+
+
+def _is_question(line: str) -> bool:
+    return "?" in line or "？" in line
+
+
+def _json_decisions(data: Optional[Dict[str, Any]]) -> List[str]:
+    if not data:
+        return []
+    blocks = []
+    for key in JSON_DECISION_KEYS:
+        val = data.get(key)
+        if isinstance(val, str) and val.strip():
+            blocks.append(val.strip())
+    return blocks
+
+
+def _topic_block(topics: List[str], keywords: List[str], min_keywords: int, max_topics: int) -> List[str]:
+    if len(keywords) >= min_keywords:
+        topics = topics + [" / ".join(keywords[: min_keywords + 1])]
+    return _uniq(t for t in (t.strip() for t in topics) if t)[: max(1, max_topics)]
+
+
+def extract_decision_blocks(text: str, max_blocks: int = 3) -> List[str]:
+    if not text:
+        return []
+    blocks = _json_decisions(json_payload(text))
+    blocks.extend(filter(None, map(_decision_line, _strip_lines(text))))
+    return _uniq(blocks)[: max(1, int(max_blocks))]
+
+
+def extract_actions(text: str) -> List[str]:
+    if not text:
+        return []
+    return _uniq(line for line in _strip_lines(text) if _is_action(line))[:5]
+
+
+def extract_questions(text: str) -> List[str]:
+    if not text:
+        return []
+    return _uniq(line for line in _strip_lines(text) if _is_question(line))[:5]
+
+
+def extract_topics(text: str, max_topics: int = 3, min_keywords: int = 2) -> List[str]:
+    if not text:
+        return []
+    topics = [t for line in _strip_lines(text) for t in _topic_lines(line)]
+    return _topic_block(topics, extract_keywords(text), int(min_keywords), int(max_topics))
+
+
+def analyze_turn(
+    user_message: str,
+    ai_response: str,
+    *,
+    decision_block_max: int = 3,
+    topic_block_max: int = 3,
+    topic_block_min_keywords: int = 2,
+) -> TurnFeatures:
+    """Extract every turn feature in one pass over each message.
+
+    Results match running the single-feature helpers over
+    f"{user_message}\\n{ai_response}" (keywords, decisions, topics,
+    questions, entities) or over `ai_response` alone (actions, summary).
+    """
+    user_message = user_message or ""
+    ai_response = ai_response or ""
+    user_lines = _strip_lines(user_message)
+    response_lines = _strip_lines(ai_response)
+
+    decisions: List[str] = []
+    topics: List[str] = []
+    questions: List[str] = []
+    actions: List[str] = []
+    for lines, is_response in ((user_lines, False), (response_lines, True)):
+        for line in lines:
+            decision = _decision_line(line)
+            if decision:
+                decisions.append(decision)
+            topics.extend(_topic_lines(line))
+            if _is_question(line):
+                questions.append(line)
+            if is_response and _is_action(line):
+                actions.append(line)
+
+    user_words = _WORD_RE.findall(user_message.lower())
+    response_words = _WORD_RE.findall(ai_response.lower())
+    keywords = _keywords_from_words(user_words + response_words)
+
+    # The first ```json block of the turn carries its decisions; the
+    # response's own block carries its summary.
+    user_match = _JSON_BLOCK_RE.search(user_message)
+    response_json = json_payload(ai_response)
+    turn_json = _parse_json_block(user_match) if user_match else response_json
+
+    user_paths, response_paths = _PATH_RE.findall(user_message), _PATH_RE.findall(ai_response)
+    user_calls, response_calls = _CALL_RE.findall(user_message), _CALL_RE.findall(ai_response)
+
+    return TurnFeatures(
+        keywords=keywords,
+        user_keywords=_keywords_from_words(user_words),
+        decisions=_uniq(_json_decisions(turn_json) + decisions)[: max(1, int(decision_block_max))],
+        topics=_topic_block(topics, keywords, int(topic_block_min_keywords), int(topic_block_max)),
+        actions=_uniq(actions)[:5],
+        questions=_uniq(questions)[:5],
+        entities=_clean_entities(user_paths + response_paths + user_calls + response_calls),
+        response_entities=_clean_entities(response_paths + response_calls),
+        response_json=response_json,
+        summary_section=summary_section(ai_response),
+    )
+
+
+# (pattern, relation) pairs that lift graph edges out of decision blocks.
+GRAPH_EDGE_PATTERNS: Tuple[Tuple["re.Pattern[str]", str], ...] = (
+    (re.compile(r"(使用|采用|选择|改为|切换到)\s*([\w\-./]+)"), "uses"),
+    (re.compile(r"(依赖|基于)\s*([\w\-./]+)"), "depends_on"),
+    (re.compile(r"(目标|目的)[:：]\s*([^，。]+)"), "goal"),
+    (re.compile(r"(影响|导致)\s*([^，。]+)"), "impacts"),
+)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Offline evaluation of recall fusion methods.
+
+1. Record brain/vector leg results for a query set (needs a live store):
+
+    python -m deepsea_nexus.scripts.eval_recall_fusion record \\
+        --queries queries.jsonl --out recorded.jsonl --k 20
+
+   `queries.jsonl` lines: {"query": "...", "relevant": ["doc id or content", ...]}
+
+2. Compare fusion methods on the recording (no store needed):
+
+    python -m deepsea_nexus.scripts.eval_recall_fusion eval \\
+        --recorded recorded.jsonl --n 5 --leg-k 5
+
+Reports recall@n, MRR and nDCG@n per method. A result counts as relevant
+when its doc_id, or the content hash of one of the `relevant` strings,
+matches.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+from typing import Any, Dict, List, Optional, Sequence
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+    __package__ = "deepsea_nexus.scripts"
+
+from ..plugins.recall_fusion import FUSION_METHODS, content_key, fuse
+from ..storage.base import RecallResult
+
+
+def _read_jsonl(path: str) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                rows.append(json.loads(line))
+    return rows
+
+
+def _to_result(row: Dict[str, Any]) -> RecallResult:
+    return RecallResult(
+        content=str(row.get("content", "")),
+        source=str(row.get("source", "")),
+        relevance=float(row.get("relevance", 0.0)),
+        metadata=dict(row.get("metadata") or {}),
+        doc_id=row.get("doc_id"),
+    )
+
+
+def _from_result(result: RecallResult) -> Dict[str, Any]:
+    return {
+        "content": result.content,
+        "source": result.source,
+        "relevance": result.relevance,
+        "metadata": result.metadata or {},
+        "doc_id": result.doc_id,
+    }
+
+
+def _relevant_keys(relevant: Sequence[str]) -> set:
+    keys = set()
+    for item in relevant:
+        keys.add(str(item))
+        keys.add(content_key(RecallResult(content=str(item), source="", relevance=0.0)))
+    return keys
+
+
+def _is_relevant(result: RecallResult, keys: set) -> bool:
+    return (result.doc_id is not None and str(result.doc_id) in keys) or content_key(result) in keys
+
+
+def score_ranking(ranked: List[RecallResult], relevant: Sequence[str], n: int) -> Dict[str, float]:
+    """recall@n, reciprocal rank and nDCG@n of one ranked list."""
+    keys = _relevant_keys(relevant)
+    hits = [_is_relevant(r, keys) for r in ranked[:n]]
+    total = len(set(relevant))
+    rr = next((1.0 / i for i, hit in enumerate(hits, 1) if hit), 0.0)
+    dcg = sum(1.0 / math.log2(i + 1) for i, hit in enumerate(hits, 1) if hit)
+    ideal = sum(1.0 / math.log2(i + 1) for i in range(1, min(total, n) + 1))
+    return {
+        "recall": (sum(hits) / total) if total else 0.0,
+        "mrr": rr,
+        "ndcg": (dcg / ideal) if ideal else 0.0,
+    }
+
+
+def evaluate(
+    recorded: List[Dict[str, Any]],
+    n: int = 5,
+    leg_k: int = 0,
+    methods: Sequence[str] = FUSION_METHODS,
+    **fusion_opts: Any,
+) -> Dict[str, Dict[str, float]]:
+    """Average metrics per fusion method over recorded queries with judgments."""
+    leg_k = leg_k or n
+    totals = {m: {"recall": 0.0, "mrr": 0.0, "ndcg": 0.0} for m in methods}
+    judged = [row for row in recorded if row.get("relevant")]
+    for row in judged:
+        legs = row.get("legs") or {}
+        brain = [_to_result(r) for r in (legs.get("brain") or [])]
+        vector = [_to_result(r) for r in (legs.get("vector") or [])]
+        for method in methods:
+            if method == "legacy":
+                # Evaluated the way it runs today: each leg fetches n.
+                ranked = fuse(method, brain[:n], vector[:n], n)
+            else:
+                ranked = fuse(method, brain[:leg_k], vector[:leg_k], n, **fusion_opts)
+            for metric, value in score_ranking(ranked, row["relevant"], n).items():
+                totals[method][metric] += value
+    count = len(judged)
+    return {
+        m: {metric: round(value / count, 4) if count else 0.0 for metric, value in vals.items()}
+        for m, vals in totals.items()
+    }
+
+
+def record(queries: List[Dict[str, Any]], k: int, config_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Run each leg of the live nexus_core plugin for every query."""
+    from ..compat import nexus_init
+    from ..compat_async import run_coro_sync
+    from ..core.plugin_system import get_plugin_registry
+
+    if not nexus_init(config_path):
+        raise RuntimeError("Failed to initialize Nexus")
+    plugin = get_plugin_registry().get("nexus_core")
+    brain_on = plugin._brain_enabled and plugin._brain_available
+    vector_on = bool(plugin._available and plugin._vector_backend)
+
+    rows = []
+    for item in queries:
+        query = str(item.get("query", ""))
+        legs: Dict[str, List[Dict[str, Any]]] = {}
+        if brain_on:
+            legs["brain"] = [_from_result(r) for r in plugin._brain_recall(query, k)]
+        if vector_on:
+            leg = plugin._vector_leg(query, k)
+            results = run_coro_sync(leg()) if asyncio.iscoroutinefunction(leg) else leg()
+            legs["vector"] = [_from_result(r) for r in results]
+        rows.append({"query": query, "relevant": list(item.get("relevant") or []), "legs": legs})
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Evaluate recall fusion methods offline")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="record leg results for a query set")
+    rec.add_argument("--queries", required=True)
+    rec.add_argument("--out", required=True)
+    rec.add_argument("--k", type=int, default=20)
+    rec.add_argument("--config", default=None)
+
+    ev = sub.add_parser("eval", help="compare fusion methods on a recording")
+    ev.add_argument("--recorded", required=True)
+    ev.add_argument("--n", type=int, default=5)
+    ev.add_argument("--leg-k", type=int, default=0)
+    ev.add_argument("--rrf-k", type=int, default=60)
+    ev.add_argument("--json", action="store_true")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        rows = record(_read_jsonl(args.queries), args.k, args.config)
+        with open(args.out, "w", encoding="utf-8") as fh:
+            for row in rows:
+                fh.write(json.dumps(row, ensure_ascii=False) + "\n")
+        print(f"recorded {len(rows)} queries -> {args.out}")
+        return 0
+
+    report = evaluate(_read_jsonl(args.recorded), n=args.n, leg_k=args.leg_k, rrf_k=args.rrf_k)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    print(f"{'method':<12}{'recall@' + str(args.n):>12}{'mrr':>10}{'ndcg@' + str(args.n):>10}")
+    for method, vals in report.items():
+        print(f"{method:<12}{vals['recall']:>12.4f}{vals['mrr']:>10.4f}{vals['ndcg']:>10.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
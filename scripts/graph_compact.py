@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+One-time compaction of a graph database written before edges were unique.
+
+Merges duplicate (subj, rel, obj) edges (summing weight and hit counts),
+de-duplicates and trims their evidence, then adds the unique constraint so
+later writes upsert:
+
+    python -m deepsea_nexus.scripts.graph_compact --db ~/.openclaw/workspace/brain/graph.sqlite3
+
+Without --db the path comes from `graph.db_path` in the Nexus config, falling
+back to <paths.base>/brain/graph.sqlite3. Safe to re-run.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+    __package__ = "deepsea_nexus.scripts"
+
+from ..brain.graph_store import GraphStore
+
+
+def _default_db_path() -> str:
+    from ..core.config_manager import get_config_manager
+
+    config = get_config_manager().get_all()
+    graph_cfg = config.get("graph", {}) if isinstance(config.get("graph", {}), dict) else {}
+    if graph_cfg.get("db_path"):
+        return str(graph_cfg["db_path"])
+    return os.path.join(config.get("paths", {}).get("base", "."), "brain", "graph.sqlite3")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Merge duplicate graph edges and add the unique constraint")
+    parser.add_argument("--db", default=None, help="graph sqlite path (default: from config)")
+    parser.add_argument("--max-evidence", type=int, default=5, help="evidence rows kept per edge")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM afterwards to return freed pages")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    db_path = os.path.expanduser(args.db or _default_db_path())
+    if not os.path.exists(db_path):
+        print(f"no graph database at {db_path}", file=sys.stderr)
+        return 1
+
+    store = GraphStore(db_path, max_evidence=args.max_evidence)
+    try:
+        stats = store.compact_edges()
+    finally:
+        store.close()
+    if args.vacuum:
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+
+    if args.json:
+        print(json.dumps({"db": db_path, **stats}, indent=2))
+    else:
+        print(
+            f"{db_path}: {stats['edges_before']} -> {stats['edges_after']} edges "
+            f"({stats['merged_groups']} merged), {stats['evidence_removed']} evidence rows removed"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -41,8 +41,10 @@ class NexusWarmupService:
         
         # 1. 加载 embedding 模型
         print("  📦 加载 embedding 模型...", flush=True)
-        from sentence_transformers import SentenceTransformer
-        self.embedder = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+        from brain.embedding_service import get_embedding_service
+        self.embedder = get_embedding_service()
+        if not self.embedder.available():
+            raise RuntimeError("sentence-transformers not available")
         print("    ✓ 模型加载完成", flush=True)
         
         # 2. 连接向量库
@@ -80,7 +82,7 @@ class NexusWarmupService:
             if not query:
                 response = {"error": "Empty query"}
             else:
-                query_embedding = self.embedder.encode([query]).tolist()
+                query_embedding = [self.embedder.embed(query)]
                 results = self.collection.query(
                     query_embeddings=query_embedding, 
                     n_results=n
@@ -0,0 +1,558 @@
+"""
+ChromaDB vector storage backend (async, registered as "chromadb").
+
+Implements `VectorStorageBackend` on top of a persistent Chroma collection:
+- Every Chroma call runs on a bounded worker-thread pool, so the event loop
+  never blocks and the backend is not tied to any particular loop.
+- Writes go through a write-behind queue and are upserted in batches once
+  `write_batch_size` documents are pending or `write_flush_interval_sec`
+  after the first one. Reads flush the queue first, so callers always see
+  their own writes.
+- Query/document embeddings come from the shared EmbeddingService when it is
+  available; otherwise Chroma embeds the text itself.
+- `get_stats` reports per-operation latency percentiles and write counters.
+
+Select it with `storage.async_backend: true` (and `storage.vector_backend:
+"chromadb"`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+import uuid
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from .base import RecallResult, StorageBackendFactory, StorageResult, VectorStorageBackend
+
+logger = logging.getLogger(__name__)
+
+_LATENCY_WINDOW = 1024
+_LIVE: "weakref.WeakSet[ChromaVectorBackend]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_live() -> None:
+    # Timers are daemon threads; write whatever is still queued at shutdown.
+    for backend in list(_LIVE):
+        try:
+            backend._flush_pending()
+        except Exception:
+            pass
+
+
+# Chroma only takes numbers for $gt/$gte/$lt/$lte and `created_at` is stored
+# as an ISO string, so date bounds are never pushed down: the vector leg
+# fetches this many times more results and keeps the in-range ones.
+DATE_FILTER_OVERFETCH = 4
+
+
+def chroma_where(filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Translate normalized recall filters (brain.filters) into a Chroma `where`.
+
+    `date_from`/`date_to` are left to `filter_by_date`.
+    """
+    clauses: List[Dict[str, Any]] = []
+    if filters.get("tags"):
+        clauses.append({"tags": {"$in": list(filters["tags"])}})
+    if filters.get("type"):
+        clauses.append({"type": {"$in": list(filters["type"])}})
+    if filters.get("priority"):
+        clauses.append({"priority": {"$in": list(filters["priority"])}})
+    if filters.get("conversation_id"):
+        clauses.append({"conversation_id": {"$eq": filters["conversation_id"]}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def has_date_filter(filters: Optional[Dict[str, Any]]) -> bool:
+    return bool(filters) and bool(filters.get("date_from") or filters.get("date_to"))
+
+
+def filter_by_date(results: List[RecallResult], filters: Dict[str, Any], limit: int) -> List[RecallResult]:
+    """Keep results whose metadata `created_at` is within the filter's date bounds."""
+    from ..brain.filters import in_date_range
+
+    date_from, date_to = filters.get("date_from"), filters.get("date_to")
+    kept = [
+        r for r in results
+        if in_date_range(str((r.metadata or {}).get("created_at") or ""), date_from, date_to)
+    ]
+    return kept[: max(0, int(limit))]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+class ChromaVectorBackend(VectorStorageBackend):
+    """Async Chroma backend with a worker pool and a write-behind queue."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self._config: Dict[str, Any] = dict(config or {})
+        self._client = None
+        self._collection = None
+        self._collection_name = "deepsea_nexus"
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._embedder = None
+        self._workers = 4
+        self._write_behind = True
+        self._write_batch_size = 64
+        self._flush_interval = 0.05
+        self._queue_max = 10000
+
+        # (doc_id, content, metadata) waiting to be written
+        self._pending: List[Tuple[str, str, Dict[str, Any]]] = []
+        self._pending_lock = threading.Lock()
+        # Held for a whole drain + upsert, so reads after flush() see the writes.
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+        self._stats_lock = threading.Lock()
+        self._latency: Dict[str, Deque[float]] = {}
+        self._counters = {"writes": 0, "write_batches": 0, "write_errors": 0, "searches": 0}
+        self._last_error: Optional[str] = None
+        self._count = 0
+
+    @property
+    def backend_name(self) -> str:
+        return "chromadb"
+
+    @property
+    def collection_name(self) -> str:
+        return self._collection_name
+
+    async def initialize(self, config: Optional[Dict[str, Any]] = None) -> bool:
+        cfg = dict(self._config)
+        cfg.update(config or {})
+        self._config = cfg
+        try:
+            import chromadb
+            from chromadb.config import Settings
+        except ImportError:
+            logger.warning("ChromaDB not installed. Run: pip install chromadb")
+            return False
+
+        persist_path = os.path.expanduser(
+            cfg.get("persist_path") or "~/.openclaw/workspace/memory/.vector_db_final"
+        )
+        self._collection_name = str(cfg.get("collection_name") or "deepsea_nexus")
+        self._workers = max(1, int(cfg.get("workers", 4)))
+        self._write_behind = bool(cfg.get("write_behind", True))
+        self._write_batch_size = max(1, int(cfg.get("write_batch_size", 64)))
+        self._flush_interval = max(0.0, float(cfg.get("write_flush_interval_sec", 0.05)))
+        self._queue_max = max(self._write_batch_size, int(cfg.get("write_queue_max", 10000)))
+        self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="chroma-backend")
+
+        if cfg.get("shared_embeddings", True):
+            try:
+                from ..brain.embedding_service import get_embedding_service
+
+                self._embedder = get_embedding_service(str(cfg.get("embedder_name") or "all-MiniLM-L6-v2"))
+            except Exception as e:
+                logger.warning(f"Shared embedding service unavailable: {e}")
+                self._embedder = None
+
+        def _open() -> int:
+            os.makedirs(persist_path, exist_ok=True)
+            self._client = chromadb.PersistentClient(
+                path=persist_path,
+                settings=Settings(anonymized_telemetry=False),
+                tenant="default_tenant",
+                database="default_database",
+            )
+            self._collection = self._client.get_or_create_collection(
+                name=self._collection_name,
+                metadata={"description": "Deep-Sea Nexus Memory"},
+            )
+            return self._collection.count()
+
+        try:
+            self._count = await self._run("open", _open)
+        except Exception as e:
+            logger.error(f"Chroma backend init failed: {e}")
+            self._last_error = str(e)
+            return False
+        _LIVE.add(self)
+        return True
+
+    # Internals
+
+    async def _run(self, op: str, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._executor is None:
+            raise RuntimeError("Chroma backend is not initialized")
+        started = time.perf_counter()
+        try:
+            return await asyncio.wrap_future(self._executor.submit(fn, *args))
+        finally:
+            self._observe(op, (time.perf_counter() - started) * 1000.0)
+
+    def _observe(self, op: str, elapsed_ms: float) -> None:
+        with self._stats_lock:
+            window = self._latency.get(op)
+            if window is None:
+                window = self._latency[op] = deque(maxlen=_LATENCY_WINDOW)
+            window.append(elapsed_ms)
+
+    def _embed(self, texts: Sequence[str], cache: bool = True) -> Optional[List[List[float]]]:
+        embedder = self._embedder
+        if embedder is None or not texts or not embedder.available():
+            return None
+        vecs = embedder.embed_many(list(texts), cache=cache)
+        return vecs if vecs is not None and len(vecs) == len(texts) else None
+
+    def _write_rows(self, rows: List[Tuple[str, str, Dict[str, Any]]]) -> List[StorageResult]:
+        """Upsert rows in one call; on failure retry one by one so errors are attributed."""
+        if not rows:
+            return []
+        ids = [r[0] for r in rows]
+        contents = [r[1] for r in rows]
+        metadatas = [r[2] or {"title": "Untitled"} for r in rows]
+        started = time.perf_counter()
+        try:
+            kwargs: Dict[str, Any] = {"ids": ids, "documents": contents, "metadatas": metadatas}
+            # Document text stays out of the shared query cache.
+            embeddings = self._embed(contents, cache=False)
+            if embeddings is not None:
+                kwargs["embeddings"] = embeddings
+            self._collection.upsert(**kwargs)
+        except Exception as e:
+            if len(rows) > 1:
+                logger.warning(f"Chroma batch write failed ({e}); retrying documents individually")
+                return [self._write_rows([row])[0] for row in rows]
+            logger.error(f"Chroma write failed: {e}")
+            with self._stats_lock:
+                self._counters["write_errors"] += 1
+                self._last_error = str(e)
+            return [StorageResult.err(str(e), backend=self.backend_name)]
+        finally:
+            self._observe("write_batch", (time.perf_counter() - started) * 1000.0)
+        with self._stats_lock:
+            self._counters["writes"] += len(rows)
+            self._counters["write_batches"] += 1
+        self._refresh_count()
+        return [StorageResult.ok(doc_id, backend=self.backend_name) for doc_id in ids]
+
+    def _refresh_count(self) -> None:
+        """Re-read the collection size; upserts of existing ids and deletes of
+        missing ones would make a locally adjusted count drift."""
+        try:
+            count = int(self._collection.count())
+        except Exception as e:
+            logger.debug(f"Chroma count refresh failed: {e}")
+            return
+        with self._stats_lock:
+            self._count = count
+
+    def _delete_ids(self, ids: List[str]) -> None:
+        self._collection.delete(ids=ids)
+        self._refresh_count()
+
+    def _enqueue(self, rows: List[Tuple[str, str, Dict[str, Any]]]) -> bool:
+        """Queue rows for write-behind; returns True when the caller should flush now."""
+        with self._pending_lock:
+            self._pending.extend(rows)
+            pending = len(self._pending)
+            if pending >= self._write_batch_size or self._flush_interval <= 0:
+                if self._executor is not None:
+                    self._executor.submit(self._flush_pending)
+            elif self._timer is None:
+                timer = threading.Timer(self._flush_interval, self._flush_in_background)
+                timer.daemon = True
+                self._timer = timer
+                timer.start()
+            return pending >= self._queue_max
+
+    def _flush_in_background(self) -> None:
+        try:
+            self._flush_pending()
+        except Exception as e:
+            logger.error(f"Chroma write-behind flush failed: {e}")
+
+    def _flush_pending(self) -> List[StorageResult]:
+        with self._flush_lock:
+            with self._pending_lock:
+                rows, self._pending = self._pending, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not rows or self._collection is None:
+                return []
+            results: List[StorageResult] = []
+            for start in range(0, len(rows), self._write_batch_size):
+                results.extend(self._write_rows(rows[start:start + self._write_batch_size]))
+            return results
+
+    def _where(self, filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Structured recall filters are translated; anything else is a raw Chroma where."""
+        return self._split_filters(filters)[0]
+
+    def _split_filters(self, filters: Optional[Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """(Chroma where, normalized structured filters to post-filter dates on)."""
+        if not filters:
+            return None, {}
+        from ..brain.filters import FILTER_KEYS, normalize_filters
+
+        if set(filters) <= set(FILTER_KEYS):
+            normalized = normalize_filters(filters)
+            return chroma_where(normalized), normalized
+        return filters, {}
+
+    def _results(self, raw: Dict[str, Any], row: int, min_relevance: float) -> List[RecallResult]:
+        def _row(field: str) -> List[Any]:
+            rows = (raw or {}).get(field) or []
+            return (rows[row] or []) if row < len(rows) else []
+
+        docs, metas, ids, dists = _row("documents"), _row("metadatas"), _row("ids"), _row("distances")
+        out: List[RecallResult] = []
+        for i, content in enumerate(docs):
+            meta = (metas[i] if i < len(metas) else None) or {}
+            doc_id = ids[i] if i < len(ids) else ""
+            dist = dists[i] if i < len(dists) else None
+            relevance = 0.5 if dist is None else max(0.0, 1.0 - float(dist))
+            if relevance < min_relevance:
+                continue
+            out.append(
+                RecallResult(
+                    content=str(content),
+                    source=str(meta.get("title", doc_id or "doc")),
+                    relevance=float(relevance),
+                    metadata={"origin": "vector", **meta},
+                    doc_id=str(doc_id),
+                )
+            )
+        return out
+
+    def _query(
+        self,
+        queries: List[str],
+        limit: int,
+        where: Optional[Dict[str, Any]],
+        query_embeddings: Optional[List[List[float]]],
+    ) -> Dict[str, Any]:
+        if query_embeddings is None:
+            query_embeddings = self._embed(queries)
+        kwargs: Dict[str, Any] = {"n_results": max(1, int(limit))}
+        if where:
+            kwargs["where"] = where
+        if query_embeddings is not None:
+            kwargs["query_embeddings"] = query_embeddings
+        else:
+            kwargs["query_texts"] = queries
+        return self._collection.query(**kwargs)
+
+    # VectorStorageBackend API
+
+    async def flush(self) -> List[StorageResult]:
+        """Write every queued document now, waiting for batches already being written."""
+        with self._pending_lock:
+            idle = not self._pending
+        # Rows are drained and upserted under `_flush_lock`, so with nothing
+        # queued and the lock free every earlier write has landed.
+        if idle and not self._flush_lock.locked():
+            return []
+        return await self._run("flush", self._flush_pending)
+
+    async def add(self, content: str,
+                  metadata: Optional[Dict[str, Any]] = None,
+                  doc_id: Optional[str] = None) -> StorageResult:
+        if not content:
+            return StorageResult.err("empty content", backend=self.backend_name)
+        row = (doc_id or str(uuid.uuid4()), content, dict(metadata or {"title": "Untitled"}))
+        if not self._write_behind:
+            return (await self._run("add", self._write_rows, [row]))[0]
+        if self._enqueue([row]):
+            # Queue is full: apply backpressure until it drains.
+            await self.flush()
+        return StorageResult.ok(row[0], backend=self.backend_name)
+
+    async def add_batch(self, documents: List[Tuple]) -> StorageResult:
+        """
+        Add documents as (content, metadata) or (content, metadata, doc_id).
+
+        Written synchronously in `write_batch_size` upserts; the result data
+        is the list of doc IDs that were written.
+        """
+        rows = []
+        for doc in documents:
+            content, metadata = doc[0], doc[1] if len(doc) > 1 else None
+            doc_id = doc[2] if len(doc) > 2 and doc[2] else str(uuid.uuid4())
+            if content:
+                rows.append((doc_id, content, dict(metadata or {"title": "Untitled"})))
+        await self.flush()
+        written: List[str] = []
+        errors: List[str] = []
+        for start in range(0, len(rows), self._write_batch_size):
+            chunk = rows[start:start + self._write_batch_size]
+            for result in await self._run("add_batch", self._write_rows, chunk):
+                if result.success:
+                    written.append(result.data)
+                else:
+                    errors.append(result.error or "write failed")
+        if errors and not written:
+            return StorageResult.err(errors[0], backend=self.backend_name)
+        return StorageResult.ok(written, backend=self.backend_name)
+
+    async def search(self, query: str,
+                     limit: int = 5,
+                     filters: Optional[Dict[str, Any]] = None,
+                     min_relevance: float = 0.0,
+                     query_embedding: Optional[List[float]] = None) -> StorageResult:
+        result = await self.search_many(
+            [query], limit, filters, min_relevance,
+            query_embeddings=[query_embedding] if query_embedding is not None else None,
+        )
+        if not result.success:
+            return result
+        return StorageResult.ok(result.data[0], backend=self.backend_name)
+
+    async def search_many(self, queries: List[str],
+                          limit: int = 5,
+                          filters: Optional[Dict[str, Any]] = None,
+                          min_relevance: float = 0.0,
+                          query_embeddings: Optional[List[List[float]]] = None) -> StorageResult:
+        """Search several queries with one Chroma query; data is one list per query."""
+        if not queries:
+            return StorageResult.ok([], backend=self.backend_name)
+        try:
+            where, structured = self._split_filters(filters)
+            dated = has_date_filter(structured)
+            fetch = limit * DATE_FILTER_OVERFETCH if dated else limit
+            await self.flush()
+            raw = await self._run("search", self._query, list(queries), fetch, where, query_embeddings)
+        except Exception as e:
+            self._last_error = str(e)
+            return StorageResult.err(str(e), backend=self.backend_name)
+        with self._stats_lock:
+            self._counters["searches"] += len(queries)
+        rows = [self._results(raw, row, min_relevance) for row in range(len(queries))]
+        if dated:
+            rows = [filter_by_date(hits, structured, limit) for hits in rows]
+        return StorageResult.ok(rows, backend=self.backend_name)
+
+    async def get(self, doc_id: str) -> StorageResult:
+        try:
+            await self.flush()
+            raw = await self._run("get", lambda: self._collection.get(ids=[doc_id], include=["documents", "metadatas"]))
+        except Exception as e:
+            return StorageResult.err(str(e), backend=self.backend_name)
+        if not (raw or {}).get("ids"):
+            return StorageResult.err(f"Document not found: {doc_id}", backend=self.backend_name)
+        return StorageResult.ok(
+            {
+                "doc_id": raw["ids"][0],
+                "content": (raw.get("documents") or [""])[0],
+                "metadata": (raw.get("metadatas") or [{}])[0] or {},
+            },
+            backend=self.backend_name,
+        )
+
+    async def delete(self, doc_id: str) -> StorageResult:
+        with self._pending_lock:
+            self._pending = [row for row in self._pending if row[0] != doc_id]
+        try:
+            await self.flush()
+            await self._run("delete", self._delete_ids, [doc_id])
+        except Exception as e:
+            return StorageResult.err(str(e), backend=self.backend_name)
+        return StorageResult.ok(doc_id, backend=self.backend_name)
+
+    async def update(self, doc_id: str,
+                     content: Optional[str] = None,
+                     metadata: Optional[Dict[str, Any]] = None) -> StorageResult:
+        current = await self.get(doc_id)
+        if not current.success:
+            return current
+        merged = dict(current.data["metadata"])
+        merged.update(metadata or {})
+        new_content = content if content is not None else current.data["content"]
+        return (await self._run("update", self._write_rows, [(doc_id, new_content, merged)]))[0]
+
+    async def count(self) -> StorageResult:
+        try:
+            await self.flush()
+            count = await self._run("count", lambda: self._collection.count())
+        except Exception as e:
+            return StorageResult.err(str(e), backend=self.backend_name)
+        with self._stats_lock:
+            self._count = int(count)
+        return StorageResult.ok(int(count), backend=self.backend_name)
+
+    def stats_snapshot(self) -> Dict[str, Any]:
+        """Counters and latency percentiles without touching Chroma."""
+        with self._stats_lock:
+            latency = {}
+            for op, window in self._latency.items():
+                values = sorted(window)
+                latency[op] = {
+                    "count": len(values),
+                    "p50": round(_percentile(values, 50), 3),
+                    "p95": round(_percentile(values, 95), 3),
+                    "p99": round(_percentile(values, 99), 3),
+                    "max": round(values[-1], 3) if values else 0.0,
+                }
+            counters = dict(self._counters)
+            count = self._count
+            last_error = self._last_error
+        with self._pending_lock:
+            pending = len(self._pending)
+        return {
+            "backend": self.backend_name,
+            "collection_name": self._collection_name,
+            "total_documents": count,
+            "pending_writes": pending,
+            "workers": self._workers,
+            "write_behind": self._write_behind,
+            "write_batch_size": self._write_batch_size,
+            **counters,
+            "latency_ms": latency,
+            "last_error": last_error,
+        }
+
+    async def get_stats(self) -> StorageResult:
+        await self.count()
+        return StorageResult.ok(self.stats_snapshot(), backend=self.backend_name)
+
+    async def health_check(self) -> StorageResult:
+        if self._collection is None or self._executor is None:
+            return StorageResult.err("not initialized", backend=self.backend_name)
+        started = time.perf_counter()
+        try:
+            count = await asyncio.wait_for(self._run("health", lambda: self._collection.count()), timeout=5.0)
+        except Exception as e:
+            return StorageResult.err(f"unhealthy: {e or type(e).__name__}", backend=self.backend_name)
+        with self._pending_lock:
+            pending = len(self._pending)
+        return StorageResult.ok(
+            {
+                "healthy": True,
+                "documents": int(count),
+                "pending_writes": pending,
+                "latency_ms": round((time.perf_counter() - started) * 1000.0, 3),
+            },
+            backend=self.backend_name,
+        )
+
+    async def close(self) -> None:
+        if self._executor is None:
+            return
+        try:
+            await self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            _LIVE.discard(self)
+
+
+StorageBackendFactory.register_vector("chromadb", ChromaVectorBackend)
@@ -0,0 +1,584 @@
+"""
+Pure-NumPy local vector backend (registered as "numpy").
+
+For small/offline installs that can't carry Chroma. Everything lives in one
+directory:
+- `vectors.f32`: L2-normalized float32 rows, append-only, read through a
+  read-only memory map (no load step at startup).
+- `rows.jsonl`: sidecar with one line per row ({"id", "content", "metadata"})
+  and tombstone lines ({"delete": id}) for deletes and superseded rows.
+  Opening only scans it for ids and line offsets; content and metadata are
+  parsed when a row is returned (and all metadata on the first filtered
+  search).
+- `header.json`: row width and the embedder that produced the rows.
+
+Search is exact brute-force cosine over the live rows with
+`np.argpartition` top-k. Updates append a new row and tombstone the old one;
+`compact()` rewrites both files without dead rows and runs automatically once
+tombstones exceed `compact_ratio` of the file.
+
+Embeddings come from `brain.vector_scorer.VectorScorer`: sentence-transformers
+through the shared embedding service when installed, otherwise its hashed
+bag-of-words fallback (`use_sentence_transformers: false` forces the latter).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .base import RecallResult, StorageBackendFactory, StorageResult, VectorStorageBackend
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; initialize() reports the backend unavailable
+    np = None
+
+logger = logging.getLogger(__name__)
+
+_VECTORS = "vectors.f32"
+_ROWS = "rows.jsonl"
+_HEADER = "header.json"
+# Row lines are written by json.dumps, so the id is always the first key.
+_ID_PREFIX = '{"id": '
+_DECODER = json.JSONDecoder()
+
+
+def _scan_line(line: bytes) -> Tuple[Optional[str], bool]:
+    """(doc id, is_tombstone) of a sidecar line, parsing no more than the id.
+
+    Returns (None, False) for lines that can't be used (blank, torn).
+    """
+    if not line.endswith(b"\n"):
+        # Torn final line from a crash mid-append.
+        return None, False
+    text = line.decode("utf-8", "replace").strip()
+    if not text:
+        return None, False
+    if text.startswith(_ID_PREFIX):
+        try:
+            doc_id, _ = _DECODER.raw_decode(text, len(_ID_PREFIX))
+            return str(doc_id), False
+        except ValueError:
+            return None, False
+    try:
+        row = json.loads(text)
+    except ValueError:
+        return None, False
+    if "delete" in row:
+        return str(row["delete"]), True
+    if "id" in row:
+        return str(row["id"]), False
+    return None, False
+
+
+def _parse_row(line: bytes) -> Tuple[str, Dict[str, Any]]:
+    try:
+        row = json.loads(line)
+    except ValueError:
+        return "", {}
+    return str(row.get("content", "")), dict(row.get("metadata") or {})
+
+
+def _matches(metadata: Dict[str, Any], filters: Dict[str, Any], structured: bool) -> bool:
+    """Recall filters (brain.filters) or, when not structured, plain metadata equality."""
+    if not structured:
+        return all(metadata.get(k) == v for k, v in filters.items())
+    from ..brain.filters import in_date_range
+
+    if filters.get("tags"):
+        tags = metadata.get("tags") or []
+        if isinstance(tags, str):
+            tags = tags.split(",")
+        have = {str(t).strip().lower() for t in tags}
+        if not have & {str(t).lower() for t in filters["tags"]}:
+            return False
+    for key in ("type", "priority"):
+        if filters.get(key) and metadata.get(key) not in filters[key]:
+            return False
+    if filters.get("conversation_id") and metadata.get("conversation_id") != filters["conversation_id"]:
+        return False
+    if filters.get("date_from") or filters.get("date_to"):
+        if not in_date_range(str(metadata.get("created_at") or ""), filters.get("date_from"), filters.get("date_to")):
+            return False
+    return True
+
+
+class NumpyVectorBackend(VectorStorageBackend):
+    """Memory-mapped float32 vectors + JSONL sidecar, exact top-k search."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self._config: Dict[str, Any] = dict(config or {})
+        self._path = ""
+        self._scorer = None
+        self._embedder_id = ""
+        self._dim = 0
+        self._compact_ratio = 0.3
+        self._compact_min_rows = 1000
+
+        # Row-aligned state; `_alive[i]` is False for tombstoned rows and
+        # `_offsets[i]` is the byte offset of row i's line in the sidecar.
+        self._ids: List[str] = []
+        self._offsets = array("q")
+        # Every row's metadata, materialized by the first filtered search.
+        self._metadatas: Optional[List[Dict[str, Any]]] = None
+        self._alive = None
+        self._by_id: Dict[str, int] = {}
+        self._matrix = None  # memmap over the first `_mapped_rows` rows
+        self._mapped_rows = 0
+
+        self._lock = threading.RLock()
+        self._searches = 0
+        self._search_ms = 0.0
+        self._compactions = 0
+
+    @property
+    def backend_name(self) -> str:
+        return "numpy"
+
+    async def initialize(self, config: Optional[Dict[str, Any]] = None) -> bool:
+        cfg = dict(self._config)
+        cfg.update(config or {})
+        self._config = cfg
+        if np is None:
+            logger.warning("NumPy not installed. Run: pip install numpy")
+            return False
+
+        persist_path = cfg.get("path") or os.path.join(
+            cfg.get("persist_path") or "~/.openclaw/workspace/memory", "numpy_vectors"
+        )
+        self._path = os.path.expanduser(str(persist_path))
+        self._compact_ratio = float(cfg.get("compact_ratio", 0.3))
+        self._compact_min_rows = int(cfg.get("compact_min_rows", 1000))
+        try:
+            await self._run(self._open)
+        except Exception as e:
+            logger.error(f"NumPy backend init failed: {e}")
+            return False
+        return True
+
+    # Internals
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self._path, name)
+
+    def _open(self) -> None:
+        from ..brain.vector_scorer import VectorScorer
+
+        cfg = self._config
+        os.makedirs(self._path, exist_ok=True)
+        model = str(cfg.get("embedder_name") or "all-MiniLM-L6-v2")
+        self._scorer = VectorScorer(
+            dim=int(cfg.get("dim", 256)),
+            use_sentence_transformers=bool(cfg.get("use_sentence_transformers", True)),
+            model_name=model,
+        )
+        if self._scorer._st_model is not None:
+            self._embedder_id = f"st:{model}"
+        else:
+            self._embedder_id = f"hashed:{self._scorer.dim}"
+
+        header: Dict[str, Any] = {}
+        if os.path.exists(self._file(_HEADER)):
+            with open(self._file(_HEADER), "r", encoding="utf-8") as fh:
+                header = json.load(fh)
+        if header.get("embedder") and header["embedder"] != self._embedder_id:
+            raise RuntimeError(
+                f"index at {self._path} was built with {header['embedder']}, not {self._embedder_id}"
+            )
+        self._dim = int(header.get("dim", 0))
+        self._load_rows()
+
+    def _load_rows(self) -> None:
+        ids: List[str] = []
+        offsets = array("q")
+        dead: set = set()
+        by_id: Dict[str, int] = {}
+        torn_at = None
+        if os.path.exists(self._file(_ROWS)):
+            with open(self._file(_ROWS), "rb") as fh:
+                position = 0
+                for line in fh:
+                    start, position = position, position + len(line)
+                    if not line.endswith(b"\n"):
+                        torn_at = start
+                    doc_id, tombstone = _scan_line(line)
+                    if doc_id is None:
+                        continue
+                    if tombstone:
+                        row_idx = by_id.pop(doc_id, None)
+                        if row_idx is not None:
+                            dead.add(row_idx)
+                        continue
+                    if doc_id in by_id:
+                        dead.add(by_id[doc_id])
+                    by_id[doc_id] = len(ids)
+                    ids.append(doc_id)
+                    offsets.append(start)
+            if torn_at is not None:
+                # Cut the torn line so the next append starts on a fresh line.
+                with open(self._file(_ROWS), "r+b") as fh:
+                    fh.truncate(torn_at)
+
+        # Vectors are appended before their sidecar line: a crash between the
+        # two leaves extra vector rows, which are cut off here.
+        vec_rows = self._vector_rows()
+        if vec_rows > len(ids) and self._dim:
+            with open(self._file(_VECTORS), "r+b") as fh:
+                fh.truncate(len(ids) * self._dim * 4)
+        elif vec_rows < len(ids):
+            for doc_id in ids[vec_rows:]:
+                by_id.pop(doc_id, None)
+            del ids[vec_rows:], offsets[vec_rows:]
+            dead = {i for i in dead if i < vec_rows}
+
+        alive = np.ones(len(ids), dtype=bool)
+        if dead:
+            alive[sorted(dead)] = False
+        self._ids, self._offsets, self._metadatas = ids, offsets, None
+        self._alive, self._by_id = alive, by_id
+        self._matrix, self._mapped_rows = None, 0
+
+    def _vector_rows(self) -> int:
+        if not self._dim or not os.path.exists(self._file(_VECTORS)):
+            return 0
+        return os.path.getsize(self._file(_VECTORS)) // (self._dim * 4)
+
+    def _read_rows(self, rows: Iterable[int]) -> Dict[int, Tuple[str, Dict[str, Any]]]:
+        """(content, metadata) of the given rows, read from the sidecar by offset."""
+        out: Dict[int, Tuple[str, Dict[str, Any]]] = {}
+        with open(self._file(_ROWS), "rb") as fh:
+            for i in sorted(set(rows)):
+                fh.seek(self._offsets[i])
+                out[i] = _parse_row(fh.readline())
+        return out
+
+    def _all_metadata(self) -> List[Dict[str, Any]]:
+        """Metadata of every row, parsed in one sequential pass and then kept."""
+        if self._metadatas is None:
+            metadatas: List[Dict[str, Any]] = []
+            if self._ids:
+                rows = iter(self._offsets)
+                want = next(rows)
+                with open(self._file(_ROWS), "rb") as fh:
+                    position = 0
+                    for line in fh:
+                        start, position = position, position + len(line)
+                        if start != want:
+                            continue
+                        metadatas.append(_parse_row(line)[1])
+                        want = next(rows, -1)
+                        if want < 0:
+                            break
+            self._metadatas = metadatas
+        return self._metadatas
+
+    def _rows_matrix(self):
+        n = len(self._ids)
+        if n == 0:
+            return np.zeros((0, self._dim or 1), dtype=np.float32)
+        if self._matrix is None or self._mapped_rows != n:
+            self._matrix = np.memmap(self._file(_VECTORS), dtype=np.float32, mode="r", shape=(n, self._dim))
+            self._mapped_rows = n
+        return self._matrix
+
+    def _embed(self, texts: List[str]):
+        vecs = np.asarray(self._scorer.embed_many(texts), dtype=np.float32)
+        norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vecs / norms
+
+    def _append(self, rows: List[Tuple[str, str, Dict[str, Any]]]) -> List[str]:
+        vecs = self._embed([r[1] for r in rows])
+        with self._lock:
+            if not self._dim:
+                self._dim = int(vecs.shape[1])
+                with open(self._file(_HEADER), "w", encoding="utf-8") as fh:
+                    json.dump({"dim": self._dim, "embedder": self._embedder_id}, fh)
+            elif vecs.shape[1] != self._dim:
+                raise ValueError(f"embedding width {vecs.shape[1]} does not match index width {self._dim}")
+            with open(self._file(_VECTORS), "ab") as fh:
+                fh.write(vecs.tobytes())
+            offsets = []
+            with open(self._file(_ROWS), "ab") as fh:
+                for doc_id, content, metadata in rows:
+                    offsets.append(fh.tell())
+                    line = json.dumps({"id": doc_id, "content": content, "metadata": metadata}, ensure_ascii=False)
+                    fh.write(line.encode("utf-8") + b"\n")
+            superseded = []
+            start = len(self._ids)
+            for offset, (doc_id, _, metadata) in enumerate(rows):
+                if doc_id in self._by_id:
+                    superseded.append(self._by_id[doc_id])
+                self._by_id[doc_id] = start + offset
+                self._ids.append(doc_id)
+                if self._metadatas is not None:
+                    self._metadatas.append(metadata)
+            self._offsets.extend(offsets)
+            self._alive = np.concatenate([self._alive, np.ones(len(rows), dtype=bool)])
+            if superseded:
+                self._alive[superseded] = False
+            self._maybe_compact()
+        return [r[0] for r in rows]
+
+    def _tombstone(self, doc_id: str) -> bool:
+        with self._lock:
+            row = self._by_id.pop(doc_id, None)
+            if row is None:
+                return False
+            with open(self._file(_ROWS), "a", encoding="utf-8") as fh:
+                fh.write(json.dumps({"delete": doc_id}) + "\n")
+            self._alive[row] = False
+            self._maybe_compact()
+            return True
+
+    def _maybe_compact(self) -> None:
+        total = len(self._ids)
+        dead = total - int(self._alive.sum())
+        if total >= self._compact_min_rows and dead > self._compact_ratio * total:
+            self._compact()
+
+    def _compact(self) -> int:
+        """Rewrite vectors and sidecar with live rows only; returns rows dropped."""
+        with self._lock:
+            keep = np.flatnonzero(self._alive)
+            dropped = len(self._ids) - len(keep)
+            if dropped == 0:
+                return 0
+            matrix = self._rows_matrix()
+            tmp_vec, tmp_rows = self._file(_VECTORS + ".tmp"), self._file(_ROWS + ".tmp")
+            with open(tmp_vec, "wb") as fh:
+                for start in range(0, len(keep), 8192):
+                    fh.write(np.ascontiguousarray(matrix[keep[start:start + 8192]]).tobytes())
+            with open(self._file(_ROWS), "rb") as src, open(tmp_rows, "wb") as fh:
+                # Live lines are copied verbatim; nothing needs re-encoding.
+                for i in keep:
+                    src.seek(self._offsets[i])
+                    fh.write(src.readline())
+            # Drop the map before replacing the file it points at.
+            self._matrix, self._mapped_rows = None, 0
+            os.replace(tmp_vec, self._file(_VECTORS))
+            os.replace(tmp_rows, self._file(_ROWS))
+            self._load_rows()
+            self._compactions += 1
+            return dropped
+
+    def _search(
+        self,
+        queries: List[str],
+        limit: int,
+        filters: Optional[Dict[str, Any]],
+        min_relevance: float,
+        query_embeddings: Optional[List[List[float]]],
+    ) -> List[List[RecallResult]]:
+        started = time.perf_counter()
+        qmat = None
+        if query_embeddings is not None and self._dim:
+            qmat = np.asarray(query_embeddings, dtype=np.float32)
+            if qmat.ndim != 2 or qmat.shape[1] != self._dim:
+                qmat = None
+            else:
+                norms = np.linalg.norm(qmat, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                qmat = qmat / norms
+        if qmat is None:
+            qmat = self._embed(queries)
+
+        with self._lock:
+            n = len(self._ids)
+            if n == 0 or not self._dim:
+                return [[] for _ in queries]
+            mask = self._alive.copy()
+            if filters:
+                from ..brain.filters import FILTER_KEYS, normalize_filters
+
+                structured = set(filters) <= set(FILTER_KEYS)
+                flt = normalize_filters(filters) if structured else filters
+                mask &= np.fromiter(
+                    (_matches(m, flt, structured) for m in self._all_metadata()), dtype=bool, count=n
+                )
+            candidates = np.flatnonzero(mask)
+            out: List[List[RecallResult]] = []
+            if len(candidates) == 0:
+                return [[] for _ in queries]
+            matrix = self._rows_matrix()
+            rows = matrix if len(candidates) == n else matrix[candidates]
+            scores = qmat @ np.asarray(rows).T  # (queries, candidates)
+            k = min(max(1, int(limit)), len(candidates))
+            for q in range(len(queries)):
+                row_scores = scores[q]
+                if k < len(candidates):
+                    top = np.argpartition(-row_scores, k - 1)[:k]
+                else:
+                    top = np.arange(len(candidates))
+                top = [int(j) for j in top[np.argsort(-row_scores[top], kind="stable")]]
+                top = [j for j in top if max(0.0, float(row_scores[j])) >= min_relevance]
+                stored = self._read_rows(int(candidates[j]) for j in top)
+                results = []
+                for j in top:
+                    relevance = max(0.0, float(row_scores[j]))
+                    i = int(candidates[j])
+                    content, meta = stored[i]
+                    results.append(
+                        RecallResult(
+                            content=content,
+                            source=str(meta.get("title", self._ids[i])),
+                            relevance=relevance,
+                            metadata={"origin": "vector", **meta},
+                            doc_id=self._ids[i],
+                        )
+                    )
+                out.append(results)
+        self._searches += len(queries)
+        self._search_ms += (time.perf_counter() - started) * 1000.0
+        return out
+
+    # VectorStorageBackend API
+
+    async def add(self, content: str,
+                  metadata: Optional[Dict[str, Any]] = None,
+                  doc_id: Optional[str] = None) -> StorageResult:
+        if not content:
+            return StorageResult.err("empty content", backend=self.backend_name)
+        try:
+            ids = await self._run(self._append, [(doc_id or str(uuid.uuid4()), content, dict(metadata or {}))])
+        except Exception as e:
+            return StorageResult.err(str(e), backend=self.backend_name)
+        return StorageResult.ok(ids[0], backend=self.backend_name)
+
+    async def add_batch(self, documents: List[Tuple]) -> StorageResult:
+        """Add (content, metadata) or (content, metadata, doc_id) tuples in one append."""
+        rows = []
+        for doc in documents:
+            content, metadata = doc[0], doc[1] if len(doc) > 1 else None
+            doc_id = doc[2] if len(doc) > 2 and doc[2] else str(uuid.uuid4())
+            if content:
+                rows.append((doc_id, content, dict(metadata or {})))
+        if not rows:
+            return StorageResult.ok([], backend=self.backend_name)
+        try:
+            ids = await self._run(self._append, rows)
+        except Exception as e:
+            return StorageResult.err(str(e), backend=self.backend_name)
+        return StorageResult.ok(ids, backend=self.backend_name)
+
+    async def search(self, query: str,
+                     limit: int = 5,
+                     filters: Optional[Dict[str, Any]] = None,
+                     min_relevance: float = 0.0,
+                     query_embedding: Optional[List[float]] = None) -> StorageResult:
+        result = await self.search_many(
+            [query], limit, filters, min_relevance,
+            query_embeddings=[query_embedding] if query_embedding is not None else None,
+        )
+        if not result.success:
+            return result
+        return StorageResult.ok(result.data[0], backend=self.backend_name)
+
+    async def search_many(self, queries: List[str],
+                          limit: int = 5,
+                          filters: Optional[Dict[str, Any]] = None,
+                          min_relevance: float = 0.0,
+                          query_embeddings: Optional[List[List[float]]] = None) -> StorageResult:
+        """Score several queries in one matrix product; data is one list per query."""
+        if not queries:
+            return StorageResult.ok([], backend=self.backend_name)
+        try:
+            results = await self._run(self._search, list(queries), limit, filters, min_relevance, query_embeddings)
+        except Exception as e:
+            return StorageResult.err(str(e), backend=self.backend_name)
+        return StorageResult.ok(results, backend=self.backend_name)
+
+    async def get(self, doc_id: str) -> StorageResult:
+        with self._lock:
+            row = self._by_id.get(doc_id)
+            if row is None:
+                return StorageResult.err(f"Document not found: {doc_id}", backend=self.backend_name)
+            content, metadata = self._read_rows([row])[row]
+            return StorageResult.ok(
+                {"doc_id": doc_id, "content": content, "metadata": metadata},
+                backend=self.backend_name,
+            )
+
+    async def delete(self, doc_id: str) -> StorageResult:
+        try:
+            deleted = await self._run(self._tombstone, doc_id)
+        except Exception as e:
+            return StorageResult.err(str(e), backend=self.backend_name)
+        if not deleted:
+            return StorageResult.err(f"Document not found: {doc_id}", backend=self.backend_name)
+        return StorageResult.ok(doc_id, backend=self.backend_name)
+
+    async def update(self, doc_id: str,
+                     content: Optional[str] = None,
+                     metadata: Optional[Dict[str, Any]] = None) -> StorageResult:
+        current = await self.get(doc_id)
+        if not current.success:
+            return current
+        merged = dict(current.data["metadata"])
+        merged.update(metadata or {})
+        new_content = content if content is not None else current.data["content"]
+        return await self.add(new_content, merged, doc_id=doc_id)
+
+    async def compact(self) -> StorageResult:
+        """Drop tombstoned rows from disk now; data is the number of rows removed."""
+        try:
+            dropped = await self._run(self._compact)
+        except Exception as e:
+            return StorageResult.err(str(e), backend=self.backend_name)
+        return StorageResult.ok(dropped, backend=self.backend_name)
+
+    async def count(self) -> StorageResult:
+        with self._lock:
+            return StorageResult.ok(len(self._by_id), backend=self.backend_name)
+
+    def stats_snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = len(self._ids)
+            live = len(self._by_id)
+            searches = self._searches
+            return {
+                "backend": self.backend_name,
+                "collection_name": self._path,
+                "total_documents": live,
+                "rows": rows,
+                "tombstones": rows - live,
+                "dim": self._dim,
+                "embedder": self._embedder_id,
+                "vector_bytes": rows * self._dim * 4,
+                "compactions": self._compactions,
+                "searches": searches,
+                "avg_search_ms": round(self._search_ms / searches, 3) if searches else 0.0,
+            }
+
+    async def get_stats(self) -> StorageResult:
+        return StorageResult.ok(self.stats_snapshot(), backend=self.backend_name)
+
+    async def health_check(self) -> StorageResult:
+        if self._scorer is None:
+            return StorageResult.err("not initialized", backend=self.backend_name)
+        with self._lock:
+            expected = len(self._ids)
+            on_disk = self._vector_rows()
+        if on_disk != expected:
+            return StorageResult.err(
+                f"unhealthy: {on_disk} vector rows on disk, {expected} in sidecar", backend=self.backend_name
+            )
+        return StorageResult.ok({"healthy": True, "documents": len(self._by_id)}, backend=self.backend_name)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._matrix, self._mapped_rows = None, 0
+
+
+StorageBackendFactory.register_vector("numpy", NumpyVectorBackend)
@@ -1,3 +1,4 @@
+from datetime import datetime, timedelta, timezone
 import tempfile
 import unittest
 from pathlib import Path
@@ -8,8 +9,12 @@ SKILLS = ROOT.parent
 if str(SKILLS) not in sys.path:
     sys.path.insert(0, str(SKILLS))
 
-from deepsea_nexus.brain.api import configure_brain, brain_write, brain_retrieve, checkpoint, rollback, backfill_embeddings
+from deepsea_nexus.brain.api import configure_brain, brain_write, brain_write_many, brain_retrieve, brain_retrieve_many, checkpoint, rollback, backfill_embeddings, warm_up
 from deepsea_nexus.brain.vector_scorer import VectorScorer
+from deepsea_nexus.brain.keyword_index import KeywordIndex
+from deepsea_nexus.brain.models import BrainRecord
+from deepsea_nexus.brain.novelty import NoveltyIndex
+from deepsea_nexus.brain.scoring import KeywordScorer
 
 
 class TestBrainIntegration(unittest.TestCase):
@@ -137,6 +142,20 @@ class TestBrainIntegration(unittest.TestCase):
             out = brain_retrieve("common term", mode="facts", limit=3, min_score=0.0)
             self.assertEqual([r["priority"] for r in out], ["P0", "P1", "P2"])
 
+    def test_retrieve_top_k_skips_duplicates_and_orders_by_score(self):
+        with tempfile.TemporaryDirectory() as td:
+            configure_brain(enabled=True, base_path=td, track_usage=False)
+            for idx in range(5):
+                brain_write({"id": f"dup{idx}", "kind": "fact", "priority": "P1", "source": "itest", "content": "shared topk note"})
+            brain_write({"id": "best", "kind": "fact", "priority": "P0", "source": "itest", "content": "shared topk note"})
+            brain_write({"id": "weak", "kind": "fact", "priority": "P2", "source": "itest", "content": "shared topk"})
+            brain_write({"id": "miss", "kind": "fact", "priority": "P1", "source": "itest", "content": "unrelated"})
+
+            out = brain_retrieve("shared topk note extra words", mode="facts", limit=2, min_score=0.5)
+            self.assertEqual([r["id"] for r in out], ["best", "dup4"])
+            self.assertGreater(out[0]["score"], out[1]["score"])
+            self.assertEqual(brain_retrieve("shared topk note", limit=0, min_score=0.0), [])
+
     def test_backfill_embeddings_appends_updates(self):
         class _FakeEmb:
             def __init__(self, vec):
@@ -176,6 +195,138 @@ class TestBrainIntegration(unittest.TestCase):
             out = brain_retrieve("backfill", mode="facts", limit=3, min_score=0.0)
             self.assertTrue(any("embedding" in (r.get("metadata") or {}) for r in out))
 
+    def test_backfill_embeddings_batches_and_resumes(self):
+        class _FakeEmb:
+            def __init__(self, vec):
+                self._vec = vec
+
+            def tolist(self):
+                return list(self._vec)
+
+        class _FakeModel:
+            def __init__(self):
+                self.calls = []
+
+            def encode(self, texts, normalize_embeddings=True):
+                self.calls.append(len(texts))
+                return [_FakeEmb([0.2, 0.1, 0.0]) for _ in texts]
+
+        with tempfile.TemporaryDirectory() as td:
+            configure_brain(enabled=True, base_path=td, scorer_type="hashed-vector")
+            for idx in range(5):
+                brain_write({"id": f"bf{idx}", "kind": "fact", "priority": "P1", "source": "itest", "content": f"note {idx}"})
+
+            model = _FakeModel()
+            scorer = VectorScorer(dim=3, use_sentence_transformers=False)
+            scorer._st_model = model
+            scorer.use_sentence_transformers = True
+            configure_brain(enabled=True, base_path=td, scorer=scorer)
+
+            seen = []
+            stats = backfill_embeddings(limit=3, batch_size=2, progress=seen.append)
+            self.assertEqual(stats, {"scanned": 3, "updated": 3, "skipped": 0})
+            self.assertEqual(model.calls, [2, 1])
+            self.assertEqual([p["position"] for p in seen], [2, 3])
+            self.assertEqual(seen[-1]["total"], 5)
+            self.assertTrue((Path(td) / "brain" / "backfill_cursor.json").exists())
+
+            # Resumes after the cursor; the three appended updates are skipped.
+            stats = backfill_embeddings(batch_size=2)
+            self.assertEqual(stats, {"scanned": 5, "updated": 2, "skipped": 3})
+            self.assertFalse((Path(td) / "brain" / "backfill_cursor.json").exists())
+
+            stats = backfill_embeddings(batch_size=2)
+            self.assertEqual(stats["updated"], 0)
+
+    def test_write_many_appends_once_and_applies_novelty_gate(self):
+        with tempfile.TemporaryDirectory() as td:
+            configure_brain(enabled=True, base_path=td, novelty_enabled=True, novelty_min_similarity=0.85)
+            out = brain_write_many(
+                [
+                    {"id": "m1", "kind": "fact", "source": "itest", "content": "batched note one"},
+                    {"id": "m2", "kind": "fact", "source": "itest", "content": "batched note one"},
+                    {"id": "m3", "kind": "fact", "source": "itest", "content": "something else entirely"},
+                ]
+            )
+            self.assertEqual([r.id if r else None for r in out], ["m1", None, "m3"])
+            records_path = Path(td) / "brain" / "records.jsonl"
+            with records_path.open("r", encoding="utf-8") as f:
+                self.assertEqual(len([line for line in f if line.strip()]), 2)
+
+    def test_retrieve_many_matches_single_queries(self):
+        with tempfile.TemporaryDirectory() as td:
+            configure_brain(enabled=True, base_path=td, scorer_type="hashed-vector", track_usage=False)
+            brain_write_many(
+                [
+                    {"id": "q1", "kind": "fact", "source": "itest", "content": "python list comprehension"},
+                    {"id": "q2", "kind": "fact", "source": "itest", "content": "rust borrow checker"},
+                    {"id": "q3", "kind": "strategy", "source": "itest", "content": "release plan for python tooling"},
+                ]
+            )
+            queries = ["python", "borrow checker", "", "python"]
+            batched = brain_retrieve_many(queries, limit=2, min_score=0.0)
+            self.assertEqual(len(batched), len(queries))
+            for query, got in zip(queries, batched):
+                self.assertEqual(got, brain_retrieve(query, limit=2, min_score=0.0))
+
+    def test_warm_up_loads_index_and_scorer_matrix(self):
+        with tempfile.TemporaryDirectory() as td:
+            configure_brain(enabled=True, base_path=td, scorer_type="hashed-vector", track_usage=False)
+            brain_write_many(
+                [
+                    {"id": "w1", "kind": "fact", "source": "itest", "content": "warm index"},
+                    {"id": "w2", "kind": "fact", "source": "itest", "content": "cold start"},
+                ]
+            )
+            self.assertEqual(warm_up(), 2)
+            from deepsea_nexus.brain import api
+
+            matrix = api._SCORER._matrix
+            if matrix is not None:
+                self.assertEqual(len(matrix), 2)
+            self.assertEqual(len(brain_retrieve("warm index", limit=1, min_score=0.0)), 1)
+
+        configure_brain(enabled=False, base_path=".")
+        self.assertEqual(warm_up(), 0)
+
+    def test_retrieve_filters_apply_before_scoring(self):
+        class _CountingScorer(KeywordScorer):
+            def __init__(self):
+                super().__init__()
+                self.scored = []
+
+            def score(self, *, query, record, mode):
+                self.scored.append(record.id)
+                return super().score(query=query, record=record, mode=mode)
+
+        with tempfile.TemporaryDirectory() as td:
+            scorer = _CountingScorer()
+            configure_brain(enabled=True, base_path=td, scorer=scorer, track_usage=False)
+            brain_write_many(
+                [
+                    {"id": "f1", "kind": "fact", "source": "itest", "tags": ["Python"], "content": "python decorators",
+                     "created_at": "2026-02-01T10:00:00+00:00", "metadata": {"conversation_id": "c1"}},
+                    {"id": "f2", "kind": "fact", "source": "itest", "tags": ["rust"], "content": "python bindings for rust",
+                     "created_at": "2026-02-03T10:00:00+00:00"},
+                    {"id": "f3", "kind": "strategy", "source": "itest", "tags": ["python"], "content": "python migration plan",
+                     "created_at": "2026-02-05T23:00:00+00:00", "priority": "P0"},
+                ]
+            )
+            got = brain_retrieve("python", limit=5, min_score=0.0, filters={"tags": "python"})
+            self.assertEqual({r["id"] for r in got}, {"f1", "f3"})
+            self.assertNotIn("f2", scorer.scored)
+
+            got = brain_retrieve("python", limit=5, min_score=0.0, filters={"date_from": "2026-02-02", "date_to": "2026-02-05"})
+            self.assertEqual({r["id"] for r in got}, {"f2", "f3"})
+            got = brain_retrieve("python", limit=5, min_score=0.0, filters={"conversation_id": "c1"})
+            self.assertEqual([r["id"] for r in got], ["f1"])
+            got = brain_retrieve("python", limit=5, min_score=0.0, filters={"type": "strategy", "priority": ["P0", "P1"]})
+            self.assertEqual([r["id"] for r in got], ["f3"])
+
+            configure_brain(enabled=True, base_path=td, scorer_type="hashed-vector", track_usage=False)
+            got = brain_retrieve("python", limit=5, min_score=0.0, filters={"tags": ["rust"]})
+            self.assertEqual([r["id"] for r in got], ["f2"])
+
     def test_novelty_gate_skips_duplicate_writes(self):
         with tempfile.TemporaryDirectory() as td:
             configure_brain(
@@ -225,6 +376,113 @@ class TestBrainIntegration(unittest.TestCase):
                 lines = [line for line in f if line.strip()]
             self.assertEqual(len(lines), 2)
 
+    def test_novelty_gate_only_scores_lsh_candidates(self):
+        class _CountingScorer(KeywordScorer):
+            calls = 0
+
+            def score(self, *, query, record, mode):
+                type(self).calls += 1
+                return super().score(query=query, record=record, mode=mode)
+
+        with tempfile.TemporaryDirectory() as td:
+            configure_brain(
+                enabled=True,
+                base_path=td,
+                scorer=_CountingScorer(),
+                novelty_enabled=True,
+                novelty_min_similarity=0.85,
+                novelty_window_seconds=3600,
+            )
+            for idx in range(50):
+                self.assertIsNotNone(
+                    brain_write({"id": f"u{idx}", "kind": "fact", "source": "itest", "content": f"unique{idx} token{idx} body{idx}"})
+                )
+            self.assertLess(_CountingScorer.calls, 50)
+
+            brain_write({"id": "near1", "kind": "fact", "source": "itest", "content": "向量检索 使用 缓存 提升 召回 速度"})
+            near = brain_write({"id": "near2", "kind": "fact", "source": "itest", "content": "向量检索 使用 缓存 提升 召回 速度 明显"})
+            self.assertIsNone(near)
+
+    def test_novelty_index_expires_old_partitions(self):
+        index = NoveltyIndex(window_seconds=60, partitions=4)
+        old = BrainRecord(id="o", kind="fact", content="stale memory text")
+        now = datetime.now(timezone.utc)
+        index.add(old, index.signature("stale memory text"), ts=now - timedelta(seconds=300))
+        self.assertFalse(index.has_hash(old.hash, now))
+        self.assertEqual(index.candidates(index.signature("stale memory text"), now), [])
+        index.expire(now)
+        self.assertEqual(len(index), 0)
+
+    def test_novelty_index_is_safe_across_threads(self):
+        import threading
+
+        index = NoveltyIndex(window_seconds=4000, partitions=4000)
+        now = datetime.now(timezone.utc)
+        sig = index.signature("shared novelty text")
+        errors = []
+        stop = threading.Event()
+
+        def writer():
+            for i in range(3000):
+                rec = BrainRecord(id=str(i), kind="fact", content=f"note {i}")
+                index.add(rec, sig, ts=now - timedelta(seconds=i % 5000))
+                if i % 50 == 0:
+                    index.expire(now)
+            stop.set()
+
+        def reader():
+            try:
+                while not stop.is_set():
+                    index.has_hash("missing", now)
+                    index.candidates(sig, now)
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+
+
+    def test_keyword_index_matches_substrings_and_cjk_bigrams(self):
+        index = KeywordIndex()
+        index.extend(
+            [
+                BrainRecord(id="0", kind="fact", content="向量检索 uses vectors"),
+                BrainRecord(id="1", kind="fact", content="检索结果 cached"),
+                BrainRecord(id="2", kind="plan", content="unrelated note", tags=["量化"]),
+            ]
+        )
+        self.assertEqual(index.candidates("vec"), [0])
+        self.assertEqual(index.candidates("向量检索"), [0])
+        self.assertEqual(index.candidates("检索"), [0, 1])
+        self.assertEqual(index.candidates("量"), [0, 2])
+        self.assertEqual(index.candidates("plan 缓存"), [2])
+        self.assertEqual(index.candidates("missing"), [])
+
+    def test_keyword_retrieve_scores_only_index_candidates(self):
+        class _CountingScorer(KeywordScorer):
+            calls = 0
+
+            def score(self, *, query, record, mode):
+                type(self).calls += 1
+                return super().score(query=query, record=record, mode=mode)
+
+        with tempfile.TemporaryDirectory() as td:
+            configure_brain(enabled=True, base_path=td, scorer=_CountingScorer(), track_usage=False)
+            for idx in range(40):
+                brain_write({"id": f"n{idx}", "kind": "fact", "source": "itest", "content": f"filler{idx} text"})
+            brain_write({"id": "hit", "kind": "fact", "source": "itest", "content": "长期记忆 压缩 策略"})
+            checkpoint()
+            brain_write({"id": "hit2", "kind": "fact", "source": "itest", "content": "记忆 索引 增量"})
+
+            _CountingScorer.calls = 0
+            out = brain_retrieve("记忆", mode="facts", limit=5, min_score=0.5)
+            self.assertEqual(sorted(r["id"] for r in out), ["hit", "hit2"])
+            self.assertEqual(_CountingScorer.calls, 2)
+
 
 if __name__ == "__main__":
     unittest.main()
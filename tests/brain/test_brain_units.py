@@ -1,3 +1,5 @@
+import json
+import os
 import tempfile
 import unittest
 from pathlib import Path
@@ -42,6 +44,46 @@ class TestBrainUnits(unittest.TestCase):
             self.assertEqual(len(records), 2)
             self.assertEqual(records[0].content, "alpha")
 
+    def test_read_all_tails_appends_after_first_load(self):
+        with tempfile.TemporaryDirectory() as td:
+            store = JSONLBrainStore(base_path=td)
+            store.write(BrainRecord(id="1", kind="fact", priority="P1", source="t", content="alpha"))
+            self.assertEqual([r.id for r in store.read_all()], ["1"])
+            offset = store._index_offset
+
+            store.write(BrainRecord(id="2", kind="fact", priority="P1", source="t", content="beta"))
+            # Simulate another process appending, including a partial trailing line.
+            with store.records_path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(BrainRecord(id="3", kind="fact", content="gamma").to_dict()) + "\n")
+                f.write('{"id": "4", "kind"')
+
+            self.assertEqual([r.id for r in store.read_all()], ["1", "2", "3"])
+            self.assertGreater(store._index_offset, offset)
+
+            with store.records_path.open("a", encoding="utf-8") as f:
+                f.write(': "fact", "content": "delta"}\n')
+            self.assertEqual([r.id for r in store.read_all()], ["1", "2", "3", "4"])
+
+    def test_resident_index_reloads_after_checkpoint_and_rollback(self):
+        with tempfile.TemporaryDirectory() as td:
+            store = JSONLBrainStore(base_path=td)
+            store.write(BrainRecord(id="1", kind="fact", priority="P1", source="t", content="base"))
+            version = store.checkpoint()["version"]
+            self.assertEqual(len(store.read_all()), 1)
+
+            store.write(BrainRecord(id="2", kind="fact", priority="P1", source="t", content="extra"))
+            self.assertEqual(len(store.read_all()), 2)
+
+            self.assertTrue(store.rollback(version))
+            self.assertEqual([r.id for r in store.read_all()], ["1"])
+
+            # A second store over the same directory sees the first one's checkpoint.
+            other = JSONLBrainStore(base_path=td)
+            store.write(BrainRecord(id="3", kind="fact", priority="P1", source="t", content="more"))
+            self.assertEqual(len(other.read_all()), 2)
+            store.checkpoint()
+            self.assertEqual(sorted(r.id for r in other.read_all()), ["1", "3"])
+
     def test_checkpoint_compaction(self):
         with tempfile.TemporaryDirectory() as td:
             store = JSONLBrainStore(base_path=td)
@@ -54,6 +96,131 @@ class TestBrainUnits(unittest.TestCase):
             self.assertEqual(stats["snapshot_count"], 2)
             self.assertEqual(stats["compacted_from"], 3)
 
+    def test_external_compaction_matches_in_memory(self):
+        def _fill(store):
+            for idx in range(40):
+                rec = BrainRecord(id=str(idx), kind="fact", priority="P2", source="t", content=f"c{idx % 13}")
+                rec.updated_at = f"2026-01-{(idx % 5) + 1:02d}T00:00:00+00:00"
+                store.write(rec)
+            store.log_usage(["3", "3", "3", "7"])
+
+        with tempfile.TemporaryDirectory() as mem_td, tempfile.TemporaryDirectory() as ext_td:
+            mem = JSONLBrainStore(base_path=mem_td, decay_on_checkpoint_days=0)
+            ext = JSONLBrainStore(base_path=ext_td, decay_on_checkpoint_days=0, compaction="external", compaction_run_size=7)
+            _fill(mem)
+            _fill(ext)
+            mem_stats = mem.checkpoint()
+            ext_stats = ext.checkpoint()
+
+            self.assertEqual(ext_stats["snapshot_count"], mem_stats["snapshot_count"])
+            self.assertEqual(ext_stats["compacted_from"], 40)
+
+            def _by_hash(store):
+                return {r.hash: (r.id, r.priority, r.metadata.get("usage_count")) for r in store.read_all()}
+
+            self.assertEqual(_by_hash(ext), _by_hash(mem))
+            versioned = ext.snapshots_dir / f"{ext_stats['version']}.jsonl"
+            self.assertEqual(versioned.stat().st_ino, ext.snapshot_path.stat().st_ino)
+            self.assertEqual(ext.records_path.stat().st_size, 0)
+            self.assertEqual(list(ext.brain_dir.glob("*.compacting.jsonl")), [])
+
+            # Rollback must not rewrite the hard-linked snapshot in place.
+            older = ext.snapshots_dir / "20200101T000000Z.jsonl"
+            older.write_text(json.dumps(BrainRecord(id="old", kind="fact", content="old").to_dict()) + "\n", encoding="utf-8")
+            self.assertTrue(ext.rollback("20200101T000000Z"))
+            self.assertEqual([r.id for r in ext.read_all()], ["old"])
+            self.assertEqual(len(list(ext._iter_jsonl(versioned))), ext_stats["snapshot_count"])
+
+    def test_background_checkpoint_keeps_concurrent_writes(self):
+        with tempfile.TemporaryDirectory() as td:
+            store = JSONLBrainStore(base_path=td, compaction="external", compaction_run_size=3)
+            for idx in range(10):
+                store.write(BrainRecord(id=str(idx), kind="fact", source="t", content=f"before {idx}"))
+
+            done = []
+            thread = store.checkpoint_in_background(on_done=done.append)
+            for idx in range(5):
+                store.write(BrainRecord(id=f"w{idx}", kind="fact", source="t", content=f"during {idx}"))
+            thread.join(timeout=10)
+
+            self.assertEqual(len(done), 1)
+            self.assertEqual(len(store.read_all()), 15)
+            store.checkpoint()
+            self.assertEqual(len(store.read_all()), 15)
+
+    def test_compaction_recovers_leftover_segments(self):
+        with tempfile.TemporaryDirectory() as td:
+            store = JSONLBrainStore(base_path=td, compaction="external")
+            leftover = store.brain_dir / "records.1.compacting.jsonl"
+            leftover.write_text(json.dumps(BrainRecord(id="lost", kind="fact", content="crashed run").to_dict()) + "\n", encoding="utf-8")
+            store.write(BrainRecord(id="live", kind="fact", content="live write"))
+            self.assertEqual(sorted(r.id for r in store.read_all()), ["live", "lost"])
+
+            stats = store.checkpoint()
+            self.assertEqual(stats["compacted_from"], 2)
+            self.assertFalse(leftover.exists())
+            self.assertEqual(sorted(r.id for r in store.read_all()), ["live", "lost"])
+
+    def test_columnar_snapshot_round_trip_and_rollback(self):
+        with tempfile.TemporaryDirectory() as td:
+            store = JSONLBrainStore(base_path=td, snapshot_format="columnar")
+            store.write(
+                BrainRecord(
+                    id="e1",
+                    kind="fact",
+                    priority="P0",
+                    source="t",
+                    tags=["向量", "mmap"],
+                    content="列式快照 with embedding",
+                    ttl_seconds=60,
+                    metadata={"embedding": [0.5, -0.25, 1.0], "note": "x"},
+                )
+            )
+            store.write(BrainRecord(id="p1", kind="strategy", priority="P2", source="t", content="plain", decay=0.4))
+            version = store.checkpoint()["version"]
+            self.assertTrue(store.columnar_path.exists())
+
+            expected = {r.id: r.to_dict() for r in store.read_all()}
+            cold = JSONLBrainStore(base_path=td, snapshot_format="columnar")
+            loaded = cold._load_snapshot()
+            self.assertEqual({r.id: r.to_dict() for r in loaded}, expected)
+
+            # A stale sidecar is ignored in favour of snapshot.jsonl.
+            store.write(BrainRecord(id="p2", kind="fact", source="t", content="later"))
+            edited = store.snapshot_path.with_suffix(".edit")
+            edited.write_text(
+                store.snapshot_path.read_text(encoding="utf-8")
+                + json.dumps(BrainRecord(id="x", kind="fact", content="jsonl only").to_dict())
+                + "\n",
+                encoding="utf-8",
+            )
+            os.replace(edited, store.snapshot_path)
+            self.assertIn("x", [r.id for r in JSONLBrainStore(base_path=td, snapshot_format="columnar").read_all()])
+
+            self.assertTrue(store.rollback(version))
+            self.assertIn(version, store.list_versions())
+            self.assertEqual(sorted(r.id for r in store.read_all()), ["e1", "p1"])
+            self.assertEqual(sorted(r.id for r in JSONLBrainStore(base_path=td, snapshot_format="columnar")._load_snapshot()), ["e1", "p1"])
+
+    def test_corrupt_columnar_snapshot_falls_back_to_jsonl(self):
+        with tempfile.TemporaryDirectory() as td:
+            store = JSONLBrainStore(base_path=td, snapshot_format="columnar")
+            for i in range(20):
+                store.write(
+                    BrainRecord(
+                        id=f"r{i}", kind="fact", source="t", content=f"record {i}", metadata={"embedding": [0.1 * i, 1.0]}
+                    )
+                )
+            store.checkpoint()
+            data = store.columnar_path.read_bytes()
+
+            for corrupt in (data[: len(data) // 2], data[: len(data) - 7], data[:20]):
+                store.columnar_path.write_bytes(corrupt)
+                cold = JSONLBrainStore(base_path=td, snapshot_format="columnar")
+                self.assertEqual(sorted(r.id for r in cold.read_all()), sorted(f"r{i}" for i in range(20)))
+                # The sidecar is rebuilt from snapshot.jsonl for the next cold start.
+                self.assertEqual(store.columnar_path.read_bytes(), data)
+
     def test_list_versions_from_snapshots_and_changelog(self):
         with tempfile.TemporaryDirectory() as td:
             store = JSONLBrainStore(base_path=td)
@@ -135,6 +302,58 @@ class TestBrainUnits(unittest.TestCase):
             self.assertEqual(out.priority, "P1")
             self.assertGreaterEqual(int(out.metadata.get("usage_count", 0)), 4)
 
+    def test_checkpoint_does_not_mutate_records_held_by_readers(self):
+        from unittest import mock
+
+        with tempfile.TemporaryDirectory() as td:
+            store = JSONLBrainStore(base_path=td, decay_on_checkpoint_days=1)
+            store.write(BrainRecord(id="u1", kind="fact", priority="P2", source="t", content="frequent"))
+            store.write(
+                BrainRecord(
+                    id="old", kind="fact", source="t", content="stale", decay=1.0,
+                    updated_at="2020-01-01T00:00:00+00:00",
+                )
+            )
+            held = {r.id: r for r in store.read_all()}
+            before = {rid: r.to_dict() for rid, r in held.items()}
+
+            store.log_usage(["u1"] * 12)
+            with mock.patch.object(store, "_publish_snapshot", side_effect=OSError("disk full")):
+                with self.assertRaises(OSError):
+                    store.checkpoint()
+            self.assertEqual({rid: r.to_dict() for rid, r in held.items()}, before)
+            self.assertEqual({r.id: r.to_dict() for r in store.read_all()}, before)
+
+            store.log_usage(["u1"] * 12)
+            store.checkpoint()
+            self.assertEqual({rid: r.to_dict() for rid, r in held.items()}, before)
+            after = {r.id: r for r in store.read_all()}
+            self.assertEqual(after["u1"].priority, "P0")
+            self.assertLess(after["old"].decay, 1.0)
+
+    def test_usage_log_is_aggregated_and_buffered(self):
+        with tempfile.TemporaryDirectory() as td:
+            store = JSONLBrainStore(base_path=td, usage_flush_max_ids=1000, usage_flush_interval_seconds=60)
+            store.write(BrainRecord(id="u1", kind="fact", priority="P2", source="t", content="one"))
+            store.write(BrainRecord(id="u2", kind="fact", priority="P2", source="t", content="two"))
+
+            store.log_usage(["u1", "u2"])
+            store.log_usage(["u1"])
+            # Nothing touches the file on the recall path.
+            self.assertFalse(store.usage_path.exists())
+
+            self.assertEqual(store.flush_usage(), 2)
+            lines = {item["id"]: item["count"] for item in store._iter_jsonl(store.usage_path)}
+            self.assertEqual(lines, {"u1": 2, "u2": 1})
+
+            # Flushed and still-pending deltas both reach the checkpoint.
+            store.log_usage(["u1", "u1"])
+            store.checkpoint()
+            counts = {r.id: r.metadata.get("usage_count") for r in store.read_all()}
+            self.assertEqual(counts, {"u1": 4, "u2": 1})
+            self.assertEqual(store.flush_usage(), 0)
+            self.assertEqual(list(store._iter_jsonl(store.usage_path)), [])
+
     def test_decay_on_checkpoint(self):
         with tempfile.TemporaryDirectory() as td:
             store = JSONLBrainStore(
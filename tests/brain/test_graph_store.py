@@ -0,0 +1,311 @@
+import gc
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from deepsea_nexus.brain import graph_api
+from deepsea_nexus.brain.graph_cache import AdjacencyCache
+from deepsea_nexus.brain.graph_store import GraphStore
+
+
+class TestGraphStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = GraphStore(os.path.join(self.tmp.name, "brain", "graph.sqlite3"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_connection_reused_per_thread(self):
+        self.assertIs(self.store._connect(), self.store._connect())
+
+        other = []
+        t = threading.Thread(target=lambda: other.append(self.store._connect()))
+        t.start()
+        t.join()
+        self.assertIsNot(other[0], self.store._connect())
+        self.assertNotIn(self.store._writer_conn, other + [self.store._connect()])
+
+    def test_exited_threads_release_their_connection(self):
+        self.store._connect()
+        other = []
+        threads = [threading.Thread(target=lambda: other.append(self.store._connect())) for _ in range(5)]
+        for t in threads:
+            t.start()
+            t.join()
+        gc.collect()
+        self.assertEqual(len(self.store._readers), 1)
+        for conn in other:
+            with self.assertRaises(sqlite3.ProgrammingError):
+                conn.execute("SELECT 1")
+        self.store.add_edge("a", "uses", "b")
+        self.assertEqual(len(self.store.related("a")), 1)
+
+    def test_add_edges_batch_writes_entities_edges_and_evidence(self):
+        ids = self.store.add_edges_batch(
+            [
+                {
+                    "subj": "conversation:c1",
+                    "rel": "uses",
+                    "obj": "sqlite",
+                    "evidence_text": "we use sqlite",
+                    "entity_types": {"subj": "conversation", "obj": "concept"},
+                },
+                {"subj": "conversation:c1", "rel": "goal", "obj": ""},
+                {"subj": "conversation:c1", "rel": "depends_on", "obj": "wal", "weight": 0.5},
+            ]
+        )
+        self.assertIsNotNone(ids[0])
+        self.assertIsNone(ids[1])
+        self.assertIsNotNone(ids[2])
+
+        related = self.store.related("conversation:c1")
+        self.assertEqual({e["obj"] for e in related}, {"sqlite", "wal"})
+        self.assertEqual(self.store.evidence_for_edge(ids[0])[0]["text"], "we use sqlite")
+        self.assertEqual(self.store.evidence_for_edge(ids[2]), [])
+
+        entities = self.store._connect().execute("SELECT name, type FROM entities ORDER BY name").fetchall()
+        self.assertEqual(entities, [("conversation:c1", "conversation"), ("sqlite", "concept"), ("wal", "unknown")])
+
+    def test_add_edge_still_returns_id(self):
+        edge_id = self.store.add_edge("a", "rel", "b", evidence_text="a rel b")
+        self.assertEqual(self.store.query_edges(subj="a")[0]["id"], edge_id)
+        self.assertIsNone(self.store.add_edge("a", "", "b"))
+
+    def test_traverse_bounded_multi_hop(self):
+        ids = self.store.add_edges_batch(
+            [
+                {"subj": "a", "rel": "uses", "obj": "b", "weight": 1.0, "evidence_text": "a uses b"},
+                {"subj": "a", "rel": "uses", "obj": "c", "weight": 0.2},
+                {"subj": "b", "rel": "depends_on", "obj": "d", "weight": 0.9, "evidence_text": "b needs d"},
+                {"subj": "d", "rel": "depends_on", "obj": "e", "weight": 0.9},
+                {"subj": "x", "rel": "uses", "obj": "y", "weight": 0.5},
+            ]
+        )
+        self.store.add_edge("a", "uses", "b", evidence_text="newer evidence")
+
+        one_hop = self.store.traverse(["a"], hops=1, min_weight=0.5)
+        self.assertEqual({(e["subj"], e["obj"]) for e in one_hop}, {("a", "b")})
+
+        two_hop = self.store.traverse(["a", "x"], hops=2, fanout=1, min_weight=0.5, evidence_limit=1)
+        self.assertEqual(
+            [(e["subj"], e["obj"], e["depth"], e["seed"]) for e in two_hop],
+            [("a", "b", 1, "a"), ("x", "y", 1, "x"), ("b", "d", 2, "a")],
+        )
+        self.assertEqual(two_hop[0]["evidence"][0]["text"], "newer evidence")
+        self.assertEqual(two_hop[2]["evidence"][0]["text"], "b needs d")
+        three_hop = self.store.traverse(["a"], hops=3, limit=2, min_weight=0.5)
+        self.assertEqual([(e["obj"], e["depth"]) for e in three_hop], [("b", 1), ("d", 2)])
+        self.assertEqual(self.store.traverse(["a"], hops=3, min_weight=0.5)[-1]["obj"], "e")
+
+        evidence = self.store.evidence_for_edges([ids[0], ids[2], ids[4]], limit=5)
+        self.assertEqual([ev["text"] for ev in evidence[ids[0]]], ["newer evidence", "a uses b"])
+        self.assertEqual(evidence[ids[4]], [])
+
+    def test_repeated_edge_accumulates_weight_and_bounds_evidence(self):
+        store = GraphStore(os.path.join(self.tmp.name, "bounded.sqlite3"), max_evidence=2)
+        try:
+            ids = [store.add_edge("a", "uses", "b", weight=0.5, evidence_text=f"turn {i}", round_num=i) for i in range(4)]
+            store.add_edge("a", "uses", "b", weight=0.5, evidence_text="turn 3")
+
+            self.assertEqual(len(set(ids)), 1)
+            edges = store.query_edges(subj="a")
+            self.assertEqual(len(edges), 1)
+            self.assertEqual(edges[0]["weight"], 2.5)
+            self.assertEqual(edges[0]["hits"], 5)
+            self.assertEqual(edges[0]["round_num"], 0)
+            self.assertEqual([ev["text"] for ev in store.evidence_for_edge(ids[0], limit=10)], ["turn 3", "turn 2"])
+        finally:
+            store.close()
+
+    def test_compact_edges_migrates_legacy_duplicates(self):
+        import sqlite3
+
+        path = os.path.join(self.tmp.name, "legacy.sqlite3")
+        conn = sqlite3.connect(path)
+        conn.executescript(
+            """
+            CREATE TABLE edges (id INTEGER PRIMARY KEY AUTOINCREMENT, subj TEXT, rel TEXT, obj TEXT, weight REAL,
+                                source TEXT, conversation_id TEXT, round_num INTEGER, created_at TEXT);
+            CREATE TABLE evidence (id INTEGER PRIMARY KEY AUTOINCREMENT, edge_id INTEGER, text TEXT,
+                                   source TEXT, created_at TEXT);
+            INSERT INTO edges(subj, rel, obj, weight, source, conversation_id, round_num, created_at) VALUES
+                ('a', 'uses', 'b', 1.0, 's1', 'c1', 1, '2026-01-01'),
+                ('a', 'uses', 'b', 1.0, 's2', 'c2', 2, '2026-01-02'),
+                ('a', 'uses', 'c', 1.0, 's1', 'c1', 1, '2026-01-01');
+            INSERT INTO evidence(edge_id, text, source, created_at) VALUES
+                (1, 'same', 's1', '2026-01-01'), (2, 'same', 's2', '2026-01-02'), (2, 'other', 's2', '2026-01-02');
+            """
+        )
+        conn.commit()
+        conn.close()
+
+        store = GraphStore(path)
+        try:
+            self.assertTrue(store.needs_compaction)
+            # Legacy mode still avoids adding a third copy.
+            store.add_edge("a", "uses", "b", conversation_id="c3")
+            stats = store.compact_edges()
+            self.assertFalse(store.needs_compaction)
+            self.assertEqual(stats["edges_after"], 2)
+            self.assertEqual(stats["merged_groups"], 1)
+            self.assertEqual(stats["evidence_removed"], 1)
+
+            merged = store.query_edges(subj="a", obj="b")[0]
+            self.assertEqual((merged["id"], merged["weight"], merged["hits"], merged["conversation_id"]), (1, 3.0, 3, "c3"))
+            self.assertEqual({ev["text"] for ev in store.evidence_for_edge(1, limit=5)}, {"same", "other"})
+
+            store.add_edge("a", "uses", "b")
+            self.assertEqual(store.query_edges(subj="a", obj="b")[0]["hits"], 4)
+        finally:
+            store.close()
+
+
+class TestGraphAdjacencyCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        graph_api.configure_graph(True, self.tmp.name, cache_max_entities=8, cache_edges_per_entity=4)
+        self.store = graph_api._GRAPH
+
+    def tearDown(self):
+        graph_api.configure_graph(False, self.tmp.name)
+        self.tmp.cleanup()
+
+    def _count_sql(self):
+        statements = []
+        self.store._connect().set_trace_callback(statements.append)
+        return statements
+
+    def test_second_read_is_served_from_cache(self):
+        graph_api.graph_add_edge("a", "uses", "b", evidence_text="a uses b")
+        first = graph_api.graph_related_with_evidence("a")
+        statements = self._count_sql()
+        second = graph_api.graph_related_with_evidence("a")
+
+        self.assertEqual(statements, [])
+        self.assertEqual(first, second)
+        self.assertEqual(second[0]["evidence"][0]["text"], "a uses b")
+        stats = graph_api.graph_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entities"]), (1, 1, 1))
+
+    def test_write_through_matches_sqlite(self):
+        graph_api.graph_add_edge("a", "uses", "b", weight=0.5, evidence_text="first")
+        graph_api.graph_related_with_evidence("a", evidence_limit=2)
+        graph_api.graph_add_edge("a", "uses", "b", weight=0.5, evidence_text="second")
+        graph_api.graph_add_edge("c", "uses", "a", evidence_text="c uses a")
+
+        cached = graph_api.graph_related_with_evidence("a", evidence_limit=2)
+        self.assertEqual(graph_api.graph_cache_stats()["misses"], 1)
+        fresh = self.store.adjacency(["a"], evidence_limit=2)["a"]
+        self.assertEqual(
+            [(e["id"], e["obj"], e["weight"], e["hits"], [ev["text"] for ev in e["evidence"]]) for e in cached],
+            [(e["id"], e["obj"], e["weight"], e["hits"], [ev["text"] for ev in e["evidence"]]) for e in fresh],
+        )
+        self.assertEqual(cached[1]["weight"], 1.0)
+
+    def test_reseen_evidence_keeps_sqlite_order(self):
+        for text in ("one", "two", "three"):
+            graph_api.graph_add_edge("a", "uses", "b", evidence_text=text)
+        self.assertEqual([ev["text"] for ev in graph_api.graph_related_with_evidence("a", evidence_limit=2)[0]["evidence"]], ["three", "two"])
+
+        # "one" is already stored below the cached window; SQLite keeps it there.
+        graph_api.graph_add_edge("a", "uses", "b", evidence_text="one")
+        cached = graph_api.graph_related_with_evidence("a", evidence_limit=2)
+        fresh = self.store.adjacency(["a"], evidence_limit=2)["a"]
+        self.assertEqual([ev["text"] for ev in cached[0]["evidence"]], ["three", "two"])
+        self.assertEqual([ev["text"] for ev in cached[0]["evidence"]], [ev["text"] for ev in fresh[0]["evidence"]])
+        self.assertEqual(cached[0]["hits"], 4)
+
+    def test_writes_from_another_connection_invalidate_cache(self):
+        graph_api._CACHE.sync_interval = 0.0
+        graph_api.graph_add_edge("a", "uses", "b")
+        graph_api.graph_related_with_evidence("a")
+        graph_api.graph_add_edge("a", "uses", "c")
+        self.assertEqual(len(graph_api.graph_related_with_evidence("a")), 2)
+        self.assertEqual(graph_api.graph_cache_stats()["invalidations"], 0)
+
+        other = GraphStore(self.store.db_path)
+        try:
+            other.add_edge("a", "uses", "d")
+        finally:
+            other.close()
+        self.assertEqual([e["obj"] for e in graph_api.graph_related_with_evidence("a")], ["d", "c", "b"])
+        self.assertEqual(graph_api.graph_cache_stats()["invalidations"], 1)
+
+    def test_cache_hits_do_not_wait_for_the_writer(self):
+        from unittest import mock
+
+        graph_api.graph_add_edge("a", "uses", "b")
+        graph_api.graph_related_with_evidence("a")
+        with mock.patch.object(self.store, "data_version", wraps=self.store.data_version) as version:
+            graph_api.graph_related_with_evidence("a")
+            self.assertEqual(version.call_count, 0)  # synced within the interval
+
+            graph_api._CACHE.sync_interval = 0.0
+            held = threading.Event()
+            release = threading.Event()
+
+            def writer():
+                with self.store._write_lock:
+                    held.set()
+                    release.wait(5)
+
+            t = threading.Thread(target=writer)
+            t.start()
+            held.wait(5)
+            try:
+                self.assertEqual(len(graph_api.graph_related_with_evidence("a")), 1)
+            finally:
+                release.set()
+                t.join()
+            version.assert_called_once_with(wait=False)
+        self.assertEqual(graph_api.graph_cache_stats()["hits"], 2)
+
+    def test_hub_entities_and_deep_evidence_bypass_cache(self):
+        graph_api.graph_add_edges_batch([{"subj": "hub", "rel": "has", "obj": f"n{i}"} for i in range(6)])
+        self.assertEqual(len(graph_api.graph_related_with_evidence("hub", limit=3)), 3)
+        graph_api.graph_related_with_evidence("n0", evidence_limit=5)
+        stats = graph_api.graph_cache_stats()
+        self.assertEqual((stats["bypassed"], stats["entities"]), (1, 0))
+
+    def test_traverse_through_cache_matches_sql(self):
+        graph_api.graph_add_edges_batch(
+            [
+                {"subj": "a", "rel": "uses", "obj": "b", "weight": 1.0, "evidence_text": "a uses b"},
+                {"subj": "a", "rel": "uses", "obj": "c", "weight": 0.2},
+                {"subj": "b", "rel": "depends_on", "obj": "d", "weight": 0.9, "evidence_text": "b needs d"},
+                {"subj": "d", "rel": "depends_on", "obj": "e", "weight": 0.9},
+                {"subj": "x", "rel": "uses", "obj": "y", "weight": 0.5},
+            ]
+        )
+        for kwargs in ({"hops": 1}, {"hops": 2, "fanout": 1, "min_weight": 0.5}, {"hops": 3, "limit": 2}):
+            kwargs["evidence_limit"] = 1
+            expected = self.store.traverse(["a", "x"], **kwargs)
+            self.assertEqual(graph_api.graph_traverse_with_evidence(["a", "x"], **kwargs), expected)
+            statements = self._count_sql()
+            self.assertEqual(graph_api.graph_traverse_with_evidence(["a", "x"], **kwargs), expected)
+            self.assertEqual(statements, [])
+            self.store._connect().set_trace_callback(None)
+
+    def test_lru_bounds(self):
+        cache = AdjacencyCache(max_entities=2, max_edges=3)
+        edge = lambda i: {"id": i, "subj": "s", "rel": "r", "obj": "o", "weight": 1.0}
+        cache.put_many({"a": [edge(1)], "b": [edge(2)]}, cache.generation)
+        cache.get_many(["a"], 1)
+        cache.put_many({"c": [edge(3)]}, cache.generation)
+        self.assertEqual(list(cache._entries), ["a", "c"])
+        cache.put_many({"d": [edge(4), edge(5)]}, cache.generation)
+        self.assertEqual(list(cache._entries), ["c", "d"])
+        self.assertEqual((cache.stats()["evictions"], cache.stats()["edges"]), (2, 3))
+
+        stale = cache.generation
+        cache.apply_write({"subj": "q", "rel": "r", "obj": "z"}, 9, "now")
+        cache.put_many({"q": []}, stale)
+        self.assertNotIn("q", cache._entries)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
+import os
+import tempfile
 import unittest
 
 from deepsea_nexus.brain.models import BrainRecord
+from deepsea_nexus.brain.embedding_service import EmbeddingService, get_embedding_service
 from deepsea_nexus.brain.vector_scorer import VectorScorer
 
 
@@ -21,6 +24,150 @@ class TestVectorScorer(unittest.TestCase):
         r = BrainRecord(id="1", kind="fact", priority="P1", source="t", content="anything")
         self.assertEqual(scorer.score(" ", r, mode="facts"), 0.0)
 
+    def test_score_batch_matches_per_record_scores(self):
+        scorer = VectorScorer(dim=64, use_sentence_transformers=False)
+        records = [
+            BrainRecord(id="1", kind="fact", priority="P0", source="t", content="jsonl append storage"),
+            BrainRecord(id="2", kind="strategy", priority="P2", source="t", content="compact storage nightly", decay=0.4),
+            BrainRecord(
+                id="3",
+                kind="fact",
+                priority="P1",
+                source="t",
+                content="stored vector",
+                metadata={"embedding": [1.0] + [0.0] * 63},
+            ),
+        ]
+        for mode in ("facts", "strategy"):
+            batch = scorer.score_batch("storage jsonl", records, mode=mode)
+            single = [scorer.score("storage jsonl", r, mode=mode) for r in records]
+            for b, s in zip(batch, single):
+                self.assertAlmostEqual(b, s, places=5)
+        self.assertEqual(scorer.score_batch(" ", records, mode="facts"), [0.0, 0.0, 0.0])
+        rows = scorer.score_rows("storage jsonl", records, [2, 0], mode="facts")
+        batch = scorer.score_batch("storage jsonl", records, mode="facts")
+        self.assertAlmostEqual(rows[0], batch[2], places=5)
+        self.assertAlmostEqual(rows[1], batch[0], places=5)
+
+    def test_score_batch_reuses_matrix_for_appended_records(self):
+        scorer = VectorScorer(dim=32, use_sentence_transformers=False)
+        records = [BrainRecord(id=str(i), kind="fact", source="t", content=f"note {i}") for i in range(3)]
+        scorer.score_batch("note", records, mode="facts")
+        first = scorer._matrix
+
+        records.append(BrainRecord(id="3", kind="fact", source="t", content="note 3"))
+        out = scorer.score_batch("note", records, mode="facts")
+        self.assertEqual(len(out), 4)
+        if first is not None:
+            self.assertIs(scorer._matrix, first)
+            self.assertEqual(len(first), 4)
+
+    def test_embedding_cache_is_bounded_and_counts_hits(self):
+        scorer = VectorScorer(dim=16, use_sentence_transformers=False, cache_max_entries=2)
+        scorer.embed("alpha")
+        scorer.embed("alpha")
+        scorer.embed("beta")
+        scorer.embed("gamma")
+
+        stats = scorer.cache_stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 3)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertGreater(stats["resident_bytes"], 0)
+
+    def test_embedding_cache_persists_to_disk_tier(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = os.path.join(td, "emb_cache.sqlite3")
+            first = VectorScorer(dim=16, use_sentence_transformers=False, cache_path=path)
+            vec = first.embed("persist me")
+            first._cache.close()
+
+            second = VectorScorer(dim=16, use_sentence_transformers=False, cache_path=path)
+            again = second.embed("persist me")
+            for a, b in zip(vec, again):
+                self.assertAlmostEqual(a, b, places=6)
+            self.assertEqual(second.cache_stats()["disk_hits"], 1)
+            second._cache.close()
+
+    def test_disk_tier_keeps_fallback_and_model_vectors_apart(self):
+        class _Row:
+            def tolist(self):
+                return [0.0, 1.0]
+
+        class _Model:
+            def encode(self, texts, normalize_embeddings=True):
+                return [_Row() for _ in texts]
+
+        with tempfile.TemporaryDirectory() as td:
+            path = os.path.join(td, "emb_cache.sqlite3")
+            # Written while sentence-transformers was unavailable.
+            fallback = VectorScorer(dim=2, use_sentence_transformers=False, model_name="fake-st", cache_path=path)
+            hashed = fallback.embed("mixed spaces")
+            fallback._cache.close()
+
+            get_embedding_service("fake-st").set_model(_Model())
+            scorer = VectorScorer(dim=2, use_sentence_transformers=True, model_name="fake-st", cache_path=path)
+            self.assertEqual(scorer.embed("mixed spaces"), [0.0, 1.0])
+            self.assertEqual(scorer.embed_many(["mixed spaces"]), [[0.0, 1.0]])
+            self.assertNotEqual(hashed, [0.0, 1.0])
+            self.assertEqual(scorer.cache_stats()["disk_hits"], 0)
+            scorer._cache.close()
+
+    def test_embedding_service_coalesces_concurrent_queries(self):
+        import threading
+        import time
+
+        class _Row:
+            def tolist(self):
+                return [1.0, 0.0]
+
+        class _SlowModel:
+            def encode(self, texts, normalize_embeddings=True):
+                time.sleep(0.1)
+                return [_Row() for _ in texts]
+
+        service = EmbeddingService("fake-model")
+        service.set_model(_SlowModel())
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(service.embed("same query"))) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(results, [[1.0, 0.0]] * 4)
+        self.assertEqual(service.encodes, 1)
+        self.assertEqual(service.coalesced, 3)
+        self.assertEqual(service.embed("same query"), [1.0, 0.0])
+        self.assertEqual(service.encodes, 1)
+
+    def test_embedding_service_bulk_documents_bypass_query_cache(self):
+        class _Row:
+            def __init__(self, text):
+                self.text = text
+
+            def tolist(self):
+                return [float(len(self.text))]
+
+        class _Model:
+            def encode(self, texts, normalize_embeddings=True):
+                return [_Row(t) for t in texts]
+
+        service = EmbeddingService("fake-model", cache_max_entries=2)
+        service.set_model(_Model())
+        service.embed("hot query")
+        self.assertEqual(service.embed_many(["doc a", "doc bb", "doc ccc"], cache=False), [[5.0], [6.0], [7.0]])
+
+        stats = service.stats()
+        self.assertEqual((stats["entries"], stats["evictions"]), (1, 0))
+        encodes = service.encodes
+        service.embed("hot query")
+        self.assertEqual(service.encodes, encodes)
+
+    def test_embedding_service_is_shared_per_model(self):
+        self.assertIs(get_embedding_service("all-MiniLM-L6-v2"), get_embedding_service("sentence-transformers/all-MiniLM-L6-v2"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -396,6 +396,74 @@ class CompressionBenchmark(unittest.TestCase):
                 print(f"{algo:<10} {'N/A':<8} {'N/A':<8} {'N/A':<10} {'N/A':<12}")
 
 
+class TurnAnalyzerBenchmark(unittest.TestCase):
+    """Single-pass turn analysis vs. one extractor pass per feature"""
+
+    USER = "接着上次的话题，我们的向量存储模块怎么选？要不要切换到 chroma?\n顺便看下 brain/graph_store.py"
+    RESPONSE = "\n".join(
+        [
+            "## 存储方案",
+            "- 结论：决定采用 sqlite + WAL，改为批量写入",
+            "- 依赖 numpy 做向量打分，调用 flush() 落盘",
+            "#GOLD: 使用 graph cache 缓存热点实体",
+            "这个子系统的瓶颈在哪里？",
+            "TODO: 给 turn_analyzer 加基准测试",
+            "下一步 继续压测 recall_fusion",
+            "```json\n{\"本次核心产出\": \"确定存储方案\", \"决策上下文\": \"单机部署\"}\n```",
+        ]
+        * 3
+    )
+
+    def _best_of(self, func, repeat: int = 5, number: int = 200) -> float:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    def test_single_pass_matches_per_feature_extractors(self):
+        from deepsea_nexus.plugins.smart_context import SmartContextPlugin
+
+        plugin = SmartContextPlugin()
+        user, response = self.USER, self.RESPONSE
+        turn = f"{user}\n{response}"
+
+        def per_feature():
+            return (
+                plugin._extract_summary(response),
+                plugin.extract_keywords(user + " " + response),
+                plugin._extract_decision_blocks(turn),
+                plugin._extract_topics(turn),
+                plugin._extract_key_entities(turn),
+                plugin._extract_actions(response),
+                plugin._extract_questions(turn),
+            )
+
+        def single_pass():
+            features = plugin._analyze_turn(user, response)
+            return (
+                plugin._extract_summary(response, features),
+                features.keywords,
+                features.decisions,
+                features.topics,
+                features.entities,
+                features.actions,
+                features.questions,
+            )
+
+        self.assertEqual(single_pass(), per_feature())
+
+        baseline = self._best_of(per_feature)
+        analyzed = self._best_of(single_pass)
+        print(f"\n✓ Turn analysis: per-feature {baseline * 5:.2f}ms/turn, "
+              f"single-pass {analyzed * 5:.2f}ms/turn ({baseline / analyzed:.1f}x)")
+        # Wall-clock comparisons are noisy on shared CI runners; opt in locally.
+        if os.environ.get("NEXUS_PERF_ASSERT"):
+            self.assertLess(analyzed, baseline)
+
+
 def run_performance_benchmarks():
     """Run all performance benchmarks"""
     print("⚡ Running Deep-Sea Nexus v3.0 Performance Benchmarks...")
@@ -404,9 +472,10 @@ def run_performance_benchmarks():
     loader = unittest.TestLoader()
     perf_suite = loader.loadTestsFromTestCase(PerformanceBenchmark)
     compression_suite = loader.loadTestsFromTestCase(CompressionBenchmark)
+    turn_suite = loader.loadTestsFromTestCase(TurnAnalyzerBenchmark)
     
     # Combine suites
-    all_tests = unittest.TestSuite([perf_suite, compression_suite])
+    all_tests = unittest.TestSuite([perf_suite, compression_suite, turn_suite])
     
     runner = unittest.TextTestRunner(verbosity=1)
     result = runner.run(all_tests)
@@ -307,6 +307,632 @@ class TestStorageAbstraction(unittest.TestCase):
         self.assertIsNone(error.data)
 
 
+class TestChromaVectorBackend(unittest.TestCase):
+    """Test the async Chroma backend against an in-memory collection"""
+
+    class _Collection:
+        def __init__(self):
+            self.docs = {}
+            self.upserts = []
+
+        def upsert(self, ids, documents, metadatas, embeddings=None):
+            if any(d == "poison" for d in documents):
+                raise ValueError("bad document")
+            self.upserts.append(list(ids))
+            for i, d, m in zip(ids, documents, metadatas):
+                self.docs[i] = (d, m)
+
+        def count(self):
+            return len(self.docs)
+
+        def query(self, n_results, where=None, query_texts=None, query_embeddings=None):
+            rows = list(self.docs.items())[:n_results]
+            batch = len(query_texts or query_embeddings)
+            return {
+                "ids": [[i for i, _ in rows]] * batch,
+                "documents": [[d for _, (d, _) in rows]] * batch,
+                "metadatas": [[m for _, (_, m) in rows]] * batch,
+                "distances": [[0.2] * len(rows)] * batch,
+            }
+
+        def get(self, ids, include=None):
+            found = [i for i in ids if i in self.docs]
+            return {
+                "ids": found,
+                "documents": [self.docs[i][0] for i in found],
+                "metadatas": [self.docs[i][1] for i in found],
+            }
+
+        def delete(self, ids):
+            for i in ids:
+                self.docs.pop(i, None)
+
+    def _backend(self, **cfg):
+        from concurrent.futures import ThreadPoolExecutor
+        from deepsea_nexus.storage.chroma_backend import ChromaVectorBackend
+
+        backend = ChromaVectorBackend()
+        backend._collection = self._Collection()
+        backend._executor = ThreadPoolExecutor(max_workers=2)
+        backend._write_batch_size = cfg.get("write_batch_size", 3)
+        backend._flush_interval = cfg.get("write_flush_interval_sec", 60.0)
+        backend._queue_max = cfg.get("write_queue_max", 100)
+        return backend
+
+    def test_registered_with_factory(self):
+        """Test the backend is available by name"""
+        from deepsea_nexus.storage.base import StorageBackendFactory
+        from deepsea_nexus.storage.chroma_backend import ChromaVectorBackend
+
+        backend = StorageBackendFactory.create_vector("chromadb", {})
+        self.assertIsInstance(backend, ChromaVectorBackend)
+
+    def test_write_behind_batches_and_reads_flush(self):
+        """Test adds are queued, written in batches and visible to reads"""
+        backend = self._backend(write_batch_size=3)
+
+        async def run():
+            for i in range(2):
+                await backend.add(f"doc {i}", {"title": f"t{i}"}, doc_id=f"d{i}")
+            self.assertEqual(backend.stats_snapshot()["pending_writes"], 2)
+            self.assertEqual(backend._collection.upserts, [])
+            count = await backend.count()
+            hits = await backend.search("doc", limit=5)
+            await backend.close()
+            return count, hits
+
+        count, hits = asyncio.run(run())
+        self.assertEqual(count.data, 2)
+        self.assertEqual(backend._collection.upserts, [["d0", "d1"]])
+        self.assertEqual([r.doc_id for r in hits.data], ["d0", "d1"])
+        self.assertAlmostEqual(hits.data[0].relevance, 0.8)
+
+    def test_reads_wait_for_batches_already_being_written(self):
+        """Test a read right after a full batch sees the writes in flight"""
+        import time
+
+        backend = self._backend(write_batch_size=2)
+        collection = backend._collection
+        upsert = collection.upsert
+
+        def slow_upsert(**kwargs):
+            time.sleep(0.2)
+            upsert(**kwargs)
+
+        collection.upsert = slow_upsert
+
+        async def run():
+            await backend.add("first doc", {}, doc_id="f1")
+            await backend.add("second doc", {}, doc_id="f2")
+            await asyncio.sleep(0.05)  # the batch is now mid-upsert
+            hits = await backend.search("doc", limit=5)
+            await backend.close()
+            return hits
+
+        hits = asyncio.run(run())
+        self.assertEqual(sorted(r.doc_id for r in hits.data), ["f1", "f2"])
+
+    def test_batch_failure_is_retried_per_document(self):
+        """Test one bad document doesn't fail the rest of its batch"""
+        backend = self._backend()
+
+        async def run():
+            result = await backend.add_batch([("a", {}, "a"), ("poison", {}, "p"), ("b", {})])
+            await backend.close()
+            return result
+
+        result = asyncio.run(run())
+        self.assertEqual(len(result.data), 2)
+        self.assertIn("a", result.data)
+        self.assertEqual(backend.stats_snapshot()["write_errors"], 1)
+
+    def test_stats_and_health(self):
+        """Test latency percentiles and health check"""
+        backend = self._backend()
+
+        async def run():
+            await backend.add("x", {}, doc_id="x")
+            await backend.delete("x")
+            health = await backend.health_check()
+            stats = await backend.get_stats()
+            await backend.close()
+            return health, stats
+
+        health, stats = asyncio.run(run())
+        self.assertTrue(health.success)
+        self.assertEqual(health.data["documents"], 0)
+        self.assertEqual(stats.data["total_documents"], 0)
+        self.assertIn("p95", stats.data["latency_ms"]["count"])
+
+    def test_document_count_tracks_the_collection(self):
+        """Test re-upserts and deletes of missing ids keep the count exact"""
+        backend = self._backend(write_batch_size=1)
+
+        async def run():
+            seen = []
+            await backend.add("first", {}, doc_id="same")
+            await backend.add("again", {}, doc_id="same")
+            await backend.flush()
+            seen.append(backend.stats_snapshot()["total_documents"])
+            await backend.update("same", content="edited")
+            seen.append(backend.stats_snapshot()["total_documents"])
+            await backend.delete("missing")
+            seen.append(backend.stats_snapshot()["total_documents"])
+            await backend.delete("same")
+            seen.append(backend.stats_snapshot()["total_documents"])
+            await backend.close()
+            return seen
+
+        self.assertEqual(asyncio.run(run()), [1, 1, 1, 0])
+
+    def test_recall_filters_become_where_clause(self):
+        """Test structured filters are translated for Chroma"""
+        backend = self._backend()
+        where = backend._where({"tags": ["a", "b"], "date_from": "2026-01-01"})
+        self.assertEqual(where, {"tags": {"$in": ["a", "b"]}})
+        self.assertEqual(backend._where({"title": "raw"}), {"title": "raw"})
+        backend._executor.shutdown()
+
+    def test_date_filters_are_applied_after_the_query(self):
+        """Test date bounds filter results instead of reaching Chroma"""
+        backend = self._backend()
+
+        async def run():
+            await backend.add("old", {"created_at": "2025-12-01T08:00:00"}, doc_id="old")
+            await backend.add("new", {"created_at": "2026-02-01T08:00:00"}, doc_id="new")
+            hits = await backend.search("note", limit=1, filters={"date_from": "2026-01-01"})
+            await backend.close()
+            return hits
+
+        hits = asyncio.run(run())
+        self.assertEqual([r.doc_id for r in hits.data], ["new"])
+
+    def test_plugin_uses_async_backend(self):
+        """Test nexus_core writes and recalls through a storage backend"""
+        from deepsea_nexus.plugins.nexus_core_plugin import NexusCorePlugin
+
+        plugin = NexusCorePlugin()
+        plugin._available = True
+        plugin._vector_backend = self._backend()
+
+        async def run():
+            doc_id = await plugin.add_document("async backend note", title="n", doc_id="n1")
+            batch = await plugin.add_documents_batch([{"content": "second", "doc_id": "n2"}])
+            hits = await plugin.search_recall("note", n=2)
+            many = await plugin.search_recall_batch(["note", "second"], n=2)
+            fetched = await plugin.get_document("n1")
+            await plugin.stop()
+            return doc_id, batch, hits, many, fetched
+
+        doc_id, batch, hits, many, fetched = asyncio.run(run())
+        self.assertEqual(doc_id, "n1")
+        self.assertTrue(batch[0].success)
+        self.assertEqual([r.doc_id for r in hits], ["n1", "n2"])
+        self.assertEqual(len(many), 2)
+        self.assertEqual(fetched["content"], "async backend note")
+        self.assertEqual(plugin.recall_metrics()["legs"]["vector"]["calls"], 2)
+
+
+class TestNumpyVectorBackend(unittest.TestCase):
+    """Test the memory-mapped NumPy backend"""
+
+    def setUp(self):
+        from deepsea_nexus.storage import numpy_backend
+
+        if numpy_backend.np is None:
+            self.skipTest("numpy not installed")
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _backend(self, **cfg):
+        from deepsea_nexus.storage.base import StorageBackendFactory
+        from deepsea_nexus.storage import numpy_backend  # noqa: F401
+
+        config = {"path": self.temp_dir, "use_sentence_transformers": False, "dim": 64}
+        config.update(cfg)
+        backend = StorageBackendFactory.create_vector("numpy", config)
+        self.assertTrue(asyncio.run(backend.initialize()))
+        return backend
+
+    def test_top_k_filters_and_reopen(self):
+        """Test exact top-k, metadata filters and persistence across restarts"""
+        backend = self._backend()
+
+        async def write():
+            await backend.add_batch([
+                ("python asyncio event loop", {"title": "a", "tags": ["py"]}, "a"),
+                ("rust borrow checker", {"title": "b", "tags": ["rust"]}, "b"),
+                ("python packaging wheels", {"title": "c", "tags": ["py"]}, "c"),
+            ])
+            return await backend.search("python event loop", limit=2)
+
+        hits = asyncio.run(write())
+        self.assertEqual([r.doc_id for r in hits.data], ["a", "c"])
+
+        reopened = self._backend()
+
+        async def read():
+            tagged = await reopened.search("borrow", limit=3, filters={"tags": ["RUST"]})
+            many = await reopened.search_many(["python", "rust"], limit=1)
+            return tagged, many, await reopened.count()
+
+        tagged, many, count = asyncio.run(read())
+        self.assertEqual([r.doc_id for r in tagged.data], ["b"])
+        self.assertEqual([rows[0].doc_id for rows in many.data], ["a", "b"])
+        self.assertEqual(count.data, 3)
+
+    def test_tombstones_updates_and_compaction(self):
+        """Test deletes/updates hide old rows until compaction drops them"""
+        backend = self._backend()
+
+        async def run():
+            await backend.add_batch([(f"note {i}", {"title": str(i)}, str(i)) for i in range(4)])
+            await backend.delete("1")
+            await backend.update("2", content="rewritten note")
+            before = backend.stats_snapshot()
+            dropped = await backend.compact()
+            hits = await backend.search("rewritten", limit=4)
+            health = await backend.health_check()
+            return before, dropped, hits, health
+
+        before, dropped, hits, health = asyncio.run(run())
+        self.assertEqual(before["tombstones"], 2)
+        self.assertEqual(dropped.data, 2)
+        self.assertEqual(backend.stats_snapshot()["rows"], 3)
+        self.assertNotIn("1", [r.doc_id for r in hits.data])
+        self.assertEqual(hits.data[0].content, "rewritten note")
+        self.assertTrue(health.success)
+
+    def test_reopen_scans_ids_and_parses_rows_on_demand(self):
+        """Test opening keeps only ids/offsets and a torn sidecar line is cut"""
+        backend = self._backend()
+        asyncio.run(backend.add_batch([
+            ("lazy sidecar row", {"title": "l", "tags": ["x"]}, "l"),
+            ("eager row", {"title": "e", "tags": ["y"]}, "e"),
+        ]))
+        with open(os.path.join(self.temp_dir, "rows.jsonl"), "ab") as fh:
+            fh.write(b'{"id": "torn", "content": "half')
+        with open(os.path.join(self.temp_dir, "vectors.f32"), "ab") as fh:
+            fh.write(b"\0" * 64 * 4)
+
+        reopened = self._backend()
+        self.assertIsNone(reopened._metadatas)
+        self.assertEqual(reopened._ids, ["l", "e"])
+        got = asyncio.run(reopened.get("l"))
+        self.assertEqual((got.data["content"], got.data["metadata"]["title"]), ("lazy sidecar row", "l"))
+
+        async def run():
+            await reopened.add("after restart", {"title": "a", "tags": ["x"]}, doc_id="a")
+            return await reopened.search("row", limit=3, filters={"tags": ["x"]})
+
+        hits = asyncio.run(run())
+        self.assertEqual(sorted(r.doc_id for r in hits.data), ["a", "l"])
+        self.assertEqual(len(reopened._metadatas), 3)
+
+        again = self._backend()
+        self.assertEqual(again._ids, ["l", "e", "a"])
+        self.assertEqual(asyncio.run(again.get("a")).data["content"], "after restart")
+        self.assertTrue(asyncio.run(again.health_check()).success)
+
+    def test_torn_vector_append_is_truncated(self):
+        """Test vectors without a sidecar line are dropped on open"""
+        backend = self._backend()
+        asyncio.run(backend.add("kept", {}, doc_id="k"))
+        with open(os.path.join(self.temp_dir, "vectors.f32"), "ab") as fh:
+            fh.write(b"\0" * 64 * 4)
+
+        reopened = self._backend()
+        self.assertTrue(asyncio.run(reopened.health_check()).success)
+        self.assertEqual(reopened.stats_snapshot()["rows"], 1)
+
+
+class TestNexusCoreRecall(unittest.TestCase):
+    """Test search_recall leg scheduling"""
+
+    class _SlowBackend:
+        def __init__(self, delay):
+            self.delay = delay
+            self.searches = 0
+
+        def search(self, query, n_results=5):
+            import time
+            self.searches += 1
+            time.sleep(self.delay)
+            return {"documents": [["vector hit"]], "metadatas": [[{"title": "doc"}]], "ids": [["v1"]], "distances": [[0.1]]}
+
+    def _plugin(self, delay, timeout):
+        from deepsea_nexus.plugins.nexus_core_plugin import NexusCorePlugin
+
+        plugin = NexusCorePlugin()
+        plugin._available = True
+        plugin._vector_backend = self._SlowBackend(delay)
+        plugin._vector_timeout = timeout
+        return plugin
+
+    def test_vector_leg_runs_off_the_event_loop(self):
+        """Test the loop keeps running while the vector leg works"""
+        plugin = self._plugin(delay=0.2, timeout=5.0)
+
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            task = asyncio.ensure_future(ticker())
+            results = await plugin.search_recall("hit", n=3)
+            task.cancel()
+            return results, ticks
+
+        results, ticks = asyncio.run(run())
+        self.assertEqual([r.doc_id for r in results], ["v1"])
+        self.assertGreater(ticks, 5)
+        metrics = plugin.recall_metrics()
+        self.assertEqual(metrics["legs"]["vector"]["calls"], 1)
+        self.assertEqual(metrics["queue_depth"], 0)
+
+    def test_vector_leg_timeout_degrades(self):
+        """Test a slow vector leg is abandoned after its timeout"""
+        plugin = self._plugin(delay=0.5, timeout=0.05)
+        self.assertEqual(asyncio.run(plugin.search_recall("hit", n=3)), [])
+        self.assertEqual(plugin.recall_metrics()["legs"]["vector"]["timeouts"], 1)
+        asyncio.run(plugin.stop())
+
+    def test_brain_leg_uses_cold_timeout_until_warm(self):
+        """Test the first brain call gets the cold-start timeout"""
+        import time
+
+        plugin = self._plugin(delay=0.0, timeout=5.0)
+        plugin._brain_enabled = plugin._brain_available = True
+        plugin._brain_timeout, plugin._brain_cold_timeout = 0.05, 5.0
+        plugin._recall_cache = None
+
+        def brain_retrieve(**kwargs):
+            if not plugin._brain_warm.is_set():
+                time.sleep(0.2)  # loading the index and model
+            return [{"id": "b1", "content": "brain hit", "score": 0.9}]
+
+        with patch("deepsea_nexus.brain.api.brain_retrieve", side_effect=brain_retrieve):
+            self.assertEqual(plugin._brain_leg_timeout(), 5.0)
+            first = asyncio.run(plugin.search_recall("hit", n=3))
+            self.assertIn("brain hit", [r.content for r in first])
+            self.assertEqual(plugin._brain_leg_timeout(), 0.05)
+        self.assertEqual(plugin.recall_metrics()["legs"]["brain"]["timeouts"], 0)
+        asyncio.run(plugin.stop())
+
+    def test_recall_cache_hits_until_write(self):
+        """Test repeated queries are cached until a document write"""
+        plugin = self._plugin(delay=0.0, timeout=5.0)
+        backend = plugin._vector_backend
+        backend.add = lambda documents, ids, metadatas: None
+
+        first = asyncio.run(plugin.search_recall("Vector  HIT", n=3))
+        second = asyncio.run(plugin.search_recall("vector hit", n=3))
+        self.assertEqual([r.doc_id for r in second], [r.doc_id for r in first])
+        self.assertEqual(backend.searches, 1)
+
+        asyncio.run(plugin.add_document("new doc", title="t"))
+        asyncio.run(plugin.search_recall("vector hit", n=3))
+        self.assertEqual(backend.searches, 2)
+
+        cache_stats = plugin.stats()["recall_cache"]
+        self.assertEqual((cache_stats["hits"], cache_stats["misses"]), (1, 2))
+
+    def test_add_documents_batch_issues_one_add_per_batch(self):
+        """Test bulk ingest batches backend writes and reports per-document failures"""
+        plugin = self._plugin(delay=0.0, timeout=5.0)
+        calls = []
+
+        def add(documents, embeddings, ids, metadatas):
+            calls.append(list(ids))
+            if "bad" in documents:
+                raise ValueError("rejected")
+
+        plugin._vector_backend.add = add
+        docs = [{"content": f"doc {i}", "doc_id": f"d{i}"} for i in range(5)]
+        docs[3] = {"content": "bad", "doc_id": "d3"}
+        docs.append({"content": ""})
+
+        results = asyncio.run(plugin.add_documents_batch(docs, batch_size=3))
+        self.assertEqual([r.success for r in results], [True, True, True, False, True, False])
+        self.assertEqual(results[3].error, "rejected")
+        self.assertEqual(results[0].data, "d0")
+        # Batch 2 fails as a whole and is retried per document.
+        self.assertEqual(calls, [["d0", "d1", "d2"], ["d3", "d4"], ["d3"], ["d4"]])
+
+    def test_add_documents_batch_skips_the_query_embedding_cache(self):
+        """Test bulk document embeddings bypass the shared query cache"""
+        plugin = self._plugin(delay=0.0, timeout=5.0)
+        service = MagicMock()
+        service.available.return_value = True
+        service.embed_many.side_effect = lambda texts, cache=True: [[float(len(t))] for t in texts]
+        plugin._embedding_service = service
+        plugin._vector_backend.add = lambda documents, embeddings, ids, metadatas: None
+
+        asyncio.run(plugin.add_documents_batch([{"content": "doc", "doc_id": "d0"}]))
+        service.embed_many.assert_called_once_with(["doc"], cache=False)
+
+    def test_search_recall_pushes_filters_down(self):
+        """Test recall filters become a Chroma where clause and a cache key part"""
+        plugin = self._plugin(delay=0.0, timeout=5.0)
+        wheres = []
+
+        def search(query, n_results=5, where=None):
+            wheres.append(where)
+            return {"documents": [["tagged"]], "metadatas": [[{"title": "doc"}]], "ids": [["t1"]], "distances": [[0.1]]}
+
+        plugin._vector_backend.search = search
+        asyncio.run(plugin.search_recall("hit", n=3))
+        asyncio.run(plugin.search_recall("hit", n=3, filters={"tags": "python, async", "conversation_id": "c1"}))
+        asyncio.run(plugin.search_recall("hit", n=3, filters={"tags": ["python", "async"], "conversation_id": "c1"}))
+        self.assertEqual(
+            wheres,
+            [None, {"$and": [{"tags": {"$in": ["python", "async"]}}, {"conversation_id": {"$eq": "c1"}}]}],
+        )
+        with self.assertRaises(ValueError):
+            asyncio.run(plugin.search_recall("hit", filters={"colour": "red"}))
+
+    def test_search_recall_batch_issues_one_vector_query(self):
+        """Test batched recall embeds once and queries the store once"""
+        plugin = self._plugin(delay=0.0, timeout=5.0)
+        batches = []
+
+        def search_many(queries, n_results=5, query_embeddings=None):
+            batches.append((list(queries), query_embeddings))
+            return {
+                "documents": [[f"hit {q}"] for q in queries],
+                "metadatas": [[{"title": q}] for q in queries],
+                "ids": [[f"id-{q}"] for q in queries],
+                "distances": [[0.2] for _ in queries],
+            }
+
+        service = Mock()
+        service.available.return_value = True
+        service.embed_many.side_effect = lambda texts: [[float(len(t))] for t in texts]
+        plugin._vector_backend.search_many = search_many
+        plugin._embedding_service = service
+
+        results = asyncio.run(plugin.search_recall_batch(["alpha", "beta", "Alpha "], n=2))
+        self.assertEqual([[r.doc_id for r in rs] for rs in results], [["id-alpha"], ["id-beta"], ["id-alpha"]])
+        self.assertEqual(batches, [(["alpha", "beta"], [[5.0], [4.0]])])
+        service.embed_many.assert_called_once_with(["alpha", "beta"])
+
+        # Served from the per-query cache afterwards, including by search_recall.
+        self.assertEqual([r.doc_id for r in asyncio.run(plugin.search_recall("beta", n=2))], ["id-beta"])
+        asyncio.run(plugin.search_recall_batch(["alpha", "beta"], n=2))
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(plugin._vector_backend.searches, 0)
+
+
+class TestRecallFusion(unittest.TestCase):
+    """Test brain + vector recall fusion"""
+
+    @staticmethod
+    def _r(content, relevance, origin, doc_id=None, brain_score=None):
+        from deepsea_nexus.storage.base import RecallResult
+
+        meta = {"origin": origin}
+        if brain_score is not None:
+            meta["brain_score"] = brain_score
+        return RecallResult(content=content, source=origin, relevance=relevance, metadata=meta, doc_id=doc_id)
+
+    def test_rrf_dedupes_on_content_and_rewards_agreement(self):
+        """Test RRF merges the same text from both legs into one result"""
+        from deepsea_nexus.plugins.recall_fusion import fuse
+
+        vector = [self._r("Alpha  notes", 0.9, "vector", "v1"), self._r("beta", 0.8, "vector", "v2")]
+        brain = [self._r("gamma", 0.85, "brain", "b1", 0.7), self._r("alpha notes", 0.6, "brain", "b2", 0.5)]
+        fused = fuse("rrf", brain, vector, n=3)
+        self.assertEqual([r.doc_id for r in fused], ["v1", "b1", "v2"])
+        self.assertEqual(fused[0].metadata["fusion_legs"], ["vector", "brain"])
+
+    def test_calibrated_fusion_uses_raw_leg_scores(self):
+        """Test calibrated fusion maps each leg's raw score onto [0, 1]"""
+        from deepsea_nexus.plugins.recall_fusion import fuse
+
+        vector = [self._r("v", 0.4, "vector", "v1")]
+        brain = [self._r("b", 0.85, "brain", "b1", brain_score=0.9)]
+        calibration = {"vector": (0.2, 0.6), "brain": (0.2, 1.0)}
+        fused = fuse("calibrated", brain, vector, n=2, calibration=calibration)
+        self.assertEqual([r.doc_id for r in fused], ["b1", "v1"])
+        self.assertAlmostEqual(fused[0].relevance, 0.875)
+        self.assertAlmostEqual(fused[1].relevance, 0.5)
+
+    def test_offline_evaluation_scores_each_method(self):
+        """Test the evaluation harness reports per-method metrics"""
+        from deepsea_nexus.scripts.eval_recall_fusion import evaluate
+
+        recorded = [
+            {
+                "query": "q",
+                "relevant": ["b1"],
+                "legs": {
+                    "vector": [{"content": f"v{i}", "relevance": 0.9 - i * 0.1, "doc_id": f"v{i}"} for i in range(3)],
+                    "brain": [{"content": "b", "relevance": 0.8, "doc_id": "b1", "metadata": {"brain_score": 0.7}}],
+                },
+            },
+            {"query": "unjudged", "legs": {}},
+        ]
+        report = evaluate(recorded, n=3)
+        self.assertEqual(set(report), {"legacy", "rrf", "calibrated"})
+        # Legacy never lets brain in once vector fills n.
+        self.assertEqual(report["legacy"]["recall"], 0.0)
+        self.assertEqual(report["rrf"]["recall"], 1.0)
+        self.assertEqual(report["rrf"]["mrr"], 0.5)
+
+
+class TestSyncBridge(unittest.TestCase):
+    """Test the compat sync/async bridge"""
+
+    def tearDown(self):
+        from deepsea_nexus.compat_async import configure_sync_bridge
+        configure_sync_bridge("auto")
+
+    def test_background_mode_reuses_one_loop(self):
+        """Test background mode dispatches every call onto the same loop"""
+        from deepsea_nexus.compat_async import configure_sync_bridge, run_coro_sync
+
+        async def loop_id():
+            return id(asyncio.get_running_loop())
+
+        configure_sync_bridge("background")
+        self.assertEqual(run_coro_sync(loop_id()), run_coro_sync(loop_id()))
+
+    def test_timeout_cancels_coroutine(self):
+        """Test a bounded call raises TimeoutError in both modes"""
+        from deepsea_nexus.compat_async import configure_sync_bridge, run_coro_sync
+
+        for mode in ("auto", "background"):
+            configure_sync_bridge(mode)
+            with self.assertRaises(TimeoutError):
+                run_coro_sync(asyncio.sleep(5), timeout=0.05)
+
+    def test_nexus_init_keeps_env_selected_mode(self):
+        """Test nexus_init only applies an explicitly configured bridge mode"""
+        from deepsea_nexus import compat
+        from deepsea_nexus.compat_async import configure_sync_bridge, get_sync_bridge_mode
+        from deepsea_nexus.core.config_manager import ConfigManager
+
+        async def initialized():
+            return True
+
+        app = MagicMock()
+        app.initialize.side_effect = initialized
+        registry = MagicMock()
+        registry.get.return_value = None
+        with patch.dict(os.environ, {"DEEPSEA_NEXUS_SYNC_BRIDGE": "background"}):
+            env_config = ConfigManager()
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("DEEPSEA_NEXUS_SYNC_BRIDGE", None)
+            bad_config = ConfigManager()
+        bad_config.set("compat.sync_bridge", "threads")
+
+        with patch.object(compat, "get_plugin_registry", return_value=registry), \
+                patch.object(compat, "configure_brain"), \
+                patch("deepsea_nexus.app.create_app", return_value=app):
+            configure_sync_bridge("auto")
+            with patch.object(compat, "get_config_manager", return_value=env_config):
+                self.assertTrue(compat.nexus_init())
+            self.assertEqual(get_sync_bridge_mode(), "background")
+
+            with patch.object(compat, "get_config_manager", return_value=bad_config):
+                self.assertTrue(compat.nexus_init())
+            self.assertEqual(get_sync_bridge_mode(), "background")
+
+    def test_rejects_unknown_mode(self):
+        """Test unknown bridge modes are rejected"""
+        from deepsea_nexus.compat_async import configure_sync_bridge
+
+        with self.assertRaises(ValueError):
+            configure_sync_bridge("threads")
+
+
 if __name__ == "__main__":
     # Run tests
     unittest.main(verbosity=2)
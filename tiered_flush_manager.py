@@ -367,10 +367,16 @@ class TieredFlushManager:
             return []
         
         try:
-            from sentence_transformers import SentenceTransformer
-            embedder = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
-            
-            query_embedding = embedder.encode([query]).tolist()
+            try:
+                from .brain.embedding_service import get_embedding_service
+            except ImportError:
+                from brain.embedding_service import get_embedding_service
+
+            # Shared, process-wide model instead of loading one per search.
+            vec = get_embedding_service().embed(query)
+            if vec is None:
+                return []
+            query_embedding = [vec]
             results = self.archive_vector_store.query(
                 query_embeddings=query_embedding,
                 n_results=n
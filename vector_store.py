@@ -98,7 +98,8 @@ class VectorStore:
     def search(self, 
                query: str,
                n_results: int = 5,
-               where: Dict[str, Any] = None) -> List[Dict]:
+               where: Dict[str, Any] = None,
+               query_embedding: List[float] = None) -> List[Dict]:
         """
         搜索
         
@@ -106,18 +107,56 @@ class VectorStore:
             query: 查询文本
             n_results: 返回数量
             where: 过滤条件
+            query_embedding: 预先计算的查询向量（提供时 Chroma 不再重复嵌入）
             
         Returns:
             List[Dict]: 搜索结果
         """
+        if query_embedding is not None:
+            return self.collection.query(
+                query_embeddings=[query_embedding],
+                n_results=n_results,
+                where=where
+            )
+
         results = self.collection.query(
             query_texts=[query],
             n_results=n_results,
             where=where
         )
-        
+
         return results
-    
+
+    def search_many(self,
+                    queries: List[str],
+                    n_results: int = 5,
+                    where: Dict[str, Any] = None,
+                    query_embeddings: List[List[float]] = None) -> Dict:
+        """
+        批量搜索（一次 Chroma query 处理多个查询）
+
+        Args:
+            queries: 查询文本列表
+            n_results: 每个查询的返回数量
+            where: 过滤条件
+            query_embeddings: 预先计算的查询向量，与 queries 一一对应
+
+        Returns:
+            Dict: Chroma 结果，每个字段按查询顺序各有一行
+        """
+        if query_embeddings is not None:
+            return self.collection.query(
+                query_embeddings=list(query_embeddings),
+                n_results=n_results,
+                where=where
+            )
+
+        return self.collection.query(
+            query_texts=list(queries),
+            n_results=n_results,
+            where=where
+        )
+
     def get(self, 
             ids: List[str] = None,
             where: Dict[str, Any] = None,